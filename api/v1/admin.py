@@ -0,0 +1,178 @@
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
+
+from config.database import routing_stats
+from middleware.metrics_middleware import http_metrics
+from service.audit_service import audit_log_writer
+from service.track_service import track_ingestor
+from service.warehouse_service import warehouse_locator
+from utils.cache_utils import token_cache, user_status_cache
+from utils.common_utils import logging_stats
+from utils.db_metrics import db_metrics
+from utils.event_hub import event_hub
+from utils.password_utils import password_pool
+from utils.sql_tracker import sql_tracker
+
+# HTTPBearer认证依赖
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# 创建路由实例
+router = APIRouter()
+
+
+def _check_admin(request: Request) -> None:
+    """
+    管理接口权限校验（仅管理员可访问）
+    :param request:
+    :return:
+    """
+    if request.state.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅管理员可访问")
+
+
+@router.get("/cache-stats", summary="查询认证缓存命中统计", dependencies=[Depends(bearer_scheme)])
+def get_cache_stats(request: Request):
+    """
+    查询认证缓存命中统计（JWT载荷缓存/用户状态缓存）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return {
+        "token_cache": token_cache.stats(),
+        "user_status_cache": user_status_cache.stats()
+    }
+
+
+@router.get("/password-pool-stats", summary="查询密码计算进程池统计", dependencies=[Depends(bearer_scheme)])
+def get_password_pool_stats(request: Request):
+    """
+    查询密码计算进程池统计（在途/完成/拒绝次数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return password_pool.stats()
+
+
+@router.get("/db-routing-stats", summary="查询读写分离路由统计", dependencies=[Depends(bearer_scheme)])
+def get_db_routing_stats(request: Request):
+    """
+    查询读写分离路由统计（主库读/从库读/读己之写固定主库的读/写次数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return routing_stats
+
+
+@router.get("/db-stats", summary="查询数据库连接池与SQL耗时统计", dependencies=[Depends(bearer_scheme)])
+async def get_db_stats(request: Request):
+    """
+    查询数据库指标：连接池借出/溢出/获取连接耗时、各类SQL耗时分布、每请求SQL条数，
+    以及同步接口线程池占用（判断瓶颈在连接池还是线程池）
+    注意：需在事件循环中读取线程池状态，因此为async接口
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    limiter = to_thread.current_default_thread_limiter()
+    limiter_stats = limiter.statistics()
+    return {
+        **db_metrics.stats(),
+        "threadpool": {
+            "total_tokens": limiter.total_tokens,
+            "borrowed_tokens": limiter_stats.borrowed_tokens,
+            "tasks_waiting": limiter_stats.tasks_waiting
+        }
+    }
+
+
+@router.post("/db-stats/reset", summary="清空数据库累计指标", dependencies=[Depends(bearer_scheme)])
+def reset_db_stats(request: Request):
+    """
+    清空数据库累计指标（压测前调用，连接池实时状态不受影响）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    db_metrics.reset()
+    return {"message": "数据库指标已清空"}
+
+
+@router.get("/route-stats", summary="查询各路由请求数与耗时分位数", dependencies=[Depends(bearer_scheme)])
+def get_route_stats(request: Request):
+    """
+    查询各路由（按路由模板）的请求数、状态码分布、耗时分位数、并发中请求数
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return http_metrics.stats()
+
+
+@router.get("/sql-stats", summary="查询慢查询与N+1告警统计", dependencies=[Depends(bearer_scheme)])
+def get_sql_stats(request: Request):
+    """
+    查询慢查询次数、出现N+1的请求数以及最近的N+1告警（语句形状/所属请求/执行次数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return sql_tracker.stats()
+
+
+@router.get("/audit-log-stats", summary="查询操作日志写入统计", dependencies=[Depends(bearer_scheme)])
+def get_audit_log_stats(request: Request):
+    """
+    查询操作日志异步写入统计（队列长度/已写入/丢弃/失败条数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return audit_log_writer.stats()
+
+
+@router.get("/log-stats", summary="查询日志队列统计", dependencies=[Depends(bearer_scheme)])
+def get_log_stats(request: Request):
+    """
+    查询应用日志异步写入统计（队列长度/上限/因队列满丢弃的条数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return logging_stats()
+
+
+@router.get("/warehouse-locator-stats", summary="查询仓库定位器状态", dependencies=[Depends(bearer_scheme)])
+def get_warehouse_locator_stats(request: Request):
+    """
+    查询仓库定位器状态（仓库数/已满仓库数/刷新次数/增量刷新水位）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return warehouse_locator.stats()
+
+
+@router.get("/track-ingest-stats", summary="查询轨迹写入器状态", dependencies=[Depends(bearer_scheme)])
+def get_track_ingest_stats(request: Request):
+    """
+    查询轨迹写入器状态（缓冲区/未写入数据库的轨迹点数/确认、写入、恢复、拒绝条数/fsync次数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return track_ingestor.stats()
+
+
+@router.get("/event-hub-stats", summary="查询订单推送状态", dependencies=[Depends(bearer_scheme)])
+def get_event_hub_stats(request: Request):
+    """
+    查询当前进程的推送事件中心状态（订阅连接数/主题数/发布、投递、丢弃的事件数）
+    :param request:
+    :return:
+    """
+    _check_admin(request)
+    return event_hub.stats()
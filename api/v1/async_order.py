@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
+from models.schema.order_schema import (
+    OrderCreateRequest, OrderStatusUpdateRequest, OrderQueryRequest,
+    OrderDetailResponse, OrderListResponse
+)
+from service.async_order_service import async_order_service
+from utils.common_utils import logger
+from utils.response_utils import fast_response
+
+# HTTPBearer认证依赖
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# 创建路由实例（异步版订单接口，与/api/v1/order一一对应，便于逐个接口迁移和压测对比）
+router = APIRouter()
+
+
+def _current_user(request: Request) -> dict:
+    """从request.state构建当前用户信息"""
+    return {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+
+@router.post("/create", summary="创建订单（异步）", response_model=OrderDetailResponse,
+             dependencies=[Depends(bearer_scheme)])
+async def create_order(request: Request, order_data: OrderCreateRequest):
+    """
+    创建订单（登录用户均可创建）
+    :param request:
+    :param order_data:
+    :return:
+    """
+    try:
+        current_user_id = request.state.user_id
+        order_dict = await async_order_service.create_order(order_data, current_user_id)
+        logger.info("订单创建成功：%s（创建人：%s）", order_dict["order_no"], current_user_id)
+        return fast_response(order_dict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("创建订单失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="创建订单失败")
+
+
+@router.get("/detail/{order_id}", summary="查询订单详情（异步）", response_model=OrderDetailResponse,
+            dependencies=[Depends(bearer_scheme)])
+async def get_order_detail(order_id: int, request: Request):
+    """
+    查询订单详情（带权限控制）
+    :param order_id:
+    :param request:
+    :return:
+    """
+    order_dict = await async_order_service.get_order_detail(order_id, _current_user(request))
+    if not order_dict:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="订单不存在或无权限查看")
+    return fast_response(order_dict)
+
+
+@router.get("/query", summary="分页查询订单（异步）", response_model=OrderListResponse,
+            dependencies=[Depends(bearer_scheme)])
+async def query_orders(request: Request, query_data: OrderQueryRequest = Depends()):
+    """
+    分页查询订单（带权限控制，支持页码分页/游标分页）
+    :param request:
+    :param query_data:
+    :return:
+    """
+    try:
+        result = await async_order_service.query_orders(query_data, _current_user(request))
+        return fast_response(result)
+    except ValueError as e:
+        # 分页游标无效等参数错误
+        logger.error("查询订单失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.put("/status/{order_id}", summary="修改订单状态（异步）", response_model=OrderDetailResponse,
+            dependencies=[Depends(bearer_scheme)])
+async def update_order_status(order_id: int, request: Request, status_data: OrderStatusUpdateRequest):
+    """
+    修改订单状态（仅管理员可操作）
+    :param order_id:
+    :param request:
+    :param status_data:
+    :return:
+    """
+    try:
+        order_dict = await async_order_service.update_order_status(order_id, _current_user(request), status_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not order_dict:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限修改订单状态或订单不存在")
+
+    logger.info("订单状态修改成功：%s → %s", order_dict["order_no"], status_data.order_status)
+    return fast_response(order_dict)
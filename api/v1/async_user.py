@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, status, Request, Depends
+from fastapi.security import HTTPBearer
+
+from models.schema.user_schema import UserCreateRequest, UserInfoResponse, UserLoginRequest, UserLoginResponse, \
+    UserUpdateRequest, PasswordResetRequest
+from service.async_user_service import async_user_service
+from utils.common_utils import logger
+from utils.password_utils import PasswordPoolBusyError
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# 创建路由实例（异步版用户接口，与/api/v1/user一一对应，便于逐个接口迁移和压测对比）
+router = APIRouter()
+
+
+@router.post("/register", summary="用户注册（异步）", response_model=UserInfoResponse)
+async def user_register(request: UserCreateRequest):
+    """
+    用户注册接口
+    :param request:
+    :return:
+    """
+    try:
+        user = await async_user_service.register(request)
+        logger.info("用户注册成功：%s（角色：%s）", user["username"], user["role"])
+        return user
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.error("用户注册失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="注册失败")
+
+
+@router.post("/login", summary="用户登录（异步）", response_model=UserLoginResponse)
+async def user_login(request: UserLoginRequest):
+    """
+    用户登录接口
+    :param request:
+    :return:
+    """
+    try:
+        result = await async_user_service.login(request.username, request.password)
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    if not result:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
+    token, user = result
+    logger.info("用户登录成功：%s", user["username"])
+    return {
+        "access_token": token,
+        "user_info": user
+    }
+
+
+@router.get("/info", summary="查询当前用户信息（异步）", response_model=UserInfoResponse,
+            dependencies=[Depends(bearer_scheme)])
+async def get_user_info(request: Request):
+    """
+    查询当前登录用户信息
+    :param request:
+    :return:
+    """
+    user = await async_user_service.get_user_info(request.state.user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在或已删除")
+    del user["password"]
+    return user
+
+
+@router.put("/info", summary="修改当前用户信息（异步）", response_model=UserInfoResponse,
+            dependencies=[Depends(bearer_scheme)])
+async def update_user_info(request: Request, update_data: UserUpdateRequest):
+    """
+    修改当前登录用户信息
+    :param request:
+    :param update_data:
+    :return:
+    """
+    user = await async_user_service.update_user_info(request.state.user_id, update_data)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在或已删除")
+    logger.info("用户信息修改成功：%s", user["username"])
+    del user["password"]
+    return user
+
+
+@router.put("/reset-password", summary="重置密码（异步）", dependencies=[Depends(bearer_scheme)])
+async def reset_password(request: Request, reset_data: PasswordResetRequest):
+    """
+    重置当前登录用户密码
+    :param request:
+    :param reset_data:
+    :return:
+    """
+    try:
+        success = await async_user_service.reset_password(request.state.user_id, reset_data)
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    if not success:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="原密码错误")
+    logger.info("用户密码重置成功：%s", request.state.username)
+    return {"code": 200, "message": "密码重置成功"}
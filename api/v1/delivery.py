@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
+
+from models.schema.delivery_schema import (
+    DeliveryRouteRequest, DeliveryRouteResponse, DeliveryTimelineResponse, DeliveryLatestResponse
+)
+from service.route_service import route_service
+from service.timeline_service import timeline_service
+from utils.response_utils import fast_response
+
+# HTTPBearer认证依赖
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# 创建路由实例
+router = APIRouter()
+
+
+@router.get("/route", summary="查询司机配送路线", response_model=DeliveryRouteResponse,
+            dependencies=[Depends(bearer_scheme)])
+def get_delivery_route(request: Request, route_data: DeliveryRouteRequest = Depends()):
+    """
+    查询司机未完成任务的配送顺序（按收件区县合并站点，最近邻 + 2-opt排序）
+    司机只能查询自己的路线，管理员需指定driver_id
+    :param request:
+    :param route_data:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    result = route_service.plan_driver_route(current_user, route_data.driver_id,
+                                             route_data.start_lng, route_data.start_lat)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限查看该司机的配送路线")
+    return fast_response(result)
+
+
+@router.get("/timeline/{order_id}", summary="查询订单配送时间线", response_model=DeliveryTimelineResponse,
+            dependencies=[Depends(bearer_scheme)])
+def get_delivery_timeline(order_id: int, request: Request):
+    """
+    查询订单的配送任务及其全部轨迹节点（一次联表查询，权限规则同订单详情）
+    :param order_id:
+    :param request:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    result = timeline_service.get_order_timeline(order_id, current_user)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="订单不存在或无权限查看")
+    return fast_response(result)
+
+
+@router.get("/latest/{order_id}", summary="查询订单最新配送状态", response_model=DeliveryLatestResponse,
+            dependencies=[Depends(bearer_scheme)])
+def get_delivery_latest(order_id: int, request: Request):
+    """
+    查询订单最新状态和最新轨迹节点（供跟踪页轮询：订单和任务走缓存，最新轨迹走内存，不扫描轨迹表）
+    :param order_id:
+    :param request:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    result = timeline_service.get_order_latest(order_id, current_user)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="订单不存在或无权限查看")
+    return fast_response(result)
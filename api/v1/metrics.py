@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from middleware.metrics_middleware import http_metrics
+from utils.db_metrics import db_metrics
+from utils.metrics_utils import format_labels, render_histogram
+
+# 创建路由实例
+router = APIRouter()
+
+# Prometheus文本格式版本
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _render_db_metrics() -> list[str]:
+    """
+    数据库指标渲染为Prometheus文本格式（连接池状态/获取连接耗时/SQL耗时）
+    :return:
+    """
+    stats = db_metrics.stats()
+    lines = []
+    for name, help_text in (("checked_out", "已借出的连接数"), ("overflow", "溢出连接数")):
+        lines += [f"# HELP db_pool_{name} {help_text}", f"# TYPE db_pool_{name} gauge"]
+        for pool_stats in stats["pools"]:
+            if name in pool_stats:
+                lines.append(f"db_pool_{name}{format_labels({'pool': pool_stats['name']})} {pool_stats[name]}")
+
+    lines += ["# HELP db_pool_checkout_wait_seconds 获取连接耗时（秒，含排队等待）",
+              "# TYPE db_pool_checkout_wait_seconds histogram"]
+    for pool in list(db_metrics.pools.values()):
+        lines += render_histogram("db_pool_checkout_wait_seconds", {"pool": pool.name}, pool.checkout_wait)
+
+    lines += ["# HELP db_statement_duration_seconds SQL执行耗时（秒，按语句类型）",
+              "# TYPE db_statement_duration_seconds histogram"]
+    for kind, histogram in db_metrics.statement_latency.items():
+        lines += render_histogram("db_statement_duration_seconds", {"kind": kind}, histogram)
+    return lines
+
+
+@router.get("/metrics", summary="Prometheus指标")
+def get_metrics():
+    """
+    Prometheus指标（文本格式）：各路由请求数/耗时分布/并发数 + 数据库连接池与SQL耗时
+    无需令牌（供Prometheus抓取，部署时应只在内网开放）
+    :return:
+    """
+    lines = http_metrics.render_prometheus() + _render_db_metrics()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+import asyncio
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import settings
 from models.schema.order_schema import (
     OrderCreateRequest, OrderStatusUpdateRequest, OrderQueryRequest,
-    OrderDetailResponse, OrderListResponse
+    OrderDetailResponse, OrderListResponse, OrderBatchCreateRequest, OrderBatchCreateResponse, OrderExportRequest,
+    OrderBatchStatusUpdateRequest, OrderBatchStatusUpdateResponse, OrderAutoDispatchRequest, OrderAutoDispatchResponse
 )
+from service.dispatch_service import dispatch_service
 from service.order_service import order_service
 from utils.common_utils import logger
+from utils.event_hub import (
+    EventHubClosedError, EventHubFullError, Subscription, HEARTBEAT_FRAME, encode_event, event_hub, order_topic, user_topic
+)
+from utils.response_utils import fast_response
 
 # HTTPBearer认证依赖
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -26,15 +40,37 @@ def create_order(request: Request, order_data: OrderCreateRequest):
         # 获取当前登录用户ID
         current_user_id = request.state.user_id
         order_dict = order_service.create_order(order_data, current_user_id)
-        logger.info(f"订单创建成功：{order_dict['order_no']}（创建人：{current_user_id}）")
-        return order_dict
+        logger.info("订单创建成功：%s（创建人：%s）", order_dict["order_no"], current_user_id)
+        return fast_response(order_dict)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"创建订单失败：{str(e)}")
+        logger.error("创建订单失败：%s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="创建订单失败")
 
 
+@router.post("/batch-create", summary="批量创建订单", response_model=OrderBatchCreateResponse,
+             dependencies=[Depends(bearer_scheme)])
+def batch_create_orders(request: Request, batch_data: OrderBatchCreateRequest):
+    """
+    批量创建订单（逐条校验，校验通过的订单在一个事务中多行插入，返回每条订单的结果）
+    :param request:
+    :param batch_data:
+    :return:
+    """
+    try:
+        current_user_id = request.state.user_id
+        result = order_service.batch_create_orders(batch_data.items, current_user_id)
+        logger.info("批量创建订单完成：成功%s条，失败%s条（创建人：%s）",
+                    result["success_count"], result["failed_count"], current_user_id)
+        return fast_response(result)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("批量创建订单失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="批量创建订单失败")
+
+
 @router.get("/detail/{order_id}", summary="查询订单详情", response_model=OrderDetailResponse,
             dependencies=[Depends(bearer_scheme)])
 def get_order_detail(order_id: int, request: Request):
@@ -54,13 +90,13 @@ def get_order_detail(order_id: int, request: Request):
     order_dict = order_service.get_order_detail(order_id, current_user)
     if not order_dict:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="订单不存在或无权限查看")
-    return order_dict
+    return fast_response(order_dict)
 
 
 @router.get("/query", summary="分页查询订单", response_model=OrderListResponse, dependencies=[Depends(bearer_scheme)])
 def query_orders(request: Request, query_data: OrderQueryRequest = Depends()):
     """
-    分页查询订单（带权限控制）
+    分页查询订单（带权限控制，支持页码分页/游标分页）
     :param request:
     :param query_data:
     :return:
@@ -72,10 +108,34 @@ def query_orders(request: Request, query_data: OrderQueryRequest = Depends()):
             "username": request.state.username
         }
         result = order_service.query_orders(query_data, current_user)
-        return result
+        return fast_response(result)
     except ValueError as e:
-        logger.error(f"查询订单失败：{str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="查询订单失败")
+        # 分页游标无效等参数错误
+        logger.error("查询订单失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/export", summary="导出订单（NDJSON/CSV流式下载）", dependencies=[Depends(bearer_scheme)])
+def export_orders(request: Request, export_data: OrderExportRequest = Depends()):
+    """
+    流式导出订单（带权限控制）：服务端游标逐批读取、逐批输出，内存占用不随导出行数增长
+    :param request:
+    :param export_data:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+    media_types = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+    filename = f"orders_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_data.format}"
+    logger.info("订单导出开始：%s（导出人：%s）", filename, current_user["id"])
+    return StreamingResponse(
+        order_service.export_orders(export_data, current_user),
+        media_type=media_types[export_data.format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @router.put("/status/{order_id}", summary="修改订单状态", response_model=OrderDetailResponse,
@@ -94,11 +154,144 @@ def update_order_status(order_id: int, request: Request, status_data: OrderStatu
         "username": request.state.username
     }
 
-    order_dict = order_service.update_order_status(order_id, current_user, status_data)
+    try:
+        order_dict = order_service.update_order_status(order_id, current_user, status_data)
+    except ValueError as e:
+        # 状态流转不合法 / 状态已被并发修改
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     if not order_dict:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限修改订单状态或订单不存在")
 
-    logger.info(f"订单状态修改成功：{order_dict['order_no']} → {status_data.order_status}")
-    return order_dict
+    logger.info("订单状态修改成功：%s → %s", order_dict["order_no"], status_data.order_status)
+    return fast_response(order_dict)
+
 
+@router.put("/batch-status", summary="批量修改订单状态", response_model=OrderBatchStatusUpdateResponse,
+            dependencies=[Depends(bearer_scheme)])
+def batch_update_order_status(request: Request, batch_data: OrderBatchStatusUpdateRequest):
+    """
+    批量修改订单状态（仅管理员可操作，按当前状态分组批量更新，返回成功/被拒绝的订单）
+    :param request:
+    :param batch_data:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    try:
+        result = order_service.batch_update_order_status(current_user, batch_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限修改订单状态")
+
+    logger.info("批量修改订单状态完成：成功%s条，拒绝%s条 → %s",
+                len(result["transitioned"]), len(result["rejected"]), batch_data.order_status)
+    return fast_response(result)
+
+
+@router.post("/auto-dispatch", summary="批量派单", response_model=OrderAutoDispatchResponse,
+             dependencies=[Depends(bearer_scheme)])
+def auto_dispatch(request: Request, dispatch_data: OrderAutoDispatchRequest):
+    """
+    批量派单（仅管理员可操作）：按收件地区匹配、司机负载和配送效率为全部待派送订单分配司机，批量写回
+    :param request:
+    :param dispatch_data:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    try:
+        result = dispatch_service.auto_dispatch(current_user, dry_run=dispatch_data.dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限派单")
+
+    logger.info("批量派单完成：待派送%s单，分配%s单，未分配%s单（耗时：读取%ss，计算%ss，写回%ss）",
+                result["order_count"], result["assigned_count"], result["unassigned_count"],
+                result["load_seconds"], result["plan_seconds"], result["write_seconds"])
+    return fast_response(result)
+
+
+@router.get("/subscribe", summary="订阅订单状态推送（SSE）", dependencies=[Depends(bearer_scheme)])
+async def subscribe_orders(request: Request,
+                           order_ids: List[int] = Query(None, description="订阅的订单ID（不传时订阅当前用户的所有订单）")):
+    """
+    订阅订单状态和配送轨迹推送（Server-Sent Events，事件类型：order_status / track）
+    - 传order_ids：订阅指定订单（权限规则同订单详情），连接建立后先推送各订单的当前状态
+    - 不传：订阅当前用户创建的订单（普通用户）/ 被分配的订单（司机），管理员必须传order_ids
+    客户端读取过慢时丢弃最旧的事件，断线重连时可传order_ids重新获取当前状态
+    :param request:
+    :param order_ids:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    order_ids = list(dict.fromkeys(order_ids or []))
+    if len(order_ids) > settings.SSE_MAX_ORDER_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"单个连接最多订阅{settings.SSE_MAX_ORDER_IDS}个订单")
+    if not order_ids and current_user["role"] == "admin":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="管理员订阅时必须指定订单ID")
+
+    topics = [order_topic(order_id) for order_id in order_ids] or [user_topic(current_user["id"])]
+    try:
+        subscription = event_hub.subscribe(topics)
+    except (EventHubFullError, EventHubClosedError) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    # 先订阅再查询当前状态：查询期间发生的状态变更也会推送，不会丢失
+    snapshots = []
+    if order_ids:
+        try:
+            snapshots = await run_in_threadpool(order_service.get_order_snapshots, order_ids, current_user)
+        except Exception:
+            event_hub.unsubscribe(subscription)
+            raise
+        if snapshots is None:
+            event_hub.unsubscribe(subscription)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="订单不存在或无权限查看")
+
+    return StreamingResponse(_stream_events(subscription, snapshots), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def _stream_events(subscription: Subscription, snapshots: List[dict]):
+    """
+    推送连接的事件流：初始状态 → 订阅的事件（无事件时定期发送心跳），
+    连接断开、服务关闭或超过SSE_MAX_STREAM_SECONDS时结束并取消订阅（客户端EventSource会自动重连）
+    :param subscription:
+    :param snapshots: 订单当前状态
+    :return:
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+    try:
+        for snapshot in snapshots:
+            yield encode_event("order_status", snapshot)
+        while not subscription.closed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            frame = await subscription.get(min(settings.SSE_HEARTBEAT_SECONDS, remaining))
+            if frame is not None:
+                yield frame
+            elif not subscription.closed and loop.time() < deadline:
+                yield HEARTBEAT_FRAME
+    finally:
+        event_hub.unsubscribe(subscription)
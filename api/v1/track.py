@@ -0,0 +1,70 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.security import HTTPBearer
+
+from models.schema.track_schema import TrackIngestRequest, TrackIngestResponse, TrackLatestItem
+from service.track_service import TrackBufferFullError, track_service
+from utils.common_utils import logger
+from utils.response_utils import fast_response
+
+# HTTPBearer认证依赖
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# 创建路由实例
+router = APIRouter()
+
+# 单次查询最新轨迹的最多任务数
+LATEST_MAX_TASKS = 100
+
+
+@router.post("/ingest", summary="批量上报配送轨迹", response_model=TrackIngestResponse,
+             dependencies=[Depends(bearer_scheme)])
+def ingest_tracks(request: Request, ingest_data: TrackIngestRequest):
+    """
+    批量上报配送轨迹（司机上报自己未完成任务的轨迹，可包含多个任务）
+    轨迹点落盘到本地spool后即返回，由后台线程批量写入数据库
+    :param request:
+    :param ingest_data:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    try:
+        result = track_service.ingest_tracks(current_user, [point.dict() for point in ingest_data.points])
+    except TrackBufferFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.error("轨迹上报失败：%s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="轨迹上报失败")
+
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅司机和管理员可上报轨迹")
+    return fast_response(result)
+
+
+@router.get("/latest", summary="查询任务最新轨迹", response_model=List[TrackLatestItem],
+            dependencies=[Depends(bearer_scheme)])
+def get_latest_tracks(request: Request, task_ids: List[int] = Query(..., description="任务ID列表")):
+    """
+    查询任务的最新轨迹节点（优先读内存中的最新轨迹表，司机只能查询自己的任务）
+    :param request:
+    :param task_ids:
+    :return:
+    """
+    current_user = {
+        "id": request.state.user_id,
+        "role": request.state.role,
+        "username": request.state.username
+    }
+
+    if len(task_ids) > LATEST_MAX_TASKS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"单次最多查询{LATEST_MAX_TASKS}个任务")
+    result = track_service.get_latest_tracks(current_user, list(dict.fromkeys(task_ids)))
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅司机和管理员可查询轨迹")
+    return fast_response(result)
@@ -5,6 +5,7 @@ from models.schema.user_schema import UserCreateRequest, UserInfoResponse, UserL
     UserUpdateRequest, PasswordResetRequest
 from service.user_service import user_service
 from utils.common_utils import logger
+from utils.password_utils import PasswordPoolBusyError
 
 # 新增：定义OAuth2依赖（适配Swagger Docs）
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -14,35 +15,40 @@ router = APIRouter()
 
 
 @router.post("/register", summary="用户注册", response_model=UserInfoResponse)
-def user_register(request: UserCreateRequest):
+async def user_register(request: UserCreateRequest):
     """
-    用户注册接口
+    用户注册接口（异步：密码加密在独立进程池中执行，不占用接口线程池）
     :param request:
     :return:
     """
     try:
-        user = user_service.register(request)
-        logger.info(f"用户注册成功：{user['username']}（角色：{user['role']}）")
+        user = await user_service.register(request)
+        logger.info("用户注册成功：%s（角色：%s）", user["username"], user["role"])
         return user
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
-        logger.error(f"用户注册失败：{e}")
+        logger.error("用户注册失败：%s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="注册失败")
 
 
 @router.post("/login", summary="用户登录", response_model=UserLoginResponse)
-def user_login(request: UserLoginRequest):
+async def user_login(request: UserLoginRequest):
     """
-    用户登录接口
+    用户登录接口（异步：密码验证在独立进程池中执行，登录洪峰时排队或快速失败）
     :param request:
     :return:
     """
-    result = user_service.login(request.username, request.password)
+    try:
+        result = await user_service.login(request.username, request.password)
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     if not result:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户名或密码错误")
     token, user = result
-    logger.info(f"用户登录成功：{user['username']}")
+    logger.info("用户登录成功：%s", user["username"])
     return {
         "access_token": token,
         "user_info": user
@@ -74,21 +80,24 @@ def update_user_info(request: Request, update_data: UserUpdateRequest):
     user = user_service.update_user_info(request.state.user_id, update_data)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在或已删除")
-    logger.info(f"用户信息修改成功：{user['username']}")
+    logger.info("用户信息修改成功：%s", user["username"])
     del user["password"]
     return user
 
 
 @router.put("/reset-password", summary="重置密码", dependencies=[Depends(bearer_scheme)])
-def reset_password(request: Request, reset_data: PasswordResetRequest):
+async def reset_password(request: Request, reset_data: PasswordResetRequest):
     """
     重置当前登录用户密码
     :param request:
     :param reset_data:
     :return:
     """
-    success = user_service.reset_password(request.state.user_id, reset_data)
+    try:
+        success = await user_service.reset_password(request.state.user_id, reset_data)
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     if not success:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="原密码错误")
-    logger.info(f"用户密码重置成功：{request.state.username}")
+    logger.info("用户密码重置成功：%s", request.state.username)
     return {"code": 200, "message": "密码重置成功"}
@@ -7,36 +7,136 @@
 4. 支持事务管理（符合企业级数据操作规范）
 """
 import contextlib
-from typing import Generator, Any, Dict, List
+import functools
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Generator, AsyncGenerator, Any, Dict, List
 
 # SQLAlchemy核心依赖
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import create_engine, inspect, text, select, update, insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, scoped_session
+from sqlalchemy.sql.dml import UpdateBase
 
 # 项目配置导入
 from config.settings import settings
+from utils.cache_utils import TTLCache
 from utils.common_utils import logger  # 可选：日志工具，后续可补充
+from utils.db_metrics import db_metrics, InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
+from utils.sql_tracker import sql_tracker
+from utils.request_context import get_request_context
+
 
 # ===================== 1. 基础配置（对应SpringBoot的DataSource） =====================
-# 创建MySQL引擎（连接池），参数对齐企业级配置
-engine = create_engine(
-    settings.MYSQL_URL,  # 时区配置已移到URL中，见下面的settings说明
-    # 连接池配置
-    pool_size=settings.MYSQL_POOL_SIZE,
-    max_overflow=settings.MYSQL_MAX_OVERFLOW,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    # 修复：connect_args只保留charset，移除time_zone
-    connect_args={
-        "charset": "utf8mb4"  # 仅保留字符集配置
-    },
-    echo=settings.DEBUG
-)
+def _create_engine(url: str, name: str):
+    """
+    创建引擎（连接池），参数对齐企业级配置
+    SQLite仅用于本地测试替身，不支持连接池大小/字符集参数
+    :param url:
+    :param name: 连接池名称（用于指标统计，见utils.db_metrics）
+    """
+    if url.startswith("sqlite"):
+        new_engine = create_engine(url, echo=settings.DEBUG)
+    else:
+        pool_kwargs = {"poolclass": InstrumentedQueuePool} if settings.DB_METRICS_ENABLED else {}
+        new_engine = create_engine(
+            url,  # 时区配置已移到URL中，见下面的settings说明
+            # 连接池配置
+            pool_size=settings.MYSQL_POOL_SIZE,
+            max_overflow=settings.MYSQL_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            # 修复：connect_args只保留charset，移除time_zone
+            connect_args={
+                "charset": "utf8mb4"  # 仅保留字符集配置
+            },
+            echo=settings.DEBUG,
+            **pool_kwargs
+        )
+    if settings.DB_METRICS_ENABLED:
+        db_metrics.instrument_engine(new_engine, name)
+    if settings.SQL_TRACKER_ENABLED:
+        sql_tracker.instrument_engine(new_engine)
+    return new_engine
+
+
+# 主库引擎（所有写操作 + 未标记只读的查询）
+engine = _create_engine(settings.MYSQL_URL, "primary")
+# 从库引擎（可选，只读查询轮询分发）
+replica_engines = [_create_engine(url, f"replica_{index}") for index, url in enumerate(settings.MYSQL_REPLICA_URLS)]
+_replica_cycle = itertools.cycle(replica_engines) if replica_engines else None
+
+# 最近写过主库的用户：user_id -> True（READ_YOUR_WRITES_SECONDS内的读请求固定走主库，保证读到自己的写入）
+# 只在当前进程内有效；跨进程依靠客户端携带的最近写入时间（RequestContext.last_write）
+_recent_writers = TTLCache("recent_writers", 100000, settings.READ_YOUR_WRITES_SECONDS)
+# 路由统计（主库读/从库读/因读己之写固定走主库的读）
+routing_stats = {"primary_reads": 0, "replica_reads": 0, "sticky_reads": 0, "writes": 0}
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话（对应SpringBoot的AbstractRoutingDataSource）：
+    1. 写操作（flush / INSERT / UPDATE / DELETE）走主库，并记录当前用户最近写入时间
+    2. 标记只读（db_session(read_only=True)）的查询走从库，同一会话固定同一个从库
+    3. 当前用户（或客户端携带的最近写入时间）在READ_YOUR_WRITES_SECONDS内写过主库时，只读查询也走主库
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            _record_write()
+            return engine
+        if not self.info.get("read_only") or _replica_cycle is None:
+            routing_stats["primary_reads"] += 1
+            return engine
+
+        if _in_read_your_writes_window(get_request_context()):
+            routing_stats["sticky_reads"] += 1
+            return engine
+
+        routing_stats["replica_reads"] += 1
+        if "replica" not in self.info:
+            self.info["replica"] = next(_replica_cycle)
+        return self.info["replica"]
+
+
+class AsyncWriteRecordingSession(Session):
+    """异步会话内部的同步会话：只有主库，写操作同样记录读己之写窗口（之后的同步只读查询走主库）"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            _record_write()
+        return super().get_bind(mapper, clause, **kw)
+
+
+def _record_write() -> None:
+    """记录当前请求的写操作（开启读己之写窗口，最近写入时间随响应下发给客户端）"""
+    routing_stats["writes"] += 1
+    context = get_request_context()
+    if context is not None and replica_engines:
+        context.last_write = time.time()
+        if context.user_id is not None:
+            _recent_writers.set(context.user_id, True)
+
+
+def _in_read_your_writes_window(context) -> bool:
+    """
+    当前请求是否处于读己之写窗口
+    :param context: 请求上下文（非请求场景为None）
+    :return:
+    """
+    if context is None:
+        return False
+    if context.last_write is not None and time.time() - context.last_write < settings.READ_YOUR_WRITES_SECONDS:
+        return True
+    return context.user_id is not None and bool(_recent_writers.get(context.user_id))
+
 
 # 创建会话工厂（对应SpringBoot的SqlSessionFactory）
 SessionLocal = sessionmaker(
+    class_=RoutingSession,  # 读写分离路由
     autocommit=False,  # 关闭自动提交，手动控制事务
     autoflush=False,  # 关闭自动刷新，避免不必要的数据库交互
     bind=engine
@@ -48,6 +148,55 @@ ScopedSession = scoped_session(SessionLocal)
 # 基础ORM模型类（所有数据库模型继承此类，对应SpringBoot的BaseEntity）
 Base = declarative_base()
 
+# 当前工作单元会话（unit_of_work块内的db_session()共享此会话）
+_current_session: ContextVar[Session | None] = ContextVar("current_session", default=None)
+
+# 异步引擎/会话工厂（懒加载：首次使用异步链路时才创建，未安装异步驱动不影响同步链路）
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: sessionmaker | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    获取异步MySQL引擎（与同步引擎使用相同的连接池参数）
+    异步驱动URL优先读取MYSQL_ASYNC_URL，未配置时由MYSQL_URL的pymysql驱动替换为aiomysql
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        async_url = settings.MYSQL_ASYNC_URL or settings.MYSQL_URL.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+        pool_kwargs = {"poolclass": InstrumentedAsyncAdaptedQueuePool} if settings.DB_METRICS_ENABLED else {}
+        _async_engine = create_async_engine(
+            async_url,
+            pool_size=settings.MYSQL_POOL_SIZE,
+            max_overflow=settings.MYSQL_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            echo=settings.DEBUG,
+            **pool_kwargs
+        )
+        if settings.DB_METRICS_ENABLED:
+            db_metrics.instrument_engine(_async_engine.sync_engine, "async_primary")
+        if settings.SQL_TRACKER_ENABLED:
+            sql_tracker.instrument_engine(_async_engine.sync_engine)
+        _AsyncSessionLocal = sessionmaker(
+            bind=_async_engine,
+            class_=AsyncSession,
+            sync_session_class=AsyncWriteRecordingSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False  # 提交后不过期对象，避免异步场景下的隐式懒加载
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """关闭异步引擎连接池（项目关闭时调用）"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
+
 
 # ===================== 2. 会话管理（对应SpringBoot的@Autowired Session） =====================
 def get_db() -> Generator[Session, None, None]:
@@ -65,7 +214,7 @@ def get_db() -> Generator[Session, None, None]:
         db.commit()  # 无异常则提交事务
     except SQLAlchemyError as e:
         db.rollback()  # 异常回滚
-        logger.error(f"数据库操作异常：{str(e)}")  # 记录错误日志
+        logger.error("数据库操作异常：%s", e)  # 记录错误日志
         raise  # 抛出异常，让接口层处理
     finally:
         db.close()  # 最终关闭会话
@@ -73,64 +222,294 @@ def get_db() -> Generator[Session, None, None]:
 
 # 上下文管理器：非FastAPI场景（如脚本/服务层）使用
 @contextlib.contextmanager
-def db_session() -> Generator[Session, None, None]:
+def db_session(read_only: bool = False) -> Generator[Session, None, None]:
     """
     用法：
     with db_session() as db:
         db.query(CoreUser).filter_by(username="admin").first()
+    注意：处于unit_of_work块内时直接复用工作单元的会话，由工作单元统一提交/回滚
+    :param read_only: 只读查询（配置了从库时路由到从库，见RoutingSession）
+    """
+    current = _current_session.get()
+    if current is not None:
+        yield current
+        return
+
+    db = SessionLocal()
+    db.info["read_only"] = read_only
+    try:
+        yield db
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("数据库会话异常：%s", e)
+        raise
+    finally:
+        db.close()
+
+
+@contextlib.contextmanager
+def unit_of_work() -> Generator[Session, None, None]:
+    """
+    工作单元（对应SpringBoot的@Transactional）：
+    块内所有DAO调用通过db_session()共享同一个会话/连接/事务，块结束时统一提交，异常时统一回滚
+    用法：
+    with unit_of_work():
+        order = order_dao.get_order_by_id(order_id)
+        order_dao.update_order_status(order_id, {...}, expected_status=order["order_status"])
     """
+    current = _current_session.get()
+    if current is not None:
+        # 嵌套调用：加入外层工作单元
+        yield current
+        return
+
     db = SessionLocal()
+    token = _current_session.set(db)
     try:
         yield db
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
-        logger.error(f"数据库会话异常：{str(e)}")
+        logger.error("工作单元事务异常：%s", e)
+        raise
+    except Exception:
+        db.rollback()
         raise
     finally:
+        _current_session.reset(token)
         db.close()
 
 
+def transactional(func):
+    """
+    事务装饰器（对应SpringBoot的@Transactional注解）：整个方法在一个工作单元中执行
+    用法：
+    @transactional
+    def update_order_status(self, ...):
+        ...
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    异步数据库会话依赖注入函数（FastAPI专用，配合async def接口使用）
+    用法：
+    @app.get("/users")
+    async def get_users(db: AsyncSession = Depends(get_async_db)):
+        return (await db.execute(select(CoreUser))).scalars().all()
+    """
+    async with async_db_session() as db:
+        yield db
+
+
+@contextlib.asynccontextmanager
+async def async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    异步会话上下文管理器（异步DAO使用）
+    用法：
+    async with async_db_session() as db:
+        await db.execute(select(CoreUser).filter_by(username="admin"))
+    """
+    get_async_engine()
+    db = _AsyncSessionLocal()
+    try:
+        yield db
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("异步数据库会话异常：%s", e)
+        raise
+    finally:
+        await db.close()
+
+
 # ===================== 3. 数据库初始化（对应SpringBoot的SchemaInit） =====================
+# 表结构版本：修改ORM模型（新增表/字段/索引）时加1，启动时版本不一致才执行建表和索引同步
+# 同步只创建缺失的表和索引；已存在的表新增/修改字段需先执行迁移脚本（ALTER TABLE），
+# 否则同步时检查到缺失的字段会中止启动（不写入新版本，迁移后重启即可）
+SCHEMA_VERSION = 4
+# 表结构同步锁（MySQL GET_LOCK）：多个worker进程同时启动时只有一个执行建表，其他进程等待后复查版本
+SCHEMA_LOCK_NAME = "wuliu_sync_schema"
+SCHEMA_LOCK_TIMEOUT_SECONDS = 60
+
+
+def import_models() -> None:
+    """
+    导入所有ORM模型（必须导入：否则Base.metadata.create_all不会创建对应表，
+    且模型之间按类名字符串声明的relationship无法解析）
+    """
+    from models.db_model.core_user import CoreUser
+    from models.db_model.core_driver_ext import CoreDriverExt
+    from models.db_model.core_warehouse import CoreWarehouse
+    from models.db_model.core_order import CoreOrder
+    from models.db_model.core_inbound import CoreInbound
+    from models.db_model.core_outbound import CoreOutbound
+    from models.db_model.core_delivery_task import CoreDeliveryTask
+    from models.db_model.core_delivery_track import CoreDeliveryTrack
+    # AI模块模型
+    from models.db_model.ai_model.ai_ocr_record import AIOcrRecord
+    from models.db_model.ai_model.ai_faq_knowledge import AIFaqKnowledge
+    from models.db_model.ai_model.ai_chat_record import AIChatRecord
+    from models.db_model.ai_model.ai_sql_template import AISqlTemplate
+    from models.db_model.ai_model.ai_sql_record import AISqlRecord
+    # 系统模块模型
+    from models.db_model.system_model.sys_operation_log import SysOperationLog
+    from models.db_model.system_model.sys_statistics import SysStatistics
+    from models.db_model.system_model.sys_schema_version import SysSchemaVersion
+
+
 def init_db() -> None:
     """
     初始化数据库：
-    1. 创建所有表（基于ORM模型）
-    2. 执行基础数据插入脚本（可选）
-    注意：需先导入所有ORM模型，否则Base.metadata.create_all不会创建对应表
+    1. 快速启动模式（DB_FAST_START）下只查询一行表结构版本，版本一致时跳过逐表检查
+    2. 版本不一致（或首次启动）时持有表结构同步锁创建缺失的表和索引，并写入当前版本
+       （多worker同时启动：拿到锁后复查版本，其他进程已完成同步时直接跳过）
+    3. 预热连接池（DB_POOL_PREWARM），避免首批请求承担建连耗时
+    4. 执行基础数据插入脚本（可选）
     """
     try:
-        # 导入所有ORM模型（必须导入，否则无法创建表）
-        from models.db_model.core_user import CoreUser
-        from models.db_model.core_driver_ext import CoreDriverExt
-        from models.db_model.core_warehouse import CoreWarehouse
-        from models.db_model.core_order import CoreOrder
-        from models.db_model.core_inbound import CoreInbound
-        from models.db_model.core_outbound import CoreOutbound
-        from models.db_model.core_delivery_task import CoreDeliveryTask
-        from models.db_model.core_delivery_track import CoreDeliveryTrack
-        # AI模块模型
-        from models.db_model.ai_model.ai_ocr_record import AIOcrRecord
-        from models.db_model.ai_model.ai_faq_knowledge import AIFaqKnowledge
-        from models.db_model.ai_model.ai_chat_record import AIChatRecord
-        from models.db_model.ai_model.ai_sql_template import AISqlTemplate
-        from models.db_model.ai_model.ai_sql_record import AISqlRecord
-        # 系统模块模型
-        from models.db_model.system_model.sys_operation_log import SysOperationLog
-        from models.db_model.system_model.sys_statistics import SysStatistics
-
-        # 创建所有表（如果不存在）
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ 数据库表结构初始化完成")
+        import_models()
+
+        if settings.DB_FAST_START and get_schema_version() == SCHEMA_VERSION:
+            logger.info("✅ 数据库表结构版本一致（v%s），跳过建表检查", SCHEMA_VERSION)
+        else:
+            with schema_lock():
+                if settings.DB_FAST_START and get_schema_version() == SCHEMA_VERSION:
+                    logger.info("✅ 其他进程已完成表结构同步（v%s）", SCHEMA_VERSION)
+                else:
+                    sync_schema()
+                    logger.info("✅ 数据库表结构初始化完成（v%s）", SCHEMA_VERSION)
+
+        prewarm_pool(settings.DB_POOL_PREWARM)
 
         # 可选：执行基础数据插入脚本（如字典数据）
         # init_base_data()
 
     except Exception as e:
-        logger.error(f"❌ 数据库初始化失败：{str(e)}")
+        logger.error("❌ 数据库初始化失败：%s", e)
+        raise
+
+
+def get_schema_version() -> int | None:
+    """
+    查询数据库中记录的表结构版本（版本表不存在时返回None）
+    :return:
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version FROM sys_schema_version WHERE id = 1")).scalar()
+    except SQLAlchemyError:
+        return None
+
+
+@contextlib.contextmanager
+def schema_lock() -> Generator[None, None, None]:
+    """
+    表结构同步锁（跨进程互斥，MySQL GET_LOCK，连接关闭时自动释放）
+    SQLite仅用于本地测试替身，不加锁（sync_schema本身容忍其他进程并发创建的表和索引）
+    """
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                                {"name": SCHEMA_LOCK_NAME, "timeout": SCHEMA_LOCK_TIMEOUT_SECONDS}).scalar()
+        if acquired != 1:
+            raise RuntimeError(f"等待表结构同步锁超时（{SCHEMA_LOCK_TIMEOUT_SECONDS}秒）")
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": SCHEMA_LOCK_NAME})
+
+
+def sync_schema() -> None:
+    """
+    同步表结构：创建缺失的表，并为已存在的表补建缺失的索引（create_all不会给已存在的表加索引），
+    最后写入当前表结构版本（upsert）
+    不会给已存在的表加字段：模型中有、数据库中没有的字段需要迁移，检查到时抛出异常，不写入版本
+    其他进程同时创建了同一张表/索引时（未持有同步锁的场景）视为已存在，不中断启动
+    """
+    from models.db_model.system_model.sys_schema_version import SysSchemaVersion
+
+    # 逐表创建（如果不存在）
+    for table in Base.metadata.sorted_tables:
+        _create_if_missing(table, lambda: inspect(engine).has_table(table.name))
+    inspector = inspect(engine)
+    missing_columns = []
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing_columns.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+    if missing_columns:
+        raise RuntimeError(f"数据库表缺少字段（需先执行迁移脚本添加）：{', '.join(missing_columns)}")
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing and _create_if_missing(index, lambda: _has_index(index)):
+                logger.info("已补建索引：%s.%s", table.name, index.name)
+
+    with engine.begin() as conn:
+        values = {"version": SCHEMA_VERSION}
+        statement = update(SysSchemaVersion).where(SysSchemaVersion.id == 1).values(**values)
+        if conn.execute(statement).rowcount == 0:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(SysSchemaVersion).values(id=1, **values))
+            except IntegrityError:
+                # 其他进程刚插入了版本行
+                conn.execute(statement)
+
+
+def _create_if_missing(schema_item, exists) -> bool:
+    """
+    创建表或索引，已存在（包括其他进程并发创建）时跳过
+    :param schema_item: Table或Index
+    :param exists: 判断是否已存在的函数
+    :return: 是否由当前进程创建
+    """
+    if exists():
+        return False
+    try:
+        schema_item.create(bind=engine)
+        return True
+    except (OperationalError, ProgrammingError):
+        if exists():
+            return False
         raise
 
 
+def _has_index(index) -> bool:
+    """索引是否已存在"""
+    return index.name in {item["name"] for item in inspect(engine).get_indexes(index.table.name)}
+
+
+def prewarm_pool(size: int) -> None:
+    """
+    预热连接池：同时借出size个连接再归还，使连接池中保持size个已建立的连接
+    :param size: 预热连接数（不超过MYSQL_POOL_SIZE）
+    :return:
+    """
+    size = min(size, settings.MYSQL_POOL_SIZE)
+    if size <= 0:
+        return
+    for target in [engine] + replica_engines:
+        connections = []
+        try:
+            for _ in range(size):
+                connections.append(target.connect())
+        finally:
+            for connection in connections:
+                connection.close()
+    logger.info("✅ 连接池预热完成（每个库%s个连接）", size)
+
+
 def init_base_data() -> None:
     """插入基础字典数据（如订单状态、货物类型）"""
     with db_session() as db:
@@ -203,3 +582,49 @@ class BaseDAO:
             return False
         db.delete(instance)
         return True
+
+
+class AsyncBaseDAO:
+    """异步基础DAO类，封装通用CRUD操作（与BaseDAO一一对应，用于async def接口）"""
+
+    def __init__(self, model: Base):
+        self.model = model  # 传入具体ORM模型
+
+    async def get_by_id(self, db: AsyncSession, id: Any) -> Base | None:
+        """根据ID查询单条数据"""
+        return await db.get(self.model, id)
+
+    async def get_by_conditions(self, db: AsyncSession, conditions: Dict[str, Any]) -> Base | None:
+        """根据条件查询单条数据"""
+        result = await db.execute(select(self.model).filter_by(**conditions).limit(1))
+        return result.scalars().first()
+
+    async def list_by_conditions(self, db: AsyncSession, conditions: Dict[str, Any]) -> List[Base]:
+        """根据条件查询多条数据"""
+        result = await db.execute(select(self.model).filter_by(**conditions))
+        return list(result.scalars().all())
+
+    async def create(self, db: AsyncSession, data: Dict[str, Any]) -> Base:
+        """新增数据（刷新后重新加载数据库生成的字段，避免异步场景下懒加载）"""
+        instance = self.model(**data)
+        db.add(instance)
+        await db.flush()
+        await db.refresh(instance)
+        return instance
+
+    async def update(self, db: AsyncSession, instance: Base, data: Dict[str, Any]) -> Base:
+        """更新数据"""
+        for key, value in data.items():
+            if hasattr(instance, key):
+                setattr(instance, key, value)
+        await db.flush()
+        await db.refresh(instance)
+        return instance
+
+    async def delete(self, db: AsyncSession, id: Any) -> bool:
+        """物理删除（如需软删除，可自定义）"""
+        instance = await self.get_by_id(db, id)
+        if not instance:
+            return False
+        await db.delete(instance)
+        return True
@@ -13,12 +13,35 @@ class Settings:
     PROJECT_NAME = os.getenv("PROJECT_NAME", "智慧物流管理系统")
     HOST = os.getenv("HOST", "127.0.0.1")
     PORT = int(os.getenv("PORT", 8000))
+    # 关闭时等待进行中请求的最长秒数（超时后取消；SSE推送连接在收到退出信号时即关闭，不占用该时长）
+    GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", 5))
     DEBUG = os.getenv("DEBUG", "True") == "True"
+    # 快速响应模式：订单接口跳过response_model的重复校验，直接用orjson编码DAO返回的字典
+    FAST_RESPONSE_ENABLED = os.getenv("FAST_RESPONSE_ENABLED", "False") == "True"
+    # HTTP指标采集（各路由请求数/耗时分布/并发数，通过/metrics暴露为Prometheus格式）
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
 
     # MySQL配置
     MYSQL_URL = os.getenv("MYSQL_URL")
     MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 10))
     MYSQL_MAX_OVERFLOW = int(os.getenv("MYSQL_MAX_OVERFLOW", 20))
+    # 从库连接URL（可选，多个用英文逗号分隔；配置后只读查询路由到从库）
+    MYSQL_REPLICA_URLS = [url.strip() for url in os.getenv("MYSQL_REPLICA_URLS", "").split(",") if url.strip()]
+    # 读己之写窗口（秒）：用户写入后该时间内的只读查询仍走主库
+    READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    # 异步驱动连接URL（为空时由MYSQL_URL自动替换为aiomysql驱动）
+    MYSQL_ASYNC_URL = os.getenv("MYSQL_ASYNC_URL")
+    # 快速启动：表结构版本（sys_schema_version）与代码一致时跳过逐表建表检查
+    DB_FAST_START = os.getenv("DB_FAST_START", "True") == "True"
+    # 启动时预热的连接数（不超过MYSQL_POOL_SIZE，0表示不预热）
+    DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", 5))
+    # 数据库指标采集（连接池等待/SQL耗时/每请求SQL条数，见管理接口/api/v1/admin/db-stats）
+    DB_METRICS_ENABLED = os.getenv("DB_METRICS_ENABLED", "True") == "True"
+    # SQL跟踪（慢查询日志 + N+1检测，见utils.sql_tracker）
+    SQL_TRACKER_ENABLED = os.getenv("SQL_TRACKER_ENABLED", "True") == "True"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))  # 慢查询阈值（毫秒）
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))  # 同一请求中同一语句允许的最大执行次数
+    SQL_TRACKER_STRICT = os.getenv("SQL_TRACKER_STRICT", "False") == "True"  # 严格模式：出现N+1直接抛异常
 
     # # Milvus配置
     # MILVUS_URI = os.getenv("MILVUS_URI", "./milvus_demo.db")
@@ -33,14 +56,88 @@ class Settings:
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRE_SECONDS = int(os.getenv("ACCESS_TOKEN_EXPIRE_SECONDS", 86400))
     JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+    # 认证缓存配置（JWT载荷/用户状态的进程内缓存）
+    AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+    AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10000))
+
+    # 订单查询总条数缓存配置（total_mode=cached）
+    ORDER_COUNT_CACHE_TTL_SECONDS = int(os.getenv("ORDER_COUNT_CACHE_TTL_SECONDS", 30))
+    ORDER_COUNT_CACHE_MAX_SIZE = int(os.getenv("ORDER_COUNT_CACHE_MAX_SIZE", 1000))
+
+    # 批量创建订单配置
+    ORDER_BATCH_MAX_ITEMS = int(os.getenv("ORDER_BATCH_MAX_ITEMS", 5000))  # 单次请求最多订单数
+    ORDER_BATCH_CHUNK_SIZE = int(os.getenv("ORDER_BATCH_CHUNK_SIZE", 500))  # 每条多行INSERT的行数
+    ORDER_BATCH_STATUS_MAX_ITEMS = int(os.getenv("ORDER_BATCH_STATUS_MAX_ITEMS", 1000))  # 批量改状态最多订单数
+
+    # 仓库定位器增量刷新间隔（秒）：仓库或库存变化后最迟该时间内生效
+    WAREHOUSE_REFRESH_SECONDS = float(os.getenv("WAREHOUSE_REFRESH_SECONDS", 10))
+
+    # 批量派单配置
+    DISPATCH_MAX_ORDERS = int(os.getenv("DISPATCH_MAX_ORDERS", 20000))  # 单次派单最多处理的待派送订单数
+    DISPATCH_DRIVER_MAX_TASKS = int(os.getenv("DISPATCH_DRIVER_MAX_TASKS", 30))  # 单个司机待完成任务数上限
+
+    # 配送路线排序配置
+    DISTRICT_CENTROIDS_PATH = os.getenv("DISTRICT_CENTROIDS_PATH", "./data/district_centroids.csv")  # 区县中心点坐标表
+    ROUTE_MATRIX_CACHE_MAX_SIZE = int(os.getenv("ROUTE_MATRIX_CACHE_MAX_SIZE", 1000))  # 距离矩阵缓存条目数（按区县集合）
+    ROUTE_MATRIX_CACHE_TTL_SECONDS = int(os.getenv("ROUTE_MATRIX_CACHE_TTL_SECONDS", 3600))
+
+    # 配送轨迹写入配置：先追加到本地spool文件再批量写入core_delivery_track
+    TRACK_SPOOL_DIR = os.getenv("TRACK_SPOOL_DIR", "./spool/track")  # spool目录（每个worker进程一个子目录）
+    TRACK_SPOOL_FSYNC = os.getenv("TRACK_SPOOL_FSYNC", "True") == "True"  # 返回成功前fsync（关闭后只防进程崩溃，不防断电）
+    TRACK_INGEST_MAX_POINTS = int(os.getenv("TRACK_INGEST_MAX_POINTS", 1000))  # 单次请求最多轨迹点数
+    TRACK_BATCH_SIZE = int(os.getenv("TRACK_BATCH_SIZE", 2000))  # 缓冲区攒够该条数立即写入数据库
+    TRACK_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACK_FLUSH_INTERVAL_SECONDS", 1.0))  # 最长写入间隔
+    TRACK_BUFFER_MAX_POINTS = int(os.getenv("TRACK_BUFFER_MAX_POINTS", 200000))  # 未写入数据库的轨迹点上限（超出返回503）
+    TRACK_LATEST_MAX_SIZE = int(os.getenv("TRACK_LATEST_MAX_SIZE", 100000))  # 内存中保存最新轨迹的任务数（LRU）
+    TRACK_LATEST_TTL_SECONDS = float(os.getenv("TRACK_LATEST_TTL_SECONDS", 2.0))  # 内存中最新轨迹的有效期（过期后重新查库）
+    TRACK_TASK_CACHE_TTL_SECONDS = int(os.getenv("TRACK_TASK_CACHE_TTL_SECONDS", 60))  # 任务归属（司机/状态）缓存
+    TRACK_TASK_CACHE_MAX_SIZE = int(os.getenv("TRACK_TASK_CACHE_MAX_SIZE", 100000))
+    # 订单最新节点查询：订单状态和配送任务列表的缓存（订单状态修改/派单时主动失效）
+    ORDER_TASK_CACHE_TTL_SECONDS = int(os.getenv("ORDER_TASK_CACHE_TTL_SECONDS", 5))
+    ORDER_TASK_CACHE_MAX_SIZE = int(os.getenv("ORDER_TASK_CACHE_MAX_SIZE", 100000))
+
+    # 订单状态/轨迹推送配置（SSE，进程内事件中心）
+    EVENT_HUB_QUEUE_SIZE = int(os.getenv("EVENT_HUB_QUEUE_SIZE", 64))  # 每个订阅者最多缓存的事件数（满时丢弃最旧的）
+    EVENT_HUB_MAX_SUBSCRIBERS = int(os.getenv("EVENT_HUB_MAX_SUBSCRIBERS", 20000))  # 单个worker进程的推送连接上限
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))  # 无事件时的心跳间隔
+    SSE_MAX_ORDER_IDS = int(os.getenv("SSE_MAX_ORDER_IDS", 50))  # 单个连接最多订阅的订单数
+    SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", 600))  # 单个连接的最长持续时间（到期后客户端自动重连）
+
+    # 订单导出配置（服务端游标每批读取的行数）
+    ORDER_EXPORT_BATCH_SIZE = int(os.getenv("ORDER_EXPORT_BATCH_SIZE", 1000))
+
+    # 订单号生成配置（worker_id需在所有进程间唯一，取值0~31）
+    ORDER_NO_WORKER_ID = os.getenv("ORDER_NO_WORKER_ID")  # 固定worker_id（为空时自动抢占）
+    ORDER_NO_WORKER_ID_START = int(os.getenv("ORDER_NO_WORKER_ID_START", 0))  # 自动抢占的编号范围
+    ORDER_NO_WORKER_ID_END = int(os.getenv("ORDER_NO_WORKER_ID_END", 31))
+    ORDER_NO_LOCK_DIR = os.getenv("ORDER_NO_LOCK_DIR")  # 抢占用的文件锁目录（为空时使用系统临时目录）
+
+    # 密码计算进程池配置（bcrypt加密/验证）
+    PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+    PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 64))
     #
     # # 静态资源配置
     # STATIC_IMAGE_PATH = os.getenv("STATIC_IMAGE_PATH", "./static/images")
     # STATIC_HTML_PATH = os.getenv("STATIC_HTML_PATH", "./static/html")
 
+    # 操作日志（审计）配置：写操作请求异步批量写入sys_operation_log
+    AUDIT_LOG_ENABLED = os.getenv("AUDIT_LOG_ENABLED", "True") == "True"
+    AUDIT_QUEUE_MAX_SIZE = int(os.getenv("AUDIT_QUEUE_MAX_SIZE", 10000))  # 内存队列上限（超出丢弃）
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))  # 攒够该条数立即写入
+    AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", 1.0))  # 最长写入间隔
+    # 可信反向代理的IP/网段（逗号分隔），只有直连地址属于这些代理时才采用X-Forwarded-For中的客户端IP
+    AUDIT_TRUSTED_PROXIES = [proxy.strip() for proxy in os.getenv("AUDIT_TRUSTED_PROXIES", "").split(",") if proxy.strip()]
+
     # 日志配置
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE_PATH = os.getenv("LOG_FILE_PATH", "./logs/app.log")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024))  # 单个日志文件最大字节数（超出后轮转）
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 10))  # 保留的历史日志文件数
+    LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", 10000))  # 待写入日志队列上限（超出丢弃WARNING以下的日志并计数）
+    LOG_QUEUE_BLOCK_SECONDS = float(os.getenv("LOG_QUEUE_BLOCK_SECONDS", 0.1))  # 队列满时WARNING及以上日志的最长等待（超时直接写stderr）
+    # 按路由采样INFO日志（形如"/api/v1/order/query=0.1,/api/v1/order/detail=0.2"，WARNING及以上不采样）
+    LOG_SAMPLING_RULES = os.getenv("LOG_SAMPLING_RULES", "")
 
 
 # 创建配置实例
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+from sqlalchemy import select, func, update
+
+from config.database import AsyncBaseDAO, async_db_session
+from dao.order_dao import order_dao, ORDER_EVENT_COLUMNS, ORDER_READ_COLUMNS
+from models.db_model.core_order import CoreOrder
+from utils.cache_utils import order_count_cache, order_task_cache
+from utils.event_hub import event_hub
+from typing import Dict
+
+
+class AsyncOrderDAO(AsyncBaseDAO):
+    """订单异步DAO（与OrderDAO接口一致，供async def接口使用）"""
+
+    def __init__(self):
+        super().__init__(CoreOrder)
+
+    async def create_order(self, order_data: dict) -> dict:
+        """
+        创建订单（自动生成订单号）
+        :param order_data:
+        :return:
+        """
+        # 补充默认值
+        order_dao._fill_order_defaults(order_data)
+
+        async with async_db_session() as db:
+            try:
+                order = await self.create(db, order_data)
+                return order_dao._order_to_dict(order)
+            except Exception as e:
+                # 订单号重复
+                raise ValueError(f"创建订单失败：{str(e)}")
+
+    async def get_order_by_id(self, order_id: int) -> dict | None:
+        """
+        根据ID查询订单
+        :param order_id:
+        :return:
+        """
+        async with async_db_session() as db:
+            row = (await db.execute(
+                select(*ORDER_READ_COLUMNS).where(CoreOrder.id == order_id, CoreOrder.is_delete == 0)
+            )).first()
+            if not row:
+                return None
+            return order_dao._row_to_dict(row)
+
+    async def query_orders(self, query_params: dict) -> Dict:
+        """
+        分页查询订单（分页/总条数规则同OrderDAO.query_orders）
+        :param query_params:
+        :return:
+        """
+        async with async_db_session() as db:
+            conditions = order_dao._build_conditions(query_params)
+
+            # 总条数
+            total = None
+            total_mode = query_params.get("total_mode", "exact")
+            if total_mode != "none":
+                cache_key = order_dao._count_cache_key(query_params)
+                total = order_count_cache.get(cache_key) if total_mode == "cached" else None
+                if total is None:
+                    count_stmt = select(func.count()).select_from(CoreOrder).where(*conditions)
+                    total = (await db.execute(count_stmt)).scalar()
+                    if total_mode == "cached":
+                        order_count_cache.set(cache_key, total)
+
+            page_size = query_params.get("page_size", 10)
+            if query_params.get("pagination_mode") == "cursor":
+                stmt = order_dao._cursor_page_statement(conditions, query_params.get("cursor"), page_size)
+                rows = (await db.execute(stmt)).all()
+                return order_dao._cursor_page_result(rows, total, page_size)
+
+            page = query_params.get("page", 1)
+            offset = (page - 1) * page_size
+            stmt = (select(*ORDER_READ_COLUMNS).where(*conditions)
+                    .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc())
+                    .offset(offset).limit(page_size))
+            result = await db.execute(stmt)
+            order_list = [order_dao._row_to_dict(row) for row in result]
+
+            return {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "data": order_list,
+                "next_cursor": None
+            }
+
+    async def update_order_status(self, order_id: int, update_data: dict, expected_status: str) -> bool:
+        """
+        修改订单状态（比较并设置，语义同OrderDAO.update_order_status）
+        :param order_id:
+        :param update_data:
+        :param expected_status: 修改前的订单状态
+        :return: 是否修改成功
+        """
+        allowed_fields = ["order_status", "driver_id"]
+        values = {k: v for k, v in update_data.items() if k in allowed_fields}
+        values["update_time"] = update_data["update_time"] = datetime.now().replace(microsecond=0)
+
+        async with async_db_session() as db:
+            result = await db.execute(
+                update(CoreOrder)
+                .where(CoreOrder.id == order_id,
+                       CoreOrder.order_status == expected_status,
+                       CoreOrder.is_delete == 0)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.rowcount == 1
+            if updated and event_hub.has_subscribers():
+                row = (await db.execute(select(*ORDER_EVENT_COLUMNS).where(CoreOrder.id == order_id))).one()
+                order_dao._queue_status_event(db, dict(row._mapping))
+        order_task_cache.delete(order_id)
+        return updated
+
+
+# 创建DAO实例
+async_order_dao = AsyncOrderDAO()
@@ -0,0 +1,102 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from config.database import AsyncBaseDAO, async_db_session
+from models.db_model.core_user import CoreUser
+from utils.cache_utils import user_status_cache
+
+
+class AsyncUserDAO(AsyncBaseDAO):
+    """用户异步DAO（与UserDAO接口一致，供async def接口使用）"""
+
+    def __init__(self):
+        super().__init__(CoreUser)
+
+    async def create_user(self, user_data: dict) -> dict:
+        """
+        创建用户（密码由service层在进程池中加密后传入）
+        :param user_data:
+        :return:
+        """
+        async with async_db_session() as db:
+            try:
+                user = await self.create(db, user_data)
+                return user.to_dict()
+            except IntegrityError:
+                # 用户名/手机号重复
+                raise ValueError("用户名或手机号已存在")
+
+    async def get_user_by_username(self, username: str) -> dict | None:
+        """
+        通过用户名查询用户
+        :param username:
+        :return:
+        """
+        async with async_db_session() as db:
+            user = await self.get_by_conditions(db, {"username": username, "is_delete": 0})
+            if not user:
+                return None
+            return user.to_dict()
+
+    async def get_user_by_id(self, user_id: int) -> dict | None:
+        """
+        通过ID查询用户
+        :param user_id:
+        :return:
+        """
+        async with async_db_session() as db:
+            user = await self.get_by_id(db, user_id)
+            if not user:
+                return None
+            return user.to_dict()
+
+    async def is_user_active(self, user_id: int) -> bool:
+        """
+        判断用户是否存在且未删除（只查询is_delete一列）
+        :param user_id:
+        :return:
+        """
+        async with async_db_session() as db:
+            result = await db.execute(select(CoreUser.is_delete).where(CoreUser.id == user_id))
+            is_delete = result.scalar()
+            return is_delete is not None and is_delete != 1
+
+    async def update_user_info(self, user_id: int, update_data: dict) -> dict | None:
+        """
+        修改用户信息（不含密码）
+        :param user_id:
+        :param update_data:
+        :return:
+        """
+        async with async_db_session() as db:
+            user = await self.get_by_id(db, user_id)
+            if not user:
+                return None
+            # 只更新允许修改的字段
+            allowed_fields = ["phone", "real_name"]
+            update_data = {k: v for k, v in update_data.items() if k in allowed_fields}
+            user = await self.update(db, user, update_data)
+            user_dict = user.to_dict()
+        # 用户信息变更，失效认证缓存
+        user_status_cache.delete(user_id)
+        return user_dict
+
+    async def reset_password(self, user_id: int, hashed_password: str) -> bool:
+        """
+        重置密码（密码由service层在进程池中加密后传入）
+        :param user_id:
+        :param hashed_password:
+        :return:
+        """
+        async with async_db_session() as db:
+            user = await self.get_by_id(db, user_id)
+            if not user:
+                return False
+            await self.update(db, user, {"password": hashed_password})
+        # 密码变更，失效认证缓存
+        user_status_cache.delete(user_id)
+        return True
+
+
+# 创建DAO实例
+async_user_dao = AsyncUserDAO()
@@ -0,0 +1,59 @@
+from models.db_model.core_delivery_task import CoreDeliveryTask
+from models.db_model.core_order import CoreOrder
+from config.database import BaseDAO, db_session
+from config.settings import settings
+from sqlalchemy import insert, select
+from typing import Dict, List
+
+
+class DeliveryTaskDAO(BaseDAO):
+    def __init__(self):
+        super().__init__(CoreDeliveryTask)
+
+    def batch_create_tasks(self, tasks_data: List[dict]) -> int:
+        """
+        批量创建配送任务（按块执行多行INSERT）
+        :param tasks_data: 任务字典列表（各字典的字段需一致）
+        :return: 写入条数
+        """
+        chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+        with db_session() as db:
+            for start in range(0, len(tasks_data), chunk_size):
+                db.execute(insert(CoreDeliveryTask).values(tasks_data[start:start + chunk_size]))
+        return len(tasks_data)
+
+    def list_open_tasks(self, driver_id: int) -> List[dict]:
+        """
+        查询司机未完成（pending/delivering）的配送任务及收件地址（任务与订单一次联表查询）
+        :param driver_id:
+        :return: [{task_id, order_id, task_status, assign_time, order_no, receiver_name, receiver_phone,
+                   receiver_province, receiver_city, receiver_district, receiver_address}, ...]（按分配时间、任务ID排序）
+        """
+        statement = (select(CoreDeliveryTask.id.label("task_id"), CoreDeliveryTask.order_id,
+                            CoreDeliveryTask.task_status, CoreDeliveryTask.assign_time,
+                            CoreOrder.order_no, CoreOrder.receiver_name, CoreOrder.receiver_phone,
+                            CoreOrder.receiver_province, CoreOrder.receiver_city, CoreOrder.receiver_district,
+                            CoreOrder.receiver_address)
+                     .join(CoreOrder, CoreOrder.id == CoreDeliveryTask.order_id)
+                     .where(CoreDeliveryTask.driver_id == driver_id,
+                            CoreDeliveryTask.task_status.in_(("pending", "delivering")),
+                            CoreOrder.is_delete == 0)
+                     .order_by(CoreDeliveryTask.assign_time, CoreDeliveryTask.id))
+        with db_session(read_only=True) as db:
+            return [dict(row._mapping) for row in db.execute(statement)]
+
+    def get_task_owners(self, task_ids: List[int]) -> Dict[int, tuple]:
+        """
+        批量查询任务的司机、状态和所属订单（任务与订单一次联表查询，只查五列）
+        :param task_ids:
+        :return: {任务ID: (司机ID, 任务状态, 订单ID, 订单创建人ID)}
+        """
+        statement = (select(CoreDeliveryTask.id, CoreDeliveryTask.driver_id, CoreDeliveryTask.task_status,
+                            CoreDeliveryTask.order_id, CoreOrder.create_user_id)
+                     .join(CoreOrder, CoreOrder.id == CoreDeliveryTask.order_id)
+                     .where(CoreDeliveryTask.id.in_(task_ids)))
+        with db_session(read_only=True) as db:
+            return {task_id: tuple(owner) for task_id, *owner in db.execute(statement)}
+
+# 全局实例
+delivery_task_dao = DeliveryTaskDAO()
@@ -0,0 +1,63 @@
+from models.db_model.core_driver_ext import CoreDriverExt
+from models.db_model.core_order import CoreOrder
+from models.db_model.core_user import CoreUser
+from config.database import BaseDAO, db_session
+from sqlalchemy import select, func
+from typing import Dict, List
+
+
+class DriverDAO(BaseDAO):
+    def __init__(self):
+        super().__init__(CoreDriverExt)
+
+    def list_available_drivers(self, max_tasks: int) -> List[dict]:
+        """
+        查询可派单的司机（未删除的司机账号，且配送中的订单数低于上限）
+        走主库：负载需读取最新值，避免超出上限
+        :param max_tasks: 单个司机的待完成任务数上限
+        :return: [{user_id, delivery_area, task_count, efficiency}, ...]，task_count为配送中的订单数
+        """
+        load = self._delivering_counts().subquery()
+        task_count = func.coalesce(load.c.task_count, 0)
+        statement = (select(CoreDriverExt.user_id, CoreDriverExt.delivery_area,
+                            task_count.label("task_count"),
+                            func.coalesce(CoreDriverExt.efficiency, 0.0).label("efficiency"))
+                     .join(CoreUser, CoreUser.id == CoreDriverExt.user_id)
+                     .outerjoin(load, load.c.driver_id == CoreDriverExt.user_id)
+                     .where(CoreUser.role == "driver", CoreUser.is_delete == 0, task_count < max_tasks)
+                     .order_by(CoreDriverExt.user_id))
+        with db_session() as db:
+            return [dict(row._mapping) for row in db.execute(statement)]
+
+    def lock_task_counts(self, driver_ids: List[int]) -> Dict[int, int]:
+        """
+        锁定司机扩展行（SELECT ... FOR UPDATE，需在工作单元内使用）并统计其配送中的订单数
+        并发派单在锁上排队，后到的事务能看到先提交的派单结果
+        :param driver_ids:
+        :return: {司机用户ID: 配送中的订单数}，不含不存在的司机
+        """
+        with db_session() as db:
+            locked = db.execute(
+                select(CoreDriverExt.user_id).where(CoreDriverExt.user_id.in_(driver_ids)).with_for_update()
+            ).scalars().all()
+            counts = dict.fromkeys(locked, 0)
+            if locked:
+                counts.update(db.execute(self._delivering_counts(locked)).all())
+            return counts
+
+    def _delivering_counts(self, driver_ids: List[int] | None = None):
+        """
+        按司机统计配送中（delivering）的订单数（订单签收/取消后自动不再计入，无需回写计数）
+        :param driver_ids: 只统计这些司机，为空时统计全部
+        :return: SELECT driver_id, task_count
+        """
+        statement = (select(CoreOrder.driver_id, func.count().label("task_count"))
+                     .where(CoreOrder.order_status == "delivering", CoreOrder.is_delete == 0)
+                     .group_by(CoreOrder.driver_id))
+        if driver_ids is not None:
+            statement = statement.where(CoreOrder.driver_id.in_(driver_ids))
+        return statement
+
+
+# 全局实例
+driver_dao = DriverDAO()
@@ -0,0 +1,25 @@
+from models.db_model.system_model.sys_operation_log import SysOperationLog
+from config.database import BaseDAO, db_session
+from sqlalchemy import insert
+from typing import List
+
+
+class OperationLogDAO(BaseDAO):
+    def __init__(self):
+        super().__init__(SysOperationLog)
+
+    def batch_create_logs(self, logs_data: List[dict]) -> int:
+        """
+        批量写入操作日志（一条多行INSERT，一次提交）
+        :param logs_data: 日志字典列表（各字典的字段需一致）
+        :return: 写入条数
+        """
+        if not logs_data:
+            return 0
+        with db_session() as db:
+            db.execute(insert(SysOperationLog).values(logs_data))
+        return len(logs_data)
+
+
+# 全局实例
+operation_log_dao = OperationLogDAO()
@@ -1,8 +1,60 @@
+from models.db_model.core_delivery_task import CoreDeliveryTask
+from models.db_model.core_delivery_track import CoreDeliveryTrack
 from models.db_model.core_order import CoreOrder
 from config.database import BaseDAO, db_session
-from utils.order_utils import generate_order_no
-from sqlalchemy import and_, or_
-from typing import List, Dict, Optional
+from config.settings import settings
+from utils.cache_utils import order_count_cache, order_task_cache
+from utils.event_hub import event_hub, order_topic, publish_on_commit, user_topic
+from utils.order_utils import generate_order_no, generate_order_nos, encode_order_cursor, decode_order_cursor
+from sqlalchemy import and_, or_, update, select, func, insert, case
+from datetime import datetime
+from typing import List, Dict, Optional, Iterator
+
+# 订单详情/列表接口需要的列（读接口只查询这些列，直接由行元组组装字典，不构造ORM对象）
+ORDER_READ_COLUMNS = (
+    CoreOrder.id, CoreOrder.order_no,
+    CoreOrder.sender_name, CoreOrder.sender_phone, CoreOrder.sender_province, CoreOrder.sender_city,
+    CoreOrder.sender_district, CoreOrder.sender_address,
+    CoreOrder.receiver_name, CoreOrder.receiver_phone, CoreOrder.receiver_province, CoreOrder.receiver_city,
+    CoreOrder.receiver_district, CoreOrder.receiver_address,
+    CoreOrder.goods_type, CoreOrder.goods_quantity,
+    CoreOrder.order_status, CoreOrder.driver_id, CoreOrder.warehouse_id, CoreOrder.create_user_id,
+    CoreOrder.create_time, CoreOrder.update_time,
+)
+
+# 配送时间线需要的订单和任务列（最新节点查询只查这些列，不联表轨迹）
+ORDER_TASK_COLUMNS = (
+    CoreOrder.id.label("order_id"), CoreOrder.order_no, CoreOrder.order_status, CoreOrder.driver_id,
+    CoreOrder.create_user_id, CoreOrder.update_time,
+    CoreDeliveryTask.id.label("task_id"), CoreDeliveryTask.driver_id.label("task_driver_id"),
+    CoreDeliveryTask.task_status, CoreDeliveryTask.assign_time, CoreDeliveryTask.complete_time,
+    CoreDeliveryTask.delivery_notes,
+)
+# 订单状态推送事件需要的列
+ORDER_EVENT_COLUMNS = (
+    CoreOrder.id, CoreOrder.order_no, CoreOrder.order_status, CoreOrder.driver_id, CoreOrder.create_user_id,
+    CoreOrder.update_time,
+)
+# 配送时间线需要的轨迹列
+TRACK_COLUMNS = (
+    CoreDeliveryTrack.id.label("track_id"), CoreDeliveryTrack.track_node, CoreDeliveryTrack.track_time,
+    CoreDeliveryTrack.track_address,
+)
+
+
+def order_status_event(order: dict) -> dict:
+    """
+    订单状态事件数据（推送订阅的初始事件和状态变更事件格式一致）
+    :param order: ORDER_EVENT_COLUMNS对应的字典
+    :return:
+    """
+    return {
+        "order_id": order["id"],
+        "order_no": order["order_no"],
+        "order_status": order["order_status"],
+        "driver_id": order["driver_id"],
+        "update_time": order["update_time"].isoformat(" ", "seconds") if order["update_time"] else None
+    }
 
 
 class OrderDAO(BaseDAO):
@@ -16,11 +68,7 @@ class OrderDAO(BaseDAO):
         :return:
         """
         # 补充默认值
-        order_data.setdefault("order_no", generate_order_no())
-        order_data.setdefault("order_status", "pending")
-        order_data.setdefault("is_delete", 0)
-        # TODO
-        order_data["warehouse_id"] = 1  # 先默认为1号仓库，后期在仓库模块时修改为自动匹配同城市仓库
+        self._fill_order_defaults(order_data)
 
         with db_session() as db:
             try:
@@ -31,79 +79,414 @@ class OrderDAO(BaseDAO):
                 # 订单号重复
                 raise ValueError(f"创建订单失败：{str(e)}")
 
+    def batch_create_orders(self, orders_data: List[dict]) -> List[str]:
+        """
+        批量创建订单：同一事务内按块执行多行INSERT（INSERT ... VALUES (...), (...), ...）
+        任意一块失败则整体回滚
+        :param orders_data: 订单字典列表（各字典的字段需一致）
+        :return: 与orders_data一一对应的订单号列表
+        """
+        now = datetime.now().replace(microsecond=0)
+        order_nos = generate_order_nos(len(orders_data))
+        for order_data, order_no in zip(orders_data, order_nos):
+            order_data.setdefault("order_no", order_no)
+            self._fill_order_defaults(order_data)
+            # 统一写入时间，保证每行的字段一致
+            order_data.setdefault("create_time", now)
+            order_data.setdefault("update_time", now)
+
+        chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+        with db_session() as db:
+            try:
+                for start in range(0, len(orders_data), chunk_size):
+                    db.execute(insert(CoreOrder).values(orders_data[start:start + chunk_size]))
+            except Exception as e:
+                # 订单号重复等
+                raise ValueError(f"批量创建订单失败：{str(e)}")
+        return [order_data["order_no"] for order_data in orders_data]
+
+    def _fill_order_defaults(self, order_data: dict) -> dict:
+        """
+        补充订单默认值（订单号/状态/删除标记；仓库由服务层通过WarehouseLocator匹配）
+        :param order_data:
+        :return:
+        """
+        order_data.setdefault("order_no", generate_order_no())
+        order_data.setdefault("order_status", "pending")
+        order_data.setdefault("is_delete", 0)
+        order_data.setdefault("warehouse_id", None)
+        return order_data
+
     def get_order_by_id(self, order_id: int) -> dict | None:
         """
         根据ID查询订单
         :param order_id:
         :return:
         """
-        with db_session() as db:
-            order = self.get_by_conditions(db, {"id": order_id, "is_delete": 0})
-            if not order:
+        with db_session(read_only=True) as db:
+            row = db.execute(
+                select(*ORDER_READ_COLUMNS).where(CoreOrder.id == order_id, CoreOrder.is_delete == 0)
+            ).first()
+            if not row:
                 return None
-            order_dict = self._order_to_dict(order)
-            return order_dict
+            return self._row_to_dict(row)
 
     def query_orders(self, query_params: dict) -> Dict:
         """
-        分页查询订单
-        query_params: {order_no, order_status, warehouse_id, driver_id, page, page_size}
+        分页查询订单（按create_time、id倒序）
+        query_params: {order_no, order_status, warehouse_id, driver_id, page, page_size,
+                       pagination_mode, cursor, total_mode}
+        - pagination_mode=page：页码分页（OFFSET/LIMIT，兼容旧接口）
+        - pagination_mode=cursor：游标分页（WHERE (create_time, id) < 游标位置），深翻页不退化
+        - total_mode：exact-实时COUNT / cached-缓存的COUNT / none-不统计
         :param query_params:
         :return:
         """
-        with db_session() as db:
+        with db_session(read_only=True) as db:
             # 构建查询条件
-            conditions = [CoreOrder.is_delete == 0]
-            if query_params.get("order_no"):
-                conditions.append(CoreOrder.order_no == query_params["order_no"])
-            if query_params.get("order_status"):
-                conditions.append(CoreOrder.order_status == query_params["order_status"])
-            if query_params.get("warehouse_id"):
-                conditions.append(CoreOrder.warehouse_id == query_params["warehouse_id"])
-            if query_params.get("driver_id"):
-                conditions.append(CoreOrder.driver_id == query_params["driver_id"])
-            if query_params.get("create_user_id"):
-                conditions.append(CoreOrder.create_user_id == query_params["create_user_id"])
-
-            # 分页查询
-            page = query_params.get("page", 1)
+            conditions = self._build_conditions(query_params)
+            # 总条数
+            total = self._get_total(db, conditions, query_params)
+
             page_size = query_params.get("page_size", 10)
-            offset = (page - 1) * page_size
+            if query_params.get("pagination_mode") == "cursor":
+                # 游标分页：多取一条判断是否还有下一页
+                stmt = self._cursor_page_statement(conditions, query_params.get("cursor"), page_size)
+                rows = db.execute(stmt).all()
+                return self._cursor_page_result(rows, total, page_size)
 
-            # 总条数
-            total = db.query(CoreOrder).filter(and_(*conditions)).count()
-            # 分页数据
-            orders = db.query(CoreOrder).filter(and_(*conditions)).offset(offset).limit(page_size).all()
+            # 页码分页
+            page = query_params.get("page", 1)
+            offset = (page - 1) * page_size
+            stmt = (select(*ORDER_READ_COLUMNS).where(*conditions)
+                    .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc())
+                    .offset(offset).limit(page_size))
+            rows = db.execute(stmt).all()
 
             # 转换为字典列表
-            order_list = [self._order_to_dict(order) for order in orders]
+            order_list = [self._row_to_dict(row) for row in rows]
 
             return {
                 "total": total,
                 "page": page,
                 "page_size": page_size,
-                "data": order_list
+                "data": order_list,
+                "next_cursor": None
             }
 
-    def update_order_status(self, order_id: int, update_data: dict) -> dict | None:
+    def iter_orders(self, query_params: dict, batch_size: int) -> Iterator[List[dict]]:
+        """
+        流式遍历订单（服务端游标，按批返回，内存占用与总行数无关，用于全量导出）
+        query_params: {order_no, order_status, warehouse_id, driver_id, create_user_id}
+        :param query_params:
+        :param batch_size: 每批行数
+        :return: 订单字典列表的迭代器
         """
-        修改订单状态（支持关联司机ID）
+        conditions = self._build_conditions(query_params)
+        stmt = (select(*ORDER_READ_COLUMNS).where(*conditions).order_by(CoreOrder.id)
+                .execution_options(stream_results=True, max_row_buffer=batch_size))
+        with db_session(read_only=True) as db:
+            result = db.execute(stmt)
+            for rows in result.partitions(batch_size):
+                yield [self._row_to_dict(row) for row in rows]
+
+    def _build_conditions(self, query_params: dict) -> list:
+        """
+        构建订单查询条件
+        :param query_params:
+        :return:
+        """
+        conditions = [CoreOrder.is_delete == 0]
+        if query_params.get("order_no"):
+            conditions.append(CoreOrder.order_no == query_params["order_no"])
+        if query_params.get("order_status"):
+            conditions.append(CoreOrder.order_status == query_params["order_status"])
+        if query_params.get("warehouse_id"):
+            conditions.append(CoreOrder.warehouse_id == query_params["warehouse_id"])
+        if query_params.get("driver_id"):
+            conditions.append(CoreOrder.driver_id == query_params["driver_id"])
+        if query_params.get("create_user_id"):
+            conditions.append(CoreOrder.create_user_id == query_params["create_user_id"])
+        return conditions
+
+    def _get_total(self, db, conditions: list, query_params: dict) -> int | None:
+        """
+        按total_mode统计总条数
+        :param db:
+        :param conditions:
+        :param query_params:
+        :return:
+        """
+        total_mode = query_params.get("total_mode", "exact")
+        if total_mode == "none":
+            return None
+
+        count_stmt = select(func.count()).select_from(CoreOrder).where(*conditions)
+        if total_mode != "cached":
+            return db.execute(count_stmt).scalar()
+
+        cache_key = self._count_cache_key(query_params)
+        total = order_count_cache.get(cache_key)
+        if total is None:
+            total = db.execute(count_stmt).scalar()
+            order_count_cache.set(cache_key, total)
+        return total
+
+    def _count_cache_key(self, query_params: dict) -> tuple:
+        """总条数缓存key（只取筛选条件，与分页参数无关）"""
+        return tuple(query_params.get(key) for key in
+                     ("order_no", "order_status", "warehouse_id", "driver_id", "create_user_id"))
+
+    def _cursor_page_statement(self, conditions: list, cursor: str | None, page_size: int):
+        """
+        构建游标分页查询语句（游标格式错误时抛出ValueError）
+        :param conditions:
+        :param cursor: 上一页返回的next_cursor，为空表示第一页
+        :param page_size:
+        :return:
+        """
+        conditions = list(conditions)
+        if cursor:
+            last_time, last_id = decode_order_cursor(cursor)
+            conditions.append(or_(CoreOrder.create_time < last_time,
+                                  and_(CoreOrder.create_time == last_time, CoreOrder.id < last_id)))
+        return (select(*ORDER_READ_COLUMNS).where(*conditions)
+                .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc())
+                .limit(page_size + 1))
+
+    def _cursor_page_result(self, rows: list, total: int | None, page_size: int) -> Dict:
+        """
+        组装游标分页结果
+        :param rows: 查询结果行（最多page_size + 1条）
+        :param total:
+        :param page_size:
+        :return:
+        """
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = encode_order_cursor(rows[-1].create_time, rows[-1].id) if has_more else None
+        return {
+            "total": total,
+            "page": None,
+            "page_size": page_size,
+            "data": [self._row_to_dict(row) for row in rows],
+            "next_cursor": next_cursor
+        }
+
+    def update_order_status(self, order_id: int, update_data: dict, expected_status: str) -> bool:
+        """
+        修改订单状态（比较并设置：单条 UPDATE ... WHERE id=? AND order_status=?）
+        只有订单当前状态仍为expected_status时才会修改，避免"先查后改"之间被并发请求覆盖
+        update_data会回填本次写入的update_time，供调用方组装返回结果
         :param order_id:
         :param update_data:
+        :param expected_status: 修改前的订单状态
+        :return: 是否修改成功（False表示订单不存在或状态已被其他请求修改）
+        """
+        # 只更新允许修改的字段
+        allowed_fields = ["order_status", "driver_id"]
+        values = {k: v for k, v in update_data.items() if k in allowed_fields}
+        values["update_time"] = update_data["update_time"] = datetime.now().replace(microsecond=0)
+
+        with db_session() as db:
+            result = db.execute(
+                update(CoreOrder)
+                .where(CoreOrder.id == order_id,
+                       CoreOrder.order_status == expected_status,
+                       CoreOrder.is_delete == 0)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.rowcount == 1
+            if updated:
+                self._queue_status_events(db, [order_id])
+        order_task_cache.delete(order_id)
+        return updated
+
+    def _row_to_dict(self, row) -> dict:
+        """
+        查询行（ORDER_READ_COLUMNS）转字典，字段与_order_to_dict一致
+        按位置解包行元组，避免ORM对象构造和逐属性访问的开销
+        :param row:
         :return:
         """
+        (order_id, order_no,
+         sender_name, sender_phone, sender_province, sender_city, sender_district, sender_address,
+         receiver_name, receiver_phone, receiver_province, receiver_city, receiver_district, receiver_address,
+         goods_type, goods_quantity,
+         order_status, driver_id, warehouse_id, create_user_id,
+         create_time, update_time) = row
+
+        return {
+            "id": order_id,
+            "order_no": order_no,
+            # 发件人信息
+            "sender_name": sender_name,
+            "sender_phone": sender_phone,
+            "sender_address": f"{sender_province or ''}{sender_city or ''}{sender_district or ''}{sender_address or ''}".strip(),
+            # 收件人信息
+            "receiver_name": receiver_name,
+            "receiver_phone": receiver_phone,
+            "receiver_address": f"{receiver_province or ''}{receiver_city or ''}{receiver_district or ''}{receiver_address or ''}".strip(),
+            # 货物信息
+            "goods_type": goods_type,
+            "goods_quantity": goods_quantity,
+            # 状态/关联信息
+            "order_status": order_status,
+            "driver_id": driver_id,
+            "warehouse_id": warehouse_id,
+            "create_user_id": create_user_id,
+            # 时间信息（isoformat比strftime快，输出格式相同：YYYY-MM-DD HH:MM:SS）
+            "create_time": create_time.isoformat(" ", "seconds") if create_time else "",
+            "update_time": update_time.isoformat(" ", "seconds") if update_time else ""
+        }
+
+    def get_order_statuses(self, order_ids: List[int], for_update: bool = False) -> Dict[int, str]:
+        """
+        批量查询订单当前状态（只查id、order_status两列）
+        :param order_ids:
+        :param for_update: 是否加行锁（SELECT ... FOR UPDATE，需在工作单元内使用，锁持有到事务结束）
+        :return: {订单ID: 订单状态}
+        """
+        stmt = select(CoreOrder.id, CoreOrder.order_status).where(CoreOrder.id.in_(order_ids), CoreOrder.is_delete == 0)
+        if for_update:
+            stmt = stmt.with_for_update()
         with db_session() as db:
-            order = self.get_by_conditions(db, {"id": order_id, "is_delete": 0})
-            if not order:
-                return None
+            return {order_id: order_status for order_id, order_status in db.execute(stmt)}
+
+    def batch_update_order_status(self, order_ids: List[int], update_data: dict, expected_status: str) -> int:
+        """
+        批量修改订单状态（单条 UPDATE ... WHERE id IN (...) AND order_status=?）
+        update_data会回填本次写入的update_time
+        :param order_ids: 当前状态均为expected_status的订单ID
+        :param update_data:
+        :param expected_status: 修改前的订单状态
+        :return: 实际修改的行数
+        """
+        allowed_fields = ["order_status", "driver_id"]
+        values = {k: v for k, v in update_data.items() if k in allowed_fields}
+        values["update_time"] = update_data["update_time"] = datetime.now().replace(microsecond=0)
 
-            # 只更新允许修改的字段
-            allowed_fields = ["order_status", "driver_id"]
-            update_data = {k: v for k, v in update_data.items() if k in allowed_fields}
+        with db_session() as db:
+            result = db.execute(
+                update(CoreOrder)
+                .where(CoreOrder.id.in_(order_ids),
+                       CoreOrder.order_status == expected_status,
+                       CoreOrder.is_delete == 0)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                self._queue_status_events(db, order_ids)
+        for order_id in order_ids:
+            order_task_cache.delete(order_id)
+        return result.rowcount
 
-            order = self.update(db, order, update_data)
-            order_dict = self._order_to_dict(order)
-            return order_dict
+    def list_dispatch_orders(self, limit: int) -> List[dict]:
+        """
+        查询待派送（pending）订单，按创建时间正序（先下单先派），只查派单评分需要的收件地区列
+        可以走从库：写回派单结果时会加锁重新校验订单状态
+        :param limit: 最多返回的订单数
+        :return: [{id, receiver_province, receiver_city, receiver_district}, ...]
+        """
+        statement = (select(CoreOrder.id, CoreOrder.receiver_province, CoreOrder.receiver_city,
+                            CoreOrder.receiver_district)
+                     .where(CoreOrder.is_delete == 0, CoreOrder.order_status == "pending")
+                     .order_by(CoreOrder.create_time, CoreOrder.id)
+                     .limit(limit))
+        with db_session(read_only=True) as db:
+            return [dict(row._mapping) for row in db.execute(statement)]
+
+    def batch_assign_drivers(self, assignments: Dict[int, int], order_status: str, expected_status: str) -> int:
+        """
+        批量分配司机并修改订单状态（按块执行 UPDATE ... SET driver_id = CASE id ... END WHERE id IN (...) AND order_status=?）
+        :param assignments: {订单ID: 司机ID}
+        :param order_status: 目标订单状态
+        :param expected_status: 修改前的订单状态
+        :return: 实际修改的行数
+        """
+        order_ids = list(assignments)
+        now = datetime.now().replace(microsecond=0)
+        chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+        updated = 0
+        with db_session() as db:
+            for start in range(0, len(order_ids), chunk_size):
+                chunk = {order_id: assignments[order_id] for order_id in order_ids[start:start + chunk_size]}
+                result = db.execute(
+                    update(CoreOrder)
+                    .where(CoreOrder.id.in_(list(chunk)),
+                           CoreOrder.order_status == expected_status,
+                           CoreOrder.is_delete == 0)
+                    .values(driver_id=case(chunk, value=CoreOrder.id), order_status=order_status, update_time=now)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+            if updated:
+                self._queue_status_events(db, order_ids)
+        for order_id in order_ids:
+            order_task_cache.delete(order_id)
+        return updated
+
+    def get_order_snapshots(self, order_ids: List[int]) -> List[dict]:
+        """
+        批量查询订单当前状态（推送订阅建立时的初始事件，只查ORDER_EVENT_COLUMNS；走主库，避免初始状态比推送的事件旧）
+        :param order_ids:
+        :return: [{id, order_no, order_status, driver_id, create_user_id, update_time}, ...]
+        """
+        statement = select(*ORDER_EVENT_COLUMNS).where(CoreOrder.id.in_(order_ids), CoreOrder.is_delete == 0)
+        with db_session() as db:
+            return [dict(row._mapping) for row in db.execute(statement)]
+
+    def _queue_status_events(self, db, order_ids: List[int]) -> None:
+        """
+        登记订单状态变更事件（事务提交后推送给订阅了订单、创建人、司机的连接）
+        当前进程没有推送订阅者时直接跳过，不额外查询
+        :param db: 执行修改的会话（同一事务内读取修改后的状态）
+        :param order_ids: 已修改的订单ID（按块查询）
+        :return:
+        """
+        if not event_hub.has_subscribers():
+            return
+        chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+        for start in range(0, len(order_ids), chunk_size):
+            statement = select(*ORDER_EVENT_COLUMNS).where(CoreOrder.id.in_(order_ids[start:start + chunk_size]))
+            for row in db.execute(statement):
+                self._queue_status_event(db, dict(row._mapping))
+
+    @staticmethod
+    def _queue_status_event(db, order: dict) -> None:
+        """
+        登记单个订单的状态变更事件（同步/异步DAO共用）
+        :param db:
+        :param order: ORDER_EVENT_COLUMNS对应的字典
+        :return:
+        """
+        topics = [order_topic(order["id"])]
+        topics.extend(user_topic(user_id) for user_id in {order["create_user_id"], order["driver_id"]} if user_id)
+        publish_on_commit(db, topics, "order_status", order_status_event(order))
+
+    def get_order_timeline(self, order_id: int, with_tracks: bool = True) -> List[dict]:
+        """
+        查询订单的配送时间线：订单、配送任务、轨迹一次联表查询（LEFT JOIN，不经过ORM关系逐级懒加载）
+        任务按idx_task_order_time、轨迹按idx_track_task_time索引顺序读取
+        :param order_id:
+        :param with_tracks: 是否联表查询轨迹（最新节点查询只需要订单和任务）
+        :return: 每条轨迹一行（按分配时间、轨迹时间排序），订单没有任务/任务没有轨迹时对应列为None；订单不存在时返回空列表
+                 [{order_id, order_no, order_status, driver_id, create_user_id, update_time,
+                   task_id, task_driver_id, task_status, assign_time, complete_time, delivery_notes,
+                   track_id, track_node, track_time, track_address}, ...]
+        """
+        columns = ORDER_TASK_COLUMNS + TRACK_COLUMNS if with_tracks else ORDER_TASK_COLUMNS
+        statement = (select(*columns)
+                     .select_from(CoreOrder)
+                     .outerjoin(CoreDeliveryTask, CoreDeliveryTask.order_id == CoreOrder.id)
+                     .where(CoreOrder.id == order_id, CoreOrder.is_delete == 0))
+        order_by = [CoreDeliveryTask.assign_time, CoreDeliveryTask.id]
+        if with_tracks:
+            statement = statement.outerjoin(CoreDeliveryTrack, CoreDeliveryTrack.task_id == CoreDeliveryTask.id)
+            order_by += [CoreDeliveryTrack.track_time, CoreDeliveryTrack.id]
+        with db_session(read_only=True) as db:
+            return [dict(row._mapping) for row in db.execute(statement.order_by(*order_by))]
 
     def _order_to_dict(self, order: CoreOrder) -> dict:
         """
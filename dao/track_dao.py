@@ -0,0 +1,48 @@
+from models.db_model.core_delivery_task import CoreDeliveryTask
+from models.db_model.core_delivery_track import CoreDeliveryTrack
+from config.database import BaseDAO, db_session
+from config.settings import settings
+from sqlalchemy import insert, select
+from sqlalchemy.orm import aliased
+from typing import Dict, List
+
+
+class TrackDAO(BaseDAO):
+    def __init__(self):
+        super().__init__(CoreDeliveryTrack)
+
+    def batch_create_tracks(self, tracks_data: List[dict]) -> int:
+        """
+        批量写入轨迹（同一事务内按块执行多行INSERT，任意一块失败则整体回滚）
+        :param tracks_data: 轨迹字典列表（各字典的字段需一致）
+        :return: 写入条数
+        """
+        chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+        with db_session() as db:
+            for start in range(0, len(tracks_data), chunk_size):
+                db.execute(insert(CoreDeliveryTrack).values(tracks_data[start:start + chunk_size]))
+        return len(tracks_data)
+
+    def get_latest_tracks(self, task_ids: List[int]) -> Dict[int, dict]:
+        """
+        批量查询任务的最新轨迹（每个任务按track_time、id取最后一条）
+        每个任务一次关联子查询：在idx_track_task_time索引上倒序取第一条，不读取任务的其他轨迹
+        :param task_ids:
+        :return: {任务ID: {task_id, track_node, track_time, track_address, driver_id}}
+        """
+        latest = aliased(CoreDeliveryTrack)
+        latest_id = (select(latest.id)
+                     .where(latest.task_id == CoreDeliveryTask.id)
+                     .order_by(latest.track_time.desc(), latest.id.desc())
+                     .limit(1)
+                     .scalar_subquery())
+        statement = (select(CoreDeliveryTrack.task_id, CoreDeliveryTrack.track_node, CoreDeliveryTrack.track_time,
+                            CoreDeliveryTrack.track_address, CoreDeliveryTrack.driver_id)
+                     .select_from(CoreDeliveryTask)
+                     .join(CoreDeliveryTrack, CoreDeliveryTrack.id == latest_id)
+                     .where(CoreDeliveryTask.id.in_(task_ids)))
+        with db_session(read_only=True) as db:
+            return {row.task_id: dict(row._mapping) for row in db.execute(statement)}
+
+# 全局实例
+track_dao = TrackDAO()
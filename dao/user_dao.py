@@ -1,6 +1,6 @@
 from config.database import BaseDAO, db_session
 from models.db_model.core_user import CoreUser
-from utils.password_utils import hash_password
+from utils.cache_utils import user_status_cache
 from sqlalchemy.exc import IntegrityError
 
 
@@ -10,11 +10,10 @@ class UserDAO(BaseDAO):
 
     def create_user(self, user_data: dict) -> dict:
         """
-        创建用户（加密密码）
+        创建用户（密码由service层在进程池中加密后传入）
         :param user_data:
         :return:
         """
-        user_data["password"] = hash_password(user_data["password"])
         with db_session() as db:
             try:
                 user = self.create(db, user_data)
@@ -32,6 +31,8 @@ class UserDAO(BaseDAO):
         """
         with db_session() as db:
             user = self.get_by_conditions(db, {"username": username, "is_delete": 0})
+            if not user:
+                return None
             user_dict = user.to_dict()
             return user_dict
 
@@ -41,11 +42,23 @@ class UserDAO(BaseDAO):
         :param user_id:
         :return:
         """
-        with db_session() as db:
+        with db_session(read_only=True) as db:
             user = self.get_by_id(db, user_id)
+            if not user:
+                return None
             user_dict = user.to_dict()
             return user_dict
 
+    def is_user_active(self, user_id: int) -> bool:
+        """
+        判断用户是否存在且未删除（认证中间件专用，只查询is_delete一列）
+        :param user_id:
+        :return:
+        """
+        with db_session(read_only=True) as db:
+            is_delete = db.query(CoreUser.is_delete).filter(CoreUser.id == user_id).scalar()
+            return is_delete is not None and is_delete != 1
+
     def update_user_info(self, user_id: int, update_data: dict) -> dict | None:
         """
         修改用户信息（不含密码）
@@ -62,21 +75,25 @@ class UserDAO(BaseDAO):
             update_data = {k: v for k, v in update_data.items() if k in allowed_fields}
             user = self.update(db, user, update_data)
             user_dict = user.to_dict()
-            return user_dict
+        # 用户信息变更，失效认证缓存
+        user_status_cache.delete(user_id)
+        return user_dict
 
-    def reset_password(self, user_id: int, new_password: str) -> bool:
+    def reset_password(self, user_id: int, hashed_password: str) -> bool:
         """
-        重置密码（加密存储）
+        重置密码（密码由service层在进程池中加密后传入）
         :param user_id:
-        :param new_password:
+        :param hashed_password:
         :return:
         """
         with db_session() as db:
             user = self.get_by_id(db, user_id)
             if not user:
                 return False
-            user = self.update(db, user, {"password": hash_password(new_password)})
-            return True
+            user = self.update(db, user, {"password": hashed_password})
+        # 密码变更，失效认证缓存
+        user_status_cache.delete(user_id)
+        return True
 
 
 # 创建DAO实例（供service层调用）
@@ -0,0 +1,33 @@
+from models.db_model.core_warehouse import CoreWarehouse
+from config.database import BaseDAO, db_session
+from sqlalchemy import select
+from datetime import datetime
+from typing import List
+
+# 仓库定位器需要的列
+WAREHOUSE_LOCATOR_COLUMNS = (
+    CoreWarehouse.id, CoreWarehouse.province, CoreWarehouse.city, CoreWarehouse.district,
+    CoreWarehouse.capacity_limit, CoreWarehouse.current_stock, CoreWarehouse.is_delete, CoreWarehouse.update_time,
+)
+
+
+class WarehouseDAO(BaseDAO):
+    def __init__(self):
+        super().__init__(CoreWarehouse)
+
+    def list_changed_warehouses(self, since: datetime | None = None) -> List[dict]:
+        """
+        查询update_time不早于since的仓库（包含已删除的仓库，便于定位器移除；since为空时查询全部）
+        走主库：从库延迟可能导致增量刷新漏掉刚修改的仓库
+        :param since:
+        :return: [{id, province, city, district, capacity_limit, current_stock, is_delete, update_time}, ...]
+        """
+        statement = select(*WAREHOUSE_LOCATOR_COLUMNS)
+        if since is not None:
+            statement = statement.where(CoreWarehouse.update_time >= since)
+        with db_session() as db:
+            return [dict(row._mapping) for row in db.execute(statement)]
+
+
+# 全局实例
+warehouse_dao = WarehouseDAO()
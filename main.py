@@ -1,29 +1,86 @@
+import asyncio
+import signal
+import threading
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter
 from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 
-from config.database import init_db
+from config.database import init_db, dispose_async_engine
 from config.settings import settings
 from middleware.auth_middleware import auth_middleware
+from middleware.metrics_middleware import MetricsMiddleware
+from middleware.audit_middleware import AuditMiddleware
+from middleware.request_context_middleware import RequestContextMiddleware
+from service.audit_service import audit_log_writer
+from service.track_service import track_ingestor
+from service.warehouse_service import warehouse_locator
+from utils.common_utils import stop_logging
+from utils.event_hub import event_hub
+from utils.password_utils import password_pool
 
 from api.v1.user import router as user_router
 from api.v1.order import router as order_router
+from api.v1.delivery import router as delivery_router
+from api.v1.track import router as track_router
+from api.v1.admin import router as admin_router
+from api.v1.metrics import router as metrics_router
+from api.v1.async_user import router as async_user_router
+from api.v1.async_order import router as async_order_router
+
+
+def on_exit_signal(callback) -> None:
+    """
+    收到退出信号（SIGINT/SIGTERM）时先执行callback，再交给服务器（uvicorn）原有的信号处理函数
+    uvicorn收到退出信号后先等待进行中的连接结束，最后才执行lifespan的关闭阶段，
+    推送长连接需要在等待之前结束，否则会拖住关闭直到GRACEFUL_SHUTDOWN_SECONDS超时
+    :param callback: 在信号处理函数中调用（只能做线程安全的轻量操作）
+    :return:
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            callback()
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("=== 项目启动中，初始化资源 ===")
+    start = time.perf_counter()
     init_db()  # 初始化MySQL连接（创建会话池）
+    if settings.AUDIT_LOG_ENABLED:
+        audit_log_writer.start()  # 启动操作日志批量写入线程
+    warehouse_locator.start()  # 加载仓库索引并启动增量刷新线程
+    track_ingestor.start()  # 恢复spool中未写入的轨迹并启动批量写入线程
+    loop = asyncio.get_running_loop()
+    event_hub.start(loop)  # 绑定事件循环（其他线程发布的推送事件交给事件循环投递）
+    on_exit_signal(lambda: loop.call_soon_threadsafe(event_hub.stop))  # 收到退出信号时立即关闭推送连接
     # init_milvus()  # 初始化Milvus向量库（创建集合/加载知识库）
-    print("=== 资源初始化完成，项目启动成功 ===")
+    print(f"=== 资源初始化完成，项目启动成功（耗时{time.perf_counter() - start:.2f}秒） ===")
 
     yield
 
     # 销毁阶段：释放资源（如关闭数据库连接、向量库连接）
     print("=== 项目关闭中，释放资源 ===")
     # 可添加：关闭数据库会话池、Milvus客户端等逻辑
+    event_hub.stop()  # 停止投递推送事件（推送连接已在收到退出信号时关闭，这里兜底未经信号触发的关闭）
+    await run_in_threadpool(password_pool.shutdown)  # 关闭密码计算进程池（等待子进程退出，不阻塞事件循环）
+    await run_in_threadpool(warehouse_locator.stop)  # 停止仓库索引刷新线程（等待进行中的刷新结束）
+    await run_in_threadpool(track_ingestor.stop)  # 写完缓冲区中剩余的轨迹（线程池中等待数据库写入）
+    await run_in_threadpool(audit_log_writer.stop)  # 写完队列中剩余的操作日志（线程池中等待，不阻塞事件循环）
+    await dispose_async_engine()  # 关闭异步引擎连接池
     print("=== 资源释放完成，项目关闭成功 ===")
+    stop_logging()  # 写完队列中剩余的日志
 
 
 app = FastAPI(
@@ -36,13 +93,31 @@ app = FastAPI(
 
 # 权限拦截中间件（验证JWT令牌）
 app.middleware("http")(auth_middleware)
+# 请求上下文中间件（在权限中间件外层，响应体发送完毕后记录每请求数据库指标）
+app.add_middleware(RequestContextMiddleware)
+# 操作日志中间件（在权限中间件外层，请求结束后从request.state读取操作人）
+if settings.AUDIT_LOG_ENABLED:
+    app.add_middleware(AuditMiddleware)
+# 指标中间件（最后注册，位于最外层，被权限中间件拦截的请求也会被统计）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # 注册路由
 # 核心业务模块路由
 app.include_router(user_router, prefix="/api/v1/user", tags=["用户与权限管理"])
 app.include_router(order_router, prefix="/api/v1/order", tags=["订单管理"])
+app.include_router(delivery_router, prefix="/api/v1/delivery", tags=["配送管理"])
+app.include_router(track_router, prefix="/api/v1/track", tags=["配送轨迹"])
+# 系统管理模块路由
+app.include_router(admin_router, prefix="/api/v1/admin", tags=["系统管理"])
+# Prometheus指标（/metrics，不在接口文档中展示）
+app.include_router(metrics_router, include_in_schema=False)
+# 异步版接口路由（与同步版并存，逐个接口迁移）
+app.include_router(async_user_router, prefix="/api/v1/async/user", tags=["用户与权限管理（异步）"])
+app.include_router(async_order_router, prefix="/api/v1/async/order", tags=["订单管理（异步）"])
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host=settings.HOST, port=settings.PORT)
+    uvicorn.run("main:app", host=settings.HOST, port=settings.PORT,
+                timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS)
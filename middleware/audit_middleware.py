@@ -0,0 +1,121 @@
+"""
+操作日志（审计）中间件（纯ASGI实现）：
+写操作（POST/PUT/PATCH/DELETE）请求结束后，采集操作模块（路由标签）、操作类型、操作人、IP，
+提交到异步批量写入器（service.audit_service），接口响应不等待日志写入
+"""
+import ipaddress
+from datetime import datetime
+
+from config.settings import settings
+from service.audit_service import audit_log_writer
+
+# 请求方法 -> 操作类型
+OPERATION_TYPES = {"POST": "新增", "PUT": "修改", "PATCH": "修改", "DELETE": "删除"}
+# 不记录操作日志的路径（登录/注册无操作人，且请求量大；轨迹上报为高频写入，本身已落库）
+EXCLUDE_PATHS = {"/api/v1/user/register", "/api/v1/user/login",
+                 "/api/v1/async/user/register", "/api/v1/async/user/login",
+                 "/api/v1/track/ingest"}
+# 可信反向代理网段（只有来自这些地址的X-Forwarded-For才可信）
+TRUSTED_PROXY_NETWORKS = tuple(ipaddress.ip_network(proxy, strict=False) for proxy in settings.AUDIT_TRUSTED_PROXIES)
+
+
+class AuditMiddleware:
+    """
+    操作日志中间件（需注册在权限中间件外层：操作人ID取自权限中间件写入的request.state）
+    用法：app.add_middleware(AuditMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in OPERATION_TYPES or scope["path"] in EXCLUDE_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # 未发送响应头就抛出异常时按500记录
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._submit(scope, status_code)
+
+    @staticmethod
+    def _submit(scope, status_code: int) -> None:
+        """
+        组装操作日志并提交到写入器
+        :param scope:
+        :param status_code:
+        :return:
+        """
+        route = scope.get("route")
+        if route is None:
+            # 未匹配到路由（404）或被权限中间件拦截（401），不记录
+            return
+        tags = getattr(route, "tags", None)
+        summary = getattr(route, "summary", None) or getattr(route, "name", "")
+        audit_log_writer.submit({
+            "user_id": _state_value(scope, "user_id"),
+            "operation_module": (tags[0] if tags else "其他")[:50],
+            "operation_type": OPERATION_TYPES[scope["method"]],
+            "operation_content": f"{summary} {scope['method']} {scope['path']} 状态码{status_code}",
+            "ip_address": _client_ip(scope),
+            "operation_time": datetime.now().replace(microsecond=0)
+        })
+
+
+def _state_value(scope, key: str):
+    """
+    读取request.state中的值（request.state底层存放在scope["state"]中，新旧版本分别为dict/State对象）
+    :param scope:
+    :param key:
+    :return:
+    """
+    state = scope.get("state")
+    if state is None:
+        return None
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+def _client_ip(scope) -> str | None:
+    """
+    获取客户端IP：直连地址是可信代理时，从X-Forwarded-For末尾向前跳过可信代理，取第一个非代理地址；
+    否则取直连地址（X-Forwarded-For可被客户端任意伪造）
+    :param scope:
+    :return:
+    """
+    client = scope.get("client")
+    client_ip = client[0] if client else None
+    if not _is_trusted_proxy(client_ip):
+        return client_ip
+    forwarded = [address.strip()
+                 for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"
+                 for address in value.decode("latin-1").split(",")]
+    forwarded = [address for address in forwarded if address]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address):
+            return address[:50]
+    return forwarded[0][:50] if forwarded else client_ip
+
+
+def _is_trusted_proxy(address: str | None) -> bool:
+    """
+    地址是否属于可信反向代理（AUDIT_TRUSTED_PROXIES）
+    :param address:
+    :return:
+    """
+    if not address or not TRUSTED_PROXY_NETWORKS:
+        return False
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
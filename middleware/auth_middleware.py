@@ -1,21 +1,57 @@
+import time
+
 from fastapi import Request, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
+from config.settings import settings
 from dao.user_dao import user_dao
+from utils.cache_utils import token_cache, user_status_cache
 from utils.jwt_utils import verify_access_token
+from utils.request_context import (RequestContext, get_request_context, parse_last_write,
+                                   LAST_WRITE_COOKIE, LAST_WRITE_HEADER)
 
 
 async def auth_middleware(request: Request, call_next):
     """
     JWT权限中间件：
     1. 排除无需校验的接口（登录/注册/健康检查）
-    2. 校验令牌有效性
-    3. 将用户信息存入request.state
+    2. 校验令牌有效性（已验证的载荷走缓存，避免重复解码）
+    3. 校验用户状态（走缓存，未命中时才查库）
+    4. 将用户信息存入request.state
+    5. 补充请求上下文（由外层RequestContextMiddleware创建）：用户ID、客户端携带的最近写入时间
+    6. 本次请求写过主库时，通过Cookie和响应头下发最近写入时间（其他worker进程据此判断读己之写）
+    :param request:
+    :param call_next:
+    :return:
+    """
+    context = get_request_context()
+    if context is None:
+        # 未注册RequestContextMiddleware（如单独测试本中间件）
+        context = RequestContext(route=f"{request.method} {request.url.path}")
+    context.last_write = parse_last_write(request.headers.get(LAST_WRITE_HEADER)
+                                          or request.cookies.get(LAST_WRITE_COOKIE))
+    client_last_write = context.last_write
+    response = await _authenticate_and_call(request, call_next, context)
+    if context.last_write != client_last_write:
+        value = f"{context.last_write:.3f}"
+        response.headers[LAST_WRITE_HEADER] = value
+        response.set_cookie(LAST_WRITE_COOKIE, value, max_age=settings.READ_YOUR_WRITES_SECONDS,
+                            httponly=True, samesite="lax")
+    return response
+
+
+async def _authenticate_and_call(request: Request, call_next, context: RequestContext):
+    """
+    令牌/用户状态校验通过后继续处理请求
     :param request:
     :param call_next:
+    :param context: 当前请求上下文（校验通过后写入user_id）
     :return:
     """
     # 无需校验的路径
-    exclude_paths = ["/api/v1/user/register", "/api/v1/user/login", "/health", "/docs", "/openapi.json"]
+    exclude_paths = ["/api/v1/user/register", "/api/v1/user/login",
+                     "/api/v1/async/user/register", "/api/v1/async/user/login",
+                     "/health", "/metrics", "/docs", "/openapi.json"]
     if request.url.path in exclude_paths:
         return await call_next(request)
 
@@ -36,23 +72,31 @@ async def auth_middleware(request: Request, call_next):
         )
     token = parts[1]
 
-    # 校验令牌
-    payload = verify_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="令牌已过期或无效")
+    # 校验令牌（优先读缓存）
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = verify_access_token(token)
+        if not payload:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="令牌已过期或无效")
+        # 缓存有效期不能超过令牌本身的剩余有效期
+        token_cache.set(token, payload, ttl=payload["exp"] - time.time())
 
-    # 验证用户是否存在
+    # 验证用户是否存在（优先读缓存，未命中时在线程池中查库，避免阻塞事件循环）
     user_id = int(payload["sub"])
-    user = user_dao.get_user_by_id(user_id)
-    if not user or user.get("is_delete") == 1:
+    is_active = user_status_cache.get(user_id)
+    if is_active is None:
+        is_active = await run_in_threadpool(user_dao.is_user_active, user_id)
+        user_status_cache.set(user_id, is_active)
+    if not is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不存在或已删除")
 
     # 将用户信息存入request.state（供接口层使用）
     request.state.user_id = user_id
     request.state.username = payload["username"]
     request.state.role = payload["role"]
+    # 请求上下文（供DAO层读写分离判断读己之写等使用）
+    context.user_id = user_id
 
     # 继续处理请求
-    response = await call_next(request)
-    return response
+    return await call_next(request)
 
@@ -0,0 +1,157 @@
+"""
+HTTP指标中间件（纯ASGI实现，不经过BaseHTTPMiddleware的请求/响应包装）：
+按"请求方法 + 路由模板"统计请求数（按状态码）、耗时分布、并发中请求数
+路由模板取自路由定义（如/api/v1/order/detail/{order_id}），不使用原始路径，避免标签基数膨胀
+"""
+import threading
+import time
+
+from starlette.routing import Match
+
+from utils.metrics_utils import Histogram, LATENCY_BUCKETS, format_labels, render_histogram
+
+# 未匹配到任何路由的请求（404/扫描请求）统一归入此标签
+UNMATCHED_ROUTE = "unmatched"
+# 作为标签的请求方法，其余（客户端可任意构造的方法名）统一归入OTHER，避免标签基数膨胀
+STANDARD_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+OTHER_METHOD = "OTHER"
+
+
+class RouteMetrics:
+    """单个路由（方法 + 路由模板）的指标"""
+    __slots__ = ("status_counts", "latency", "in_flight")
+
+    def __init__(self):
+        self.status_counts: dict[int, int] = {}  # 状态码 -> 请求数
+        self.latency = Histogram(LATENCY_BUCKETS)  # 请求耗时（秒）
+        self.in_flight = 0  # 处理中的请求数
+
+
+class HttpMetrics:
+    """HTTP指标汇总（全局单例http_metrics）"""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def get_route(self, method: str, route: str) -> RouteMetrics:
+        """
+        获取（不存在时创建）路由指标
+        :param method: 请求方法（非标准方法归入OTHER）
+        :param route: 路由模板
+        :return:
+        """
+        key = (method if method in STANDARD_METHODS else OTHER_METHOD, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._routes.setdefault(key, RouteMetrics())
+        return metrics
+
+    def stats(self) -> list[dict]:
+        """各路由统计（供管理接口查看）"""
+        with self._lock:
+            items = list(self._routes.items())
+        return [
+            {
+                "method": method,
+                "route": route,
+                "status_counts": dict(metrics.status_counts),
+                "in_flight": metrics.in_flight,
+                "latency_seconds": metrics.latency.snapshot()
+            }
+            for (method, route), metrics in sorted(items)
+        ]
+
+    def render_prometheus(self) -> list[str]:
+        """渲染为Prometheus文本格式的样本行"""
+        with self._lock:
+            items = sorted(self._routes.items())
+        lines = ["# HELP http_requests_total 请求总数（按方法/路由模板/状态码）",
+                 "# TYPE http_requests_total counter"]
+        for (method, route), metrics in items:
+            for status_code, count in sorted(metrics.status_counts.items()):
+                labels = format_labels({"method": method, "route": route, "status": status_code})
+                lines.append(f"http_requests_total{labels} {count}")
+
+        lines += ["# HELP http_request_duration_seconds 请求耗时（秒）",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), metrics in items:
+            lines += render_histogram("http_request_duration_seconds",
+                                      {"method": method, "route": route}, metrics.latency)
+
+        lines += ["# HELP http_requests_in_flight 处理中的请求数",
+                  "# TYPE http_requests_in_flight gauge"]
+        for (method, route), metrics in items:
+            labels = format_labels({"method": method, "route": route})
+            lines.append(f"http_requests_in_flight{labels} {metrics.in_flight}")
+        return lines
+
+
+# 全局HTTP指标
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    """
+    纯ASGI指标中间件（注册在最外层，401/500等被其他中间件拦截的请求也会被统计）
+    用法：app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # 无路径参数的路由：原始路径 -> 路由模板（数量以路由定义为上限，不随请求增长）
+        self._static_routes: dict[tuple[str, str], str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        metrics = http_metrics.get_route(method, self._resolve_route(scope))
+        status_code = 500  # 未发送响应头就抛出异常时按500统计
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 流式响应（如订单导出）在响应体发送完毕后才计时结束
+            metrics.latency.observe(time.perf_counter() - start)
+            metrics.status_counts[status_code] = metrics.status_counts.get(status_code, 0) + 1
+            metrics.in_flight -= 1
+
+    def _resolve_route(self, scope) -> str:
+        """
+        解析请求对应的路由模板（与路由器相同的匹配逻辑，方法不匹配的405请求也归入该路由）
+        :param scope:
+        :return:
+        """
+        method = scope["method"]
+        key = (method if method in STANDARD_METHODS else OTHER_METHOD, scope["path"])
+        route_path = self._static_routes.get(key)
+        if route_path is not None:
+            return route_path
+
+        partial = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                route_path = route.path
+                break
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        else:
+            route_path = partial
+        if route_path is None:
+            return UNMATCHED_ROUTE
+        if "{" not in route_path:
+            self._static_routes[key] = route_path
+        return route_path
@@ -0,0 +1,41 @@
+"""
+请求上下文中间件（纯ASGI实现）：
+为每个请求创建RequestContext（读写分离判断读己之写、统计每请求SQL条数/耗时），
+在最后一个响应体消息发送之后才记录每请求数据库指标：流式响应（如订单导出）在发送响应体期间执行的SQL也计入本次请求
+"""
+from utils.db_metrics import db_metrics
+from utils.request_context import RequestContext, set_request_context, reset_request_context
+
+
+class RequestContextMiddleware:
+    """
+    请求上下文中间件（需注册在权限中间件外层：权限中间件向当前上下文写入user_id）
+    用法：app.add_middleware(RequestContextMiddleware)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = RequestContext(route=f"{scope['method']} {scope['path']}")
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not recorded:
+                recorded = True
+                db_metrics.record_request(context)
+
+        context_token = set_request_context(context)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_context(context_token)
+            if not recorded:
+                # 未发送完响应体就结束（异常/客户端断开）
+                db_metrics.record_request(context)
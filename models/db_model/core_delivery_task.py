@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BIGINT, DATETIME, VARCHAR, ForeignKey
+from sqlalchemy import Column, BIGINT, DATETIME, VARCHAR, ForeignKey, Index
 from sqlalchemy.dialects.mysql import ENUM
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -7,6 +7,12 @@ from config.database import Base
 
 class CoreDeliveryTask(Base):
     __tablename__ = "core_delivery_task"
+    __table_args__ = (
+        # 订单的配送任务（时间线/最新节点查询：按order_id等值，分配时间排序）
+        Index("idx_task_order_time", "order_id", "assign_time", "id"),
+        # 司机未完成的任务（配送路线：按driver_id、task_status等值，分配时间排序）
+        Index("idx_task_driver_status", "driver_id", "task_status", "assign_time", "id"),
+    )
 
     id = Column(BIGINT, primary_key=True, autoincrement=True, comment="任务ID")
     order_id = Column(BIGINT, ForeignKey("core_order.id", ondelete="CASCADE"), nullable=False, comment="关联订单ID")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BIGINT, VARCHAR, DATETIME, ForeignKey
+from sqlalchemy import Column, BIGINT, VARCHAR, DATETIME, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config.database import Base
@@ -6,6 +6,10 @@ from config.database import Base
 
 class CoreDeliveryTrack(Base):
     __tablename__ = "core_delivery_track"
+    __table_args__ = (
+        # 任务的轨迹时间线/最新轨迹（按task_id等值，track_time、id排序，不需要额外排序）
+        Index("idx_track_task_time", "task_id", "track_time", "id"),
+    )
 
     id = Column(BIGINT, primary_key=True, autoincrement=True, comment="轨迹ID")
     task_id = Column(BIGINT, ForeignKey("core_delivery_task.id", ondelete="CASCADE"), nullable=False,
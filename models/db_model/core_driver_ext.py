@@ -10,6 +10,7 @@ class CoreDriverExt(Base):
     user_id = Column(BIGINT, ForeignKey("core_user.id", ondelete="CASCADE"), nullable=False, comment="关联用户ID")
     car_no = Column(VARCHAR(20), nullable=True, comment="车牌号")
     delivery_area = Column(VARCHAR(100), nullable=True, comment="常配送区域（如：上海-浦东）")
+    # 派单负载按配送中订单实时统计（DriverDAO），该字段不再累加维护
     task_count = Column(INT, default=0, comment="待完成任务数")
     efficiency = Column(FLOAT, default=0.0, comment="配送效率（完成率）")
 
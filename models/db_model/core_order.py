@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BIGINT, VARCHAR, INT, DATETIME, ForeignKey
+from sqlalchemy import Column, BIGINT, VARCHAR, INT, DATETIME, ForeignKey, Index
 from sqlalchemy.dialects.mysql import ENUM, TINYINT
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -7,6 +7,21 @@ from config.database import Base
 
 class CoreOrder(Base):
     __tablename__ = "core_order"
+    # 组合索引（对应OrderDAO.query_orders的查询形态：等值条件在前，排序键create_time、id在后）
+    __table_args__ = (
+        # 管理员无筛选条件的列表/游标翻页
+        Index("idx_order_delete_time", "is_delete", "create_time", "id"),
+        # 按订单状态筛选
+        Index("idx_order_status_time", "is_delete", "order_status", "create_time", "id"),
+        # 司机角色（强制driver_id过滤）
+        Index("idx_order_driver_time", "driver_id", "is_delete", "create_time", "id"),
+        # 司机配送中的订单数（派单负载：DriverDAO按driver_id、order_status计数）
+        Index("idx_order_driver_status", "driver_id", "order_status", "is_delete"),
+        # 普通用户角色（强制create_user_id过滤）
+        Index("idx_order_creator_time", "create_user_id", "is_delete", "create_time", "id"),
+        # 按仓库筛选
+        Index("idx_order_warehouse_time", "warehouse_id", "is_delete", "create_time", "id"),
+    )
 
     id = Column(BIGINT, primary_key=True, autoincrement=True, comment="订单ID")
     order_no = Column(VARCHAR(30), unique=True, nullable=False, comment="订单号（时间戳+随机数）")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BIGINT, VARCHAR, INT, DATETIME, ForeignKey
+from sqlalchemy import Column, BIGINT, VARCHAR, INT, DATETIME, ForeignKey, Index
 from sqlalchemy.dialects.mysql import TINYINT
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -7,6 +7,10 @@ from config.database import Base
 
 class CoreWarehouse(Base):
     __tablename__ = "core_warehouse"
+    __table_args__ = (
+        # 仓库定位器按update_time增量刷新（见WarehouseLocator）
+        Index("idx_warehouse_update_time", "update_time"),
+    )
 
     id = Column(BIGINT, primary_key=True, autoincrement=True, comment="仓库ID")
     warehouse_name = Column(VARCHAR(50), nullable=False, comment="仓库名称")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, INT, DATETIME
+from sqlalchemy.sql import func
+from config.database import Base
+
+
+class SysSchemaVersion(Base):
+    __tablename__ = "sys_schema_version"
+
+    id = Column(INT, primary_key=True, comment="固定为1（单行表）")
+    version = Column(INT, nullable=False, comment="当前表结构版本（对应config.database.SCHEMA_VERSION）")
+    update_time = Column(DATETIME, default=func.now(), onupdate=func.now(), comment="更新时间")
+
+    def __repr__(self):
+        return f"<SysSchemaVersion(version={self.version})>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "version": self.version,
+            "update_time": self.update_time.strftime("%Y-%m-%d %H:%M:%S") if self.update_time else None
+        }
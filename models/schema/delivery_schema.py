@@ -0,0 +1,94 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+# 配送路线查询请求模型
+class DeliveryRouteRequest(BaseModel):
+    driver_id: Optional[int] = Field(None, description="司机ID（司机只能查询自己，可不传；管理员必填）")
+    start_lng: Optional[float] = Field(None, ge=-180, le=180, description="起点经度（司机当前位置）")
+    start_lat: Optional[float] = Field(None, ge=-90, le=90, description="起点纬度（司机当前位置）")
+
+
+# 配送路线中的任务
+class DeliveryRouteTask(BaseModel):
+    task_id: int
+    order_id: int
+    order_no: str
+    task_status: str
+    receiver_name: Optional[str] = None
+    receiver_phone: Optional[str] = None
+    receiver_address: Optional[str] = None
+
+
+# 配送路线站点（同一区县的任务）
+class DeliveryRouteStop(BaseModel):
+    sequence: int  # 访问顺序（从1开始）
+    province: Optional[str] = None
+    city: Optional[str] = None
+    district: Optional[str] = None
+    lng: float  # 区县中心点经度
+    lat: float  # 区县中心点纬度
+    leg_distance_km: float  # 与上一站点（或起点）的直线距离
+    tasks: List[DeliveryRouteTask]
+
+
+# 配送路线响应模型
+class DeliveryRouteResponse(BaseModel):
+    driver_id: int
+    task_count: int
+    stop_count: int
+    total_distance_km: float
+    stops: List[DeliveryRouteStop]
+    unlocated_tasks: List[DeliveryRouteTask]  # 坐标表中找不到收件区县/城市的任务（排在路线末尾）
+
+
+# 配送时间线中的轨迹节点
+class DeliveryTimelineTrack(BaseModel):
+    track_id: int
+    track_node: Optional[str] = None
+    track_time: Optional[str] = None
+    track_address: Optional[str] = None
+
+
+# 订单的配送任务
+class DeliveryTaskInfo(BaseModel):
+    task_id: int
+    driver_id: int
+    task_status: str
+    assign_time: Optional[str] = None
+    complete_time: Optional[str] = None
+    delivery_notes: Optional[str] = None
+
+
+# 配送时间线中的任务
+class DeliveryTimelineTask(DeliveryTaskInfo):
+    tracks: List[DeliveryTimelineTrack]  # 按轨迹时间正序
+
+
+# 订单配送时间线响应模型
+class DeliveryTimelineResponse(BaseModel):
+    order_id: int
+    order_no: str
+    order_status: str
+    driver_id: Optional[int] = None
+    update_time: Optional[str] = None
+    tasks: List[DeliveryTimelineTask]  # 按分配时间正序
+
+
+# 订单最新轨迹节点
+class DeliveryLatestTrack(BaseModel):
+    task_id: int
+    track_node: Optional[str] = None
+    track_time: Optional[str] = None
+    track_address: Optional[str] = None
+
+
+# 订单最新状态响应模型（跟踪页轮询）
+class DeliveryLatestResponse(BaseModel):
+    order_id: int
+    order_no: str
+    order_status: str
+    driver_id: Optional[int] = None
+    update_time: Optional[str] = None
+    task: Optional[DeliveryTaskInfo] = None  # 最近分配的任务
+    latest_track: Optional[DeliveryLatestTrack] = None
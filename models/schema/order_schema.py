@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Literal, List
+from typing import Optional, Literal, List, Dict, Any
 import re
 from datetime import datetime
 
+from config.settings import settings
+
 # 订单状态枚举
 OrderStatus = Literal["pending", "delivering", "signed", "cancelled"]
 
@@ -65,26 +67,127 @@ class OrderCreateRequest(BaseModel):
         return v
 
 
+# 批量创建订单请求模型（逐条校验，单条校验失败不影响其他订单）
+class OrderBatchCreateRequest(BaseModel):
+    # 请求体按原始字典接收（单条校验失败不导致整个请求422，由Service逐条校验并返回失败原因），
+    # OpenAPI文档中每项的结构与创建订单接口一致
+    items: List[Dict[str, Any]] = Field(..., description="订单列表（每项字段同创建订单接口）",
+                                        json_schema_extra={"items": OrderCreateRequest.model_json_schema()})
+
+    @validator("items")
+    def validate_items(cls, v):
+        if not v:
+            raise ValueError("订单列表不能为空")
+        if len(v) > settings.ORDER_BATCH_MAX_ITEMS:
+            raise ValueError(f"单次最多创建{settings.ORDER_BATCH_MAX_ITEMS}个订单")
+        return v
+
+
+# 批量创建订单单项结果
+class OrderBatchItemResult(BaseModel):
+    index: int  # 在请求items中的下标
+    success: bool
+    order_no: Optional[str] = None
+    error: Optional[str] = None  # 失败原因（校验错误）
+
+
+# 批量创建订单响应模型
+class OrderBatchCreateResponse(BaseModel):
+    total: int
+    success_count: int
+    failed_count: int
+    results: List[OrderBatchItemResult]
+
+
 # 订单状态修改请求模型
 class OrderStatusUpdateRequest(BaseModel):
     order_status: OrderStatus = Field(description="订单状态")
     driver_id: Optional[int] = Field(None, description="关联司机ID（仅状态为delivering时必填）")
 
-    @validator("driver_id")
+    @validator("driver_id", always=True)  # always：未传driver_id时也要校验
+    def validate_driver_id(cls, v, values):
+        if values.get("order_status") == "delivering" and not v:
+            raise ValueError("订单状态改为配送中时，必须指定司机ID")
+        return v
+
+
+# 批量修改订单状态请求模型
+class OrderBatchStatusUpdateRequest(BaseModel):
+    order_ids: List[int] = Field(..., description="订单ID列表")
+    order_status: OrderStatus = Field(description="目标订单状态")
+    driver_id: Optional[int] = Field(None, description="关联司机ID（仅状态为delivering时必填）")
+
+    @validator("order_ids")
+    def validate_order_ids(cls, v):
+        if not v:
+            raise ValueError("订单ID列表不能为空")
+        if len(v) > settings.ORDER_BATCH_STATUS_MAX_ITEMS:
+            raise ValueError(f"单次最多修改{settings.ORDER_BATCH_STATUS_MAX_ITEMS}个订单")
+        # 去重并保持原顺序
+        return list(dict.fromkeys(v))
+
+    @validator("driver_id", always=True)  # always：未传driver_id时也要校验
     def validate_driver_id(cls, v, values):
         if values.get("order_status") == "delivering" and not v:
             raise ValueError("订单状态改为配送中时，必须指定司机ID")
         return v
 
 
+# 批量修改订单状态被拒绝的订单
+class OrderBatchStatusRejected(BaseModel):
+    order_id: int
+    reason: str
+
+
+# 批量修改订单状态响应模型
+class OrderBatchStatusUpdateResponse(BaseModel):
+    transitioned: List[int]  # 修改成功的订单ID
+    rejected: List[OrderBatchStatusRejected]  # 被拒绝的订单及原因
+
+
+# 批量派单请求模型
+class OrderAutoDispatchRequest(BaseModel):
+    dry_run: bool = Field(default=False, description="只计算派单方案，不写回")
+
+
+# 批量派单响应模型
+class OrderAutoDispatchResponse(BaseModel):
+    dry_run: bool
+    order_count: int  # 参与派单的待派送订单数
+    driver_count: int  # 可派单司机数
+    planned_count: int  # 方案中分配到司机的订单数
+    assigned_count: int  # 实际写回的订单数（dry_run时同planned_count）
+    unassigned_count: int  # 未分配的订单数（收件城市没有可用司机）
+    district_match_count: int  # 分配给同区县司机的订单数
+    city_match_count: int  # 分配给同城市其他区县司机的订单数
+    driver_used_count: int
+    load_seconds: float  # 读取订单/司机耗时
+    plan_seconds: float  # 评分与求解耗时
+    write_seconds: float  # 写回耗时
+
+
 # 订单查询筛选条件
 class OrderQueryRequest(BaseModel):
     order_no: Optional[str] = Field(None, description="订单号")
     order_status: Optional[OrderStatus] = Field(None, description="订单状态")
     warehouse_id: Optional[int] = Field(None, description="仓库ID")
     driver_id: Optional[int] = Field(None, description="司机ID")
-    page: int = Field(default=1, ge=1, description="页码")
+    page: int = Field(default=1, ge=1, description="页码（仅页码分页使用）")
     page_size: int = Field(default=10, ge=1, le=50, description="每页条数")
+    pagination_mode: Literal["page", "cursor"] = Field(default="page",
+                                                       description="分页方式：page-页码分页 / cursor-游标分页")
+    cursor: Optional[str] = Field(None, description="游标（上一页返回的next_cursor，第一页不传）")
+    total_mode: Literal["exact", "cached", "none"] = Field(default="exact",
+                                                           description="总条数：exact-实时统计 / cached-缓存统计 / none-不统计")
+
+
+# 订单导出筛选条件
+class OrderExportRequest(BaseModel):
+    format: Literal["ndjson", "csv"] = Field(default="ndjson", description="导出格式：ndjson / csv")
+    order_no: Optional[str] = Field(None, description="订单号")
+    order_status: Optional[OrderStatus] = Field(None, description="订单状态")
+    warehouse_id: Optional[int] = Field(None, description="仓库ID")
+    driver_id: Optional[int] = Field(None, description="司机ID")
 
 
 # 订单详情响应模型
@@ -118,7 +221,8 @@ class OrderDetailResponse(BaseModel):
 
 # 订单列表响应模型
 class OrderListResponse(BaseModel):
-    total: int  # 总条数
-    page: int
+    total: Optional[int] = None  # 总条数（total_mode=none时为空）
+    page: Optional[int] = None  # 页码（游标分页时为空）
     page_size: int
     data: List[OrderDetailResponse]
+    next_cursor: Optional[str] = None  # 下一页游标（游标分页且还有下一页时返回）
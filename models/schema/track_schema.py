@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from datetime import datetime
+
+from config.settings import settings
+
+
+# 单个轨迹点
+class TrackPoint(BaseModel):
+    task_id: int = Field(..., description="配送任务ID")
+    track_node: str = Field(..., max_length=50, description="轨迹节点（如：已取货/到达配送点）")
+    track_time: Optional[datetime] = Field(None, description="节点时间（不传时取服务器接收时间）")
+    track_address: Optional[str] = Field(None, max_length=200, description="节点地址")
+
+
+# 轨迹上报请求模型（可包含多个任务的轨迹点）
+class TrackIngestRequest(BaseModel):
+    points: List[TrackPoint] = Field(..., description="轨迹点列表")
+
+    @validator("points")
+    def validate_points(cls, v):
+        if not v:
+            raise ValueError("轨迹点列表不能为空")
+        if len(v) > settings.TRACK_INGEST_MAX_POINTS:
+            raise ValueError(f"单次最多上报{settings.TRACK_INGEST_MAX_POINTS}个轨迹点")
+        return v
+
+
+# 轨迹上报被拒绝的任务
+class TrackIngestRejected(BaseModel):
+    task_id: int
+    reason: str
+
+
+# 轨迹上报响应模型
+class TrackIngestResponse(BaseModel):
+    accepted: int  # 已确认（已落盘）的轨迹点数
+    rejected: List[TrackIngestRejected]  # 被拒绝的任务及原因（该任务的轨迹点全部未写入）
+
+
+# 任务最新轨迹
+class TrackLatestItem(BaseModel):
+    task_id: int
+    track_node: Optional[str] = None
+    track_time: Optional[str] = None
+    track_address: Optional[str] = None
+    driver_id: Optional[int] = None
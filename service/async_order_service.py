@@ -0,0 +1,72 @@
+from dao.async_order_dao import async_order_dao
+from models.schema.order_schema import (
+    OrderCreateRequest, OrderStatusUpdateRequest, OrderQueryRequest
+)
+from service.order_service import OrderService
+from typing import Dict
+
+
+class AsyncOrderService(OrderService):
+    """订单异步Service（权限/状态流转规则复用OrderService，数据访问走异步DAO）"""
+
+    async def create_order(self, order_request: OrderCreateRequest, create_user_id: int) -> dict:
+        """
+        创建订单（关联创建人ID）
+        :param order_request:
+        :param create_user_id:
+        :return:
+        """
+        order_data = order_request.dict(exclude_unset=True)
+        order_data["create_user_id"] = create_user_id
+        self._assign_warehouse(order_data)
+        return await async_order_dao.create_order(order_data)
+
+    async def get_order_detail(self, order_id: int, current_user: dict) -> dict | None:
+        """
+        查询订单详情（权限控制）
+        :param order_id:
+        :param current_user:
+        :return:
+        """
+        order_dict = await async_order_dao.get_order_by_id(order_id)
+        if not order_dict or not self._can_view_order(order_dict, current_user):
+            return None
+        return order_dict
+
+    async def query_orders(self, query_request: OrderQueryRequest, current_user: dict) -> Dict:
+        """
+        分页查询订单（权限控制）
+        :param query_request:
+        :param current_user:
+        :return:
+        """
+        query_params = self._apply_permission_filter(query_request.dict(), current_user)
+        return await async_order_dao.query_orders(query_params)
+
+    async def update_order_status(self, order_id: int, current_user: dict,
+                                  status_request: OrderStatusUpdateRequest) -> dict | None:
+        """
+        修改订单状态（仅管理员可操作）
+        :param order_id:
+        :param current_user:
+        :param status_request:
+        :return:
+        """
+        if current_user["role"] != "admin":
+            return None
+
+        update_data = status_request.dict(exclude_unset=True)
+        order_dict = await async_order_dao.get_order_by_id(order_id)
+        if not order_dict:
+            return None
+        original_status = order_dict["order_status"]
+        self._check_status_transition(original_status, update_data["order_status"])
+        self._check_driver_assigned(update_data)
+
+        if not await async_order_dao.update_order_status(order_id, update_data, expected_status=original_status):
+            raise ValueError("订单状态已被其他操作修改，请刷新后重试")
+        return self._apply_status_update(order_dict, update_data)
+
+
+# 创建Service实例
+async_order_service = AsyncOrderService()
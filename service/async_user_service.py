@@ -0,0 +1,69 @@
+from dao.async_user_dao import async_user_dao
+from models.schema.user_schema import UserCreateRequest, UserUpdateRequest, PasswordResetRequest
+from utils.jwt_utils import create_access_token
+from utils.password_utils import hash_password_async, verify_password_async
+
+
+class AsyncUserService:
+    """用户异步Service（数据访问走异步DAO，密码计算走进程池）"""
+
+    async def register(self, user_request: UserCreateRequest) -> dict:
+        """
+        用户注册
+        :param user_request:
+        :return:
+        """
+        user_data = user_request.dict()
+        user_data["password"] = await hash_password_async(user_data["password"])
+        return await async_user_dao.create_user(user_data)
+
+    async def login(self, username: str, password: str) -> tuple[str, dict] | None:
+        """
+        用户登录：验证成功返回令牌和用户信息
+        :param username:
+        :param password:
+        :return:
+        """
+        user = await async_user_dao.get_user_by_username(username)
+        if not user:
+            return None
+        user_password = user.pop("password")
+        if not await verify_password_async(password, user_password):
+            return None
+
+        token = create_access_token(user['id'], user['username'], user['role'])
+        return token, user
+
+    async def get_user_info(self, user_id: int) -> dict | None:
+        """
+        查询用户信息
+        :param user_id:
+        :return:
+        """
+        return await async_user_dao.get_user_by_id(user_id)
+
+    async def update_user_info(self, user_id: int, user_request: UserUpdateRequest) -> dict | None:
+        """
+        修改用户信息
+        :param user_id:
+        :param user_request:
+        :return:
+        """
+        update_data = user_request.dict(exclude_unset=True)  # 只更新传入的字段
+        return await async_user_dao.update_user_info(user_id, update_data)
+
+    async def reset_password(self, user_id: int, reset_request: PasswordResetRequest) -> bool:
+        """
+        重置密码
+        :param user_id:
+        :param reset_request:
+        :return:
+        """
+        user = await async_user_dao.get_user_by_id(user_id)
+        if not user or not await verify_password_async(reset_request.old_password, user["password"]):
+            return False
+        hashed_password = await hash_password_async(reset_request.new_password)
+        return await async_user_dao.reset_password(user_id, hashed_password)
+
+
+async_user_service = AsyncUserService()
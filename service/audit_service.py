@@ -0,0 +1,137 @@
+"""
+操作日志（审计）异步批量写入：
+接口请求结束后由审计中间件提交日志到内存有界队列，后台线程按"攒够AUDIT_BATCH_SIZE条"或
+"距上次写入超过AUDIT_FLUSH_INTERVAL_SECONDS秒"触发一次多行INSERT，接口本身不承担额外的INSERT和提交
+"""
+import queue
+import threading
+import time
+
+from config.settings import settings
+from dao.operation_log_dao import operation_log_dao
+from utils.common_utils import logger
+
+# 队列中的停止信号
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    操作日志异步批量写入器：
+    1. submit不阻塞：队列已满时丢弃该条日志并计数（背压：优先保证接口延迟，不因审计拖慢业务）
+    2. 后台线程按数量/时间触发批量写入，写入失败记录错误日志并丢弃该批，不影响后续批次
+    3. stop时先写完队列中剩余的日志再退出（项目关闭时调用）
+    """
+
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.written = 0  # 已写入条数
+        self.dropped = 0  # 队列已满被丢弃的条数
+        self.failed = 0  # 写入数据库失败的条数
+        self.flushes = 0  # 批量写入次数
+
+    def start(self) -> None:
+        """启动后台写入线程（项目启动时调用）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        停止后台写入线程（写完队列中剩余日志后退出；阻塞调用，异步代码中需放到线程池执行）
+        :param timeout: 最长等待秒数（停止信号入队和等待线程退出共用）
+        :return:
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        # 停止信号必须入队（排在剩余日志之后），队列满时阻塞等待后台线程消费
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # 后台线程（写入数据库）长时间卡住：放弃剩余日志，不影响后续的关闭流程
+            logger.warning("操作日志队列在%s秒内未腾出空间，剩余约%s条日志未写入", timeout, self._queue.qsize())
+            return
+        thread.join(max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            logger.warning("操作日志写入线程未能在%s秒内退出，剩余约%s条日志未写入", timeout, self._queue.qsize())
+
+    def submit(self, log_data: dict) -> bool:
+        """
+        提交一条操作日志（不阻塞）
+        :param log_data: 与sys_operation_log字段对应的字典
+        :return: 是否入队成功（队列已满时丢弃）
+        """
+        try:
+            self._queue.put_nowait(log_data)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # 按2的幂次记录告警，避免洪峰时告警日志本身刷屏
+            if dropped & (dropped - 1) == 0:
+                logger.warning("操作日志队列已满（%s条），累计丢弃%s条", self._queue.maxsize, dropped)
+            return False
+
+    def _run(self) -> None:
+        """后台线程：攒批 + 定时写入"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: list) -> None:
+        """
+        写入一批日志（失败时丢弃该批并记录错误）
+        :param batch:
+        :return:
+        """
+        if not batch:
+            return
+        try:
+            operation_log_dao.batch_create_logs(batch)
+            self.written += len(batch)
+            self.flushes += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error("操作日志批量写入失败（%s条）：%s", len(batch), e)
+
+    def stats(self) -> dict:
+        """写入统计（供管理接口查看）"""
+        return {
+            "queue_size": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes
+        }
+
+
+# 全局操作日志写入器
+audit_log_writer = AuditLogWriter(
+    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+)
@@ -0,0 +1,247 @@
+"""
+批量派单：为待派送（pending）订单分配司机
+1. 评分：按收件地区与司机常配送区域（core_driver_ext.delivery_area）的匹配程度、司机当前负载、配送效率计算代价，
+   只有同城市的司机可以派单，收件区县相同的订单代价完全相同，
+   因此按城市拆分、城市内按区县分组，只计算 区县分组数 × 城市内司机数 的代价矩阵（NumPy向量化）
+2. 求解：带容量上限的分轮贪心——每轮每个分组选当前代价最小且未满的司机，每个司机每轮最多接ROUND_SLOTS单，
+   下一轮按新的负载重新评分，使订单在代价相近的司机之间均衡分配
+3. 写回：一个事务内加锁校验订单状态和司机负载，按块批量更新订单、批量插入配送任务
+   （司机负载 = 配送中的订单数，签收/取消后自动释放）
+"""
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from config.database import transactional
+from config.settings import settings
+from dao.delivery_task_dao import delivery_task_dao
+from dao.driver_dao import driver_dao
+from dao.order_dao import order_dao
+from utils.region_utils import normalize_city, normalize_region
+
+# 地区匹配代价：同区县为0，仅同城市为CITY_MATCH_COST，城市不同不派单
+CITY_MATCH_COST = 1.0
+# 负载代价权重（乘以 待完成任务数 / 任务数上限）
+LOAD_WEIGHT = 1.0
+# 效率代价权重（乘以 1 - 配送效率）
+EFFICIENCY_WEIGHT = 0.5
+# 每个司机每轮最多分配的订单数（越小负载越均衡，轮数越多）
+ROUND_SLOTS = 5
+
+
+def parse_delivery_area(area: str | None) -> tuple[str | None, str | None]:
+    """
+    解析司机常配送区域
+    :param area: 如"上海-浦东"、"广东-深圳-南山"、"上海"（只有城市时匹配该城市的全部区县，按同城代价计算）
+    :return: (城市, 区县)
+    """
+    parts = [normalize_region(part) for part in (area or "").split("-")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return None, None
+    if len(parts) == 1:
+        return parts[0], None
+    return parts[-2], parts[-1]
+
+
+def order_region(order: dict) -> tuple[str | None, str | None]:
+    """
+    订单收件地区（直辖市的收件市可能为空或为"市辖区"，用收件省代替）
+    :param order:
+    :return: (城市, 区县)
+    """
+    return (normalize_city(order.get("receiver_province"), order.get("receiver_city")),
+            normalize_region(order.get("receiver_district")))
+
+
+def plan_dispatch(orders: List[dict], drivers: List[dict], max_tasks: int) -> Dict:
+    """
+    计算派单方案（纯计算，不读写数据库）
+    :param orders: [{id, receiver_province, receiver_city, receiver_district}, ...]，靠前的订单优先分配
+    :param drivers: [{user_id, delivery_area, task_count, efficiency}, ...]
+    :param max_tasks: 单个司机待完成任务数上限
+    :return: {assignments: {订单ID: 司机ID}, district_match_count, city_match_count, group_count, rounds（各城市轮数之和）}
+    """
+    plan = {"assignments": {}, "district_match_count": 0, "city_match_count": 0, "group_count": 0, "rounds": 0}
+    if not orders or not drivers or max_tasks <= 0:
+        return plan
+
+    # 1. 地区编码为整数（司机缺失的层级编码为-1，订单未出现在司机区域中的编码为-2，两者永不相等）
+    city_codes: Dict[str, int] = {}
+    district_codes: Dict[tuple, int] = {}
+    driver_count = len(drivers)
+    driver_city = np.full(driver_count, -1, dtype=np.int64)
+    driver_district = np.full(driver_count, -1, dtype=np.int64)
+    for j, driver in enumerate(drivers):
+        city, district = parse_delivery_area(driver["delivery_area"])
+        if city:
+            driver_city[j] = city_codes.setdefault(city, len(city_codes))
+            if district:
+                driver_district[j] = district_codes.setdefault((city, district), len(district_codes))
+
+    # 2. 订单按收件地区分组（组内保持原顺序）
+    groups: Dict[tuple, List[int]] = {}
+    for i, order in enumerate(orders):
+        groups.setdefault(order_region(order), []).append(i)
+    group_keys = list(groups)
+    group_members = [groups[key] for key in group_keys]
+    group_city = np.array([city_codes.get(city, -2) for city, _ in group_keys], dtype=np.int64)
+    group_district = np.array([district_codes.get(key, -2) for key in group_keys], dtype=np.int64)
+    plan["group_count"] = len(group_keys)
+
+    # 3. 不同城市的订单和司机互不影响，按城市拆成独立的小矩阵分别求解
+    efficiency = np.clip(np.array([driver["efficiency"] or 0.0 for driver in drivers], dtype=np.float64), 0.0, 1.0)
+    load = np.array([driver["task_count"] or 0 for driver in drivers], dtype=np.int64)
+    driver_ids = [driver["user_id"] for driver in drivers]
+    for city_code in np.unique(group_city[group_city >= 0]):
+        group_index = np.flatnonzero(group_city == city_code)
+        driver_index = np.flatnonzero(driver_city == city_code)
+        # 静态代价：地区匹配 + 效率（城市内分组数 × 城市内司机数）
+        district_match = group_district[group_index][:, None] == driver_district[driver_index][None, :]
+        base_cost = (np.where(district_match, 0.0, CITY_MATCH_COST)
+                     + EFFICIENCY_WEIGHT * (1.0 - efficiency[driver_index])[None, :])
+        _assign_city(plan, orders, [group_members[g] for g in group_index], district_match, base_cost,
+                     load[driver_index], [driver_ids[j] for j in driver_index], max_tasks)
+    return plan
+
+
+def _assign_city(plan: Dict, orders: List[dict], group_members: List[List[int]], district_match: np.ndarray,
+                 base_cost: np.ndarray, load: np.ndarray, driver_ids: List[int], max_tasks: int) -> None:
+    """
+    分轮贪心求解一个城市的派单：每轮按当前负载重新评分，本轮代价小的分组先选司机，结果写入plan
+    :param plan:
+    :param orders:
+    :param group_members: 每个分组的订单下标
+    :param district_match: 分组 × 司机，是否同区县
+    :param base_cost: 分组 × 司机，静态代价
+    :param load: 司机当前待完成任务数
+    :param driver_ids:
+    :param max_tasks:
+    :return:
+    """
+    group_count, driver_count = base_cost.shape
+    load = load.copy()
+    capacity = np.maximum(max_tasks - load, 0)
+    remaining = np.array([len(members) for members in group_members], dtype=np.int64)
+    cursor = np.zeros(group_count, dtype=np.int64)
+    assignments = plan["assignments"]
+
+    while True:
+        cost = base_cost + (LOAD_WEIGHT / max_tasks) * load[None, :]
+        cost[:, capacity <= 0] = np.inf
+        cost[remaining <= 0, :] = np.inf
+        best = cost.argmin(axis=1)
+        best_cost = cost[np.arange(group_count), best]
+        candidates = np.flatnonzero(np.isfinite(best_cost))
+        if not candidates.size:
+            return
+        plan["rounds"] += 1
+        round_used = np.zeros(driver_count, dtype=np.int64)
+        for g in candidates[np.argsort(best_cost[candidates], kind="stable")]:
+            j = best[g]
+            take = int(min(remaining[g], capacity[j], ROUND_SLOTS - round_used[j]))
+            if take <= 0:
+                # 该司机本轮已被代价更小的分组占满，下一轮重新选择
+                continue
+            for i in group_members[g][cursor[g]:cursor[g] + take]:
+                assignments[orders[i]["id"]] = driver_ids[j]
+            cursor[g] += take
+            remaining[g] -= take
+            load[j] += take
+            capacity[j] -= take
+            round_used[j] += take
+            if district_match[g, j]:
+                plan["district_match_count"] += take
+            else:
+                plan["city_match_count"] += take
+
+
+class DispatchService:
+    def auto_dispatch(self, current_user: dict, dry_run: bool = False) -> Dict | None:
+        """
+        批量派单（仅管理员可操作）：读取待派送订单和可派单司机 → 计算派单方案 → 批量写回
+        评分和求解在事务外完成，写回时才加锁
+        :param current_user:
+        :param dry_run: 只计算方案，不写回
+        :return: 派单统计
+        """
+        if current_user["role"] != "admin":
+            return None
+
+        max_tasks = settings.DISPATCH_DRIVER_MAX_TASKS
+        start = time.perf_counter()
+        orders = order_dao.list_dispatch_orders(settings.DISPATCH_MAX_ORDERS)
+        drivers = driver_dao.list_available_drivers(max_tasks)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = plan_dispatch(orders, drivers, max_tasks)
+        plan_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assigned = plan["assignments"]
+        if not dry_run and assigned:
+            assigned = self._apply_assignments(assigned, current_user["id"])
+        write_seconds = time.perf_counter() - start
+
+        return {
+            "dry_run": dry_run,
+            "order_count": len(orders),
+            "driver_count": len(drivers),
+            "planned_count": len(plan["assignments"]),
+            "assigned_count": len(assigned),
+            "unassigned_count": len(orders) - len(assigned),
+            "district_match_count": plan["district_match_count"],
+            "city_match_count": plan["city_match_count"],
+            "driver_used_count": len(set(assigned.values())),
+            "load_seconds": round(load_seconds, 3),
+            "plan_seconds": round(plan_seconds, 3),
+            "write_seconds": round(write_seconds, 3)
+        }
+
+    @transactional
+    def _apply_assignments(self, assignments: Dict[int, int], assign_user_id: int) -> Dict[int, int]:
+        """
+        写回派单方案（一个事务）：
+        1. 锁定订单（SELECT ... FOR UPDATE），跳过计算期间状态已不是pending的订单
+        2. 锁定司机并重新统计配送中的订单数，跳过会超出任务数上限的订单（计算期间其他派单/手动分配已占用）
+        3. 按块批量更新订单司机和状态（pending → delivering），批量插入配送任务
+        :param assignments: {订单ID: 司机ID}
+        :param assign_user_id: 分配人ID
+        :return: 实际写回的{订单ID: 司机ID}
+        """
+        current_statuses = order_dao.get_order_statuses(list(assignments), for_update=True)
+        assignments = {order_id: driver_id for order_id, driver_id in assignments.items()
+                       if current_statuses.get(order_id) == "pending"}
+        if not assignments:
+            return assignments
+
+        task_counts = driver_dao.lock_task_counts(list(set(assignments.values())))
+        max_tasks = settings.DISPATCH_DRIVER_MAX_TASKS
+        accepted = {}
+        for order_id, driver_id in assignments.items():
+            if driver_id in task_counts and task_counts[driver_id] < max_tasks:
+                task_counts[driver_id] += 1
+                accepted[order_id] = driver_id
+        assignments = accepted
+        if not assignments:
+            return assignments
+
+        updated = order_dao.batch_assign_drivers(assignments, order_status="delivering", expected_status="pending")
+        if updated != len(assignments):
+            # 行已加锁，理论上不会出现；出现则整体回滚，避免部分生效
+            raise ValueError("订单状态已被其他操作修改，请重新派单")
+
+        now = datetime.now().replace(microsecond=0)
+        delivery_task_dao.batch_create_tasks([
+            {"order_id": order_id, "driver_id": driver_id, "task_status": "pending",
+             "assign_time": now, "assign_user_id": assign_user_id}
+            for order_id, driver_id in assignments.items()
+        ])
+        return assignments
+
+
+# 创建Service实例
+dispatch_service = DispatchService()
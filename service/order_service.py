@@ -1,9 +1,28 @@
-from dao.order_dao import order_dao
+import csv
+import io
+
+import orjson
+from pydantic import ValidationError
+
+from config.database import transactional
+from config.settings import settings
+
+from dao.order_dao import order_dao, order_status_event
 from models.schema.order_schema import (
-    OrderCreateRequest, OrderStatusUpdateRequest, OrderQueryRequest
+    OrderCreateRequest, OrderStatusUpdateRequest, OrderQueryRequest, OrderExportRequest, OrderDetailResponse,
+    OrderBatchStatusUpdateRequest
 )
 from dao.user_dao import user_dao
-from typing import Dict, Optional, List
+from service.warehouse_service import warehouse_locator
+from typing import Dict, Optional, List, Iterator
+
+# 订单状态流转规则（key：当前状态，value：允许变更为的状态）
+VALID_STATUS_TRANSITIONS = {
+    "pending": ["delivering", "cancelled"],
+    "delivering": ["signed", "cancelled"],
+    "signed": [],  # 已签收不可修改
+    "cancelled": [],  # 已取消不可修改
+}
 
 
 class OrderService:
@@ -18,10 +37,60 @@ class OrderService:
         order_data = order_request.dict(exclude_unset=True)
         # 补充创建人ID（从token获取）
         order_data["create_user_id"] = create_user_id
+        # 按发件地址匹配仓库
+        self._assign_warehouse(order_data)
         # 创建订单
         order_dict = order_dao.create_order(order_data)
         return order_dict
 
+    def batch_create_orders(self, items: List[dict], create_user_id: int) -> Dict:
+        """
+        批量创建订单：逐条校验，校验通过的订单在一个事务中批量插入
+        :param items: 原始订单字典列表（字段同OrderCreateRequest）
+        :param create_user_id:
+        :return: {total, success_count, failed_count, results}
+        """
+        results = []
+        valid_orders = []
+        for index, item in enumerate(items):
+            try:
+                order_request = OrderCreateRequest(**item)
+            except ValidationError as e:
+                error = "；".join(f"{'.'.join(str(loc) for loc in err['loc'])}：{err['msg']}" for err in e.errors())
+                results.append({"index": index, "success": False, "order_no": None, "error": error})
+                continue
+            # 不使用exclude_unset，保证每行字段一致（多行INSERT要求）
+            order_data = order_request.dict()
+            order_data["create_user_id"] = create_user_id
+            self._assign_warehouse(order_data)
+            valid_orders.append((index, order_data))
+
+        if valid_orders:
+            order_nos = order_dao.batch_create_orders([order_data for _, order_data in valid_orders])
+            for (index, _), order_no in zip(valid_orders, order_nos):
+                results.append({"index": index, "success": True, "order_no": order_no, "error": None})
+        results.sort(key=lambda r: r["index"])
+
+        return {
+            "total": len(items),
+            "success_count": len(valid_orders),
+            "failed_count": len(items) - len(valid_orders),
+            "results": results
+        }
+
+    def _assign_warehouse(self, order_data: dict) -> dict:
+        """
+        未指定仓库时按发件地址匹配仓库（同区 → 同市 → 同省 → 全局剩余容量最大且能容纳本单货物的仓库，内存查找不查库）
+        :param order_data:
+        :return:
+        """
+        if not order_data.get("warehouse_id"):
+            order_data["warehouse_id"] = warehouse_locator.locate(
+                order_data.get("sender_province"), order_data.get("sender_city"), order_data.get("sender_district"),
+                order_data.get("goods_quantity") or 1
+            )
+        return order_data
+
     def get_order_detail(self, order_id: int, current_user: dict) -> dict | None:
         """
         查询订单详情（权限控制）：
@@ -33,27 +102,22 @@ class OrderService:
         :return:
         """
         order_dict = order_dao.get_order_by_id(order_id)
-        if not order_dict:
+        if not order_dict or not self._can_view_order(order_dict, current_user):
             return None
-
-        # 权限校验
-        user_role = current_user["role"]
-        user_id = current_user["id"]
-
-        if user_role == "admin":
-            # 管理员无限制
-            return order_dict
-        elif user_role == "driver":
-            # 司机仅查自己的订单（driver_id匹配）
-            if order_dict["driver_id"] != user_id:
-                return None
-        else:
-            # 普通用户仅查自己创建的订单（create_user_id匹配）
-            if order_dict["create_user_id"] != user_id:
-                return None
-
         return order_dict
 
+    def get_order_snapshots(self, order_ids: List[int], current_user: dict) -> List[dict] | None:
+        """
+        查询订阅订单的当前状态（推送订阅的初始事件，权限规则同订单详情）
+        :param order_ids: 不重复的订单ID
+        :param current_user:
+        :return: 订单状态事件列表，任一订单不存在或无权限查看时返回None
+        """
+        orders = order_dao.get_order_snapshots(order_ids)
+        if len(orders) != len(order_ids) or not all(self._can_view_order(order, current_user) for order in orders):
+            return None
+        return [order_status_event(order) for order in orders]
+
     def query_orders(self, query_request: OrderQueryRequest, current_user: dict) -> Dict:
         """
         分页查询订单（权限控制）
@@ -61,26 +125,45 @@ class OrderService:
         :param current_user:
         :return:
         """
-        query_params = query_request.dict()
-        user_role = current_user["role"]
-        user_id = current_user["id"]
-
-        # 权限过滤
-        if user_role == "driver":
-            # 司机仅查自己的订单
-            query_params["driver_id"] = user_id
-        elif user_role != "admin":
-            # 普通用户仅查自己创建的订单（create_user_id筛选）
-            query_params["create_user_id"] = user_id
+        query_params = self._apply_permission_filter(query_request.dict(), current_user)
 
         # 查询订单
         result = order_dao.query_orders(query_params)
         return result
 
+    def export_orders(self, export_request: OrderExportRequest, current_user: dict) -> Iterator[bytes]:
+        """
+        流式导出订单（权限过滤规则同query_orders），逐批生成NDJSON/CSV字节块
+        :param export_request:
+        :param current_user:
+        :return:
+        """
+        query_params = self._apply_permission_filter(export_request.dict(exclude={"format"}), current_user)
+        batches = order_dao.iter_orders(query_params, settings.ORDER_EXPORT_BATCH_SIZE)
+
+        if export_request.format == "ndjson":
+            for batch in batches:
+                yield b"".join(orjson.dumps(order) + b"\n" for order in batch)
+            return
+
+        # CSV：先输出表头（带BOM，兼容Excel打开中文），保证查询返回前客户端就能收到首字节
+        fields = list(OrderDetailResponse.__fields__)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+        for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+
+    @transactional
     def update_order_status(self, order_id: int, current_user: dict,
                             status_request: OrderStatusUpdateRequest) -> dict | None:
         """
         修改订单状态（仅管理员可操作）
+        整个方法在一个工作单元中执行：一次连接，一次查询 + 一次条件更新
         :param order_id:
         :param current_user:
         :param status_request:
@@ -92,28 +175,133 @@ class OrderService:
 
         # 转换为字典
         update_data = status_request.dict(exclude_unset=True)
-        # 状态转换校验
-        valid_status_transitions = {
-            "pending": ["delivering", "cancelled"],
-            "delivering": ["signed", "cancelled"],
-            "signed": [],  # 已签收不可修改
-            "cancelled": [],  # 已取消不可修改
-        }
 
         # 获取原订单状态
-        original_order = order_dao.get_order_by_id(order_id)
-        if not original_order:
+        order_dict = order_dao.get_order_by_id(order_id)
+        if not order_dict:
             return None
-        original_status = original_order["order_status"]
+        original_status = order_dict["order_status"]
 
         # 校验状态流转是否合法
-        if update_data["order_status"] not in valid_status_transitions.get(original_status, []):
-            raise ValueError(f"订单状态不能从{original_status}改为{update_data['order_status']}")
+        self._check_status_transition(original_status, update_data["order_status"])
+        self._check_driver_assigned(update_data)
+
+        # 修改状态（条件更新：状态已被并发请求修改时不生效）
+        if not order_dao.update_order_status(order_id, update_data, expected_status=original_status):
+            raise ValueError("订单状态已被其他操作修改，请刷新后重试")
 
-        # 修改状态
-        order_dict = order_dao.update_order_status(order_id, update_data)
+        return self._apply_status_update(order_dict, update_data)
+
+    @transactional
+    def batch_update_order_status(self, current_user: dict,
+                                  batch_request: OrderBatchStatusUpdateRequest) -> Dict | None:
+        """
+        批量修改订单状态（仅管理员可操作）：
+        1. 一次查询锁定所有订单并取出当前状态（SELECT ... FOR UPDATE）
+        2. 按当前状态分组，按VALID_STATUS_TRANSITIONS校验，每组执行一条条件UPDATE
+        3. 返回修改成功和被拒绝（含原因）的订单ID
+        :param current_user:
+        :param batch_request:
+        :return:
+        """
+        if current_user["role"] != "admin":
+            return None
+
+        target_status = batch_request.order_status
+        update_data = batch_request.dict(exclude_unset=True, exclude={"order_ids"})
+        self._check_driver_assigned(update_data)
+        current_statuses = order_dao.get_order_statuses(batch_request.order_ids, for_update=True)
+
+        transitioned, rejected = [], []
+        groups: Dict[str, List[int]] = {}
+        for order_id in batch_request.order_ids:
+            original_status = current_statuses.get(order_id)
+            if original_status is None:
+                rejected.append({"order_id": order_id, "reason": "订单不存在"})
+            elif target_status not in VALID_STATUS_TRANSITIONS.get(original_status, []):
+                rejected.append({"order_id": order_id, "reason": f"订单状态不能从{original_status}改为{target_status}"})
+            else:
+                groups.setdefault(original_status, []).append(order_id)
+
+        for original_status, order_ids in groups.items():
+            updated = order_dao.batch_update_order_status(order_ids, update_data, expected_status=original_status)
+            if updated != len(order_ids):
+                # 行已加锁，理论上不会出现；出现则整体回滚，避免部分生效
+                raise ValueError("订单状态已被其他操作修改，请刷新后重试")
+            transitioned.extend(order_ids)
+
+        return {"transitioned": transitioned, "rejected": rejected}
+
+    def _can_view_order(self, order_dict: dict, current_user: dict) -> bool:
+        """
+        订单查看权限校验
+        :param order_dict:
+        :param current_user:
+        :return:
+        """
+        user_role = current_user["role"]
+        user_id = current_user["id"]
+
+        if user_role == "admin":
+            # 管理员无限制
+            return True
+        elif user_role == "driver":
+            # 司机仅查自己的订单（driver_id匹配）
+            return order_dict["driver_id"] == user_id
+        else:
+            # 普通用户仅查自己创建的订单（create_user_id匹配）
+            return order_dict["create_user_id"] == user_id
+
+    def _apply_permission_filter(self, query_params: dict, current_user: dict) -> dict:
+        """
+        按角色追加查询过滤条件
+        :param query_params:
+        :param current_user:
+        :return:
+        """
+        user_role = current_user["role"]
+        user_id = current_user["id"]
+
+        if user_role == "driver":
+            # 司机仅查自己的订单
+            query_params["driver_id"] = user_id
+        elif user_role != "admin":
+            # 普通用户仅查自己创建的订单（create_user_id筛选）
+            query_params["create_user_id"] = user_id
+        return query_params
+
+    def _apply_status_update(self, order_dict: dict, update_data: dict) -> dict:
+        """
+        将已生效的状态修改合并到原订单字典（无需重新查询订单）
+        :param order_dict:
+        :param update_data:
+        :return:
+        """
+        for key in ("order_status", "driver_id"):
+            if key in update_data:
+                order_dict[key] = update_data[key]
+        order_dict["update_time"] = update_data["update_time"].strftime("%Y-%m-%d %H:%M:%S")
         return order_dict
 
+    def _check_status_transition(self, original_status: str, new_status: str) -> None:
+        """
+        校验状态流转是否合法（不合法时抛出ValueError）
+        :param original_status:
+        :param new_status:
+        :return:
+        """
+        if new_status not in VALID_STATUS_TRANSITIONS.get(original_status, []):
+            raise ValueError(f"订单状态不能从{original_status}改为{new_status}")
+
+    def _check_driver_assigned(self, update_data: dict) -> None:
+        """
+        改为配送中时必须指定司机（请求模型已校验，这里兜底：没有司机的配送中订单任何司机都看不到，也不会再被派单）
+        :param update_data:
+        :return:
+        """
+        if update_data["order_status"] == "delivering" and not update_data.get("driver_id"):
+            raise ValueError("订单状态改为配送中时，必须指定司机ID")
+
 
 # 创建Service实例
 order_service = OrderService()
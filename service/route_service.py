@@ -0,0 +1,215 @@
+"""
+配送路线排序：为司机未完成的配送任务计算访问顺序
+1. 坐标：按订单收件省/市/区从本地区县中心点表（utils.region_utils.district_centroids）取坐标，
+   同一区县的任务合并为一个站点（区县内部的先后顺序保持分配顺序）
+2. 距离：站点间的球面距离矩阵按区县集合缓存，同一批区县只计算一次
+3. 排序：最近邻构造初始路线 + 2-opt改进（开放路线：从起点出发，不返回起点）
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from dao.delivery_task_dao import delivery_task_dao
+from utils.cache_utils import route_matrix_cache
+from utils.region_utils import district_centroids, haversine_matrix, normalize_city, normalize_region
+
+# 2-opt最多遍历轮数（每轮对每个位置尝试一次最优翻转，没有改进时提前结束）
+TWO_OPT_MAX_PASSES = 50
+# 认为路线有改进的最小缩短距离（千米），避免浮点误差导致来回翻转
+TWO_OPT_MIN_GAIN = 1e-9
+
+
+def nearest_neighbor_route(dist: np.ndarray, start: int) -> np.ndarray:
+    """
+    最近邻构造初始路线：从start出发，每次走向最近的未访问站点
+    :param dist: n × n 距离矩阵
+    :param start: 起点下标
+    :return: 站点下标序列
+    """
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    route = np.empty(n, dtype=np.int64)
+    route[0] = start
+    visited[start] = True
+    for k in range(1, n):
+        next_stop = int(np.where(visited, np.inf, dist[route[k - 1]]).argmin())
+        route[k] = next_stop
+        visited[next_stop] = True
+    return route
+
+
+def two_opt(dist: np.ndarray, route: np.ndarray, max_passes: int = TWO_OPT_MAX_PASSES) -> np.ndarray:
+    """
+    2-opt改进开放路线（起点固定，终点不固定）：
+    对每个位置i，向量化计算翻转route[i..j]（j > i）后的路线长度变化，取缩短最多的翻转
+    :param dist: n × n 距离矩阵
+    :param route: 初始路线
+    :param max_passes:
+    :return: 改进后的路线
+    """
+    route = route.copy()
+    n = len(route)
+    if n < 3:
+        return route
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            before, first = route[i - 1], route[i]
+            last = route[i + 1:]  # 候选翻转段的末尾站点（j = i+1 .. n-1）
+            # 翻转段之后的站点（j = n-1 时没有后继，这两条边的长度按0计）
+            after = np.append(route[i + 2:], route[-1])
+            has_after = np.arange(i + 1, n) < n - 1
+            delta = (dist[before, last] - dist[before, first]
+                     + np.where(has_after, dist[first, after] - dist[last, after], 0.0))
+            best = int(delta.argmin())
+            if delta[best] < -TWO_OPT_MIN_GAIN:
+                j = i + 1 + best
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return route
+
+
+def route_length(dist: np.ndarray, route: np.ndarray) -> float:
+    """
+    开放路线总长度
+    :param dist:
+    :param route:
+    :return:
+    """
+    return float(dist[route[:-1], route[1:]].sum()) if len(route) > 1 else 0.0
+
+
+def sequence_stops(dist: np.ndarray, start: int | None = None) -> np.ndarray:
+    """
+    计算站点访问顺序（最近邻 + 2-opt）
+    :param dist: n × n 距离矩阵
+    :param start: 起点下标（为空时从最外围的站点出发：到其他站点距离之和最大）
+    :return: 站点下标序列
+    """
+    if len(dist) == 0:
+        return np.empty(0, dtype=np.int64)
+    if start is None:
+        start = int(dist.sum(axis=1).argmax())
+    return two_opt(dist, nearest_neighbor_route(dist, start))
+
+
+def district_distance_matrix(keys: tuple, points: List[tuple]) -> np.ndarray:
+    """
+    区县集合的距离矩阵（按区县集合缓存）
+    :param keys: 排好序的(城市, 区县)元组
+    :param points: 与keys一一对应的(经度, 纬度)
+    :return: 距离矩阵（千米）
+    """
+    dist = route_matrix_cache.get(keys)
+    if dist is None:
+        lng, lat = np.array(points, dtype=np.float64).T
+        dist = haversine_matrix(lng, lat, lng, lat)
+        dist.setflags(write=False)  # 缓存的矩阵在多个请求间共享，禁止修改
+        route_matrix_cache.set(keys, dist)
+    return dist
+
+
+class RouteService:
+    def plan_driver_route(self, current_user: dict, driver_id: int | None,
+                          start_lng: float | None = None, start_lat: float | None = None) -> Dict | None:
+        """
+        计算司机未完成任务的配送顺序（权限控制：司机只能查看自己的路线，管理员可查看任意司机）
+        :param current_user:
+        :param driver_id: 为空时取当前登录司机
+        :param start_lng: 起点经度（司机当前位置，为空时从最外围的站点出发）
+        :param start_lat: 起点纬度
+        :return: {driver_id, task_count, stop_count, total_distance_km, stops, unlocated_tasks}
+        """
+        if current_user["role"] == "driver":
+            if driver_id not in (None, current_user["id"]):
+                return None
+            driver_id = current_user["id"]
+        elif current_user["role"] != "admin" or driver_id is None:
+            return None
+
+        # 同一区县的任务合并为一个站点；坐标表中找不到的任务放到路线末尾
+        stops: Dict[tuple, dict] = {}
+        unlocated = []
+        for task in delivery_task_dao.list_open_tasks(driver_id):
+            province, city, district = task["receiver_province"], task["receiver_city"], task["receiver_district"]
+            point = district_centroids.lookup(province, city, district)
+            task = self._task_to_dict(task)
+            if point is None:
+                unlocated.append(task)
+                continue
+            key = (normalize_city(province, city), normalize_region(district))
+            stop = stops.setdefault(key, {"province": province, "city": city, "district": district,
+                                          "lng": point[0], "lat": point[1], "tasks": []})
+            stop["tasks"].append(task)
+
+        keys = tuple(sorted(stops, key=lambda key: (key[0] or "", key[1] or "")))
+        ordered, total_distance = self._sequence(keys, [(stops[key]["lng"], stops[key]["lat"]) for key in keys],
+                                                 start_lng, start_lat)
+        result_stops = []
+        for sequence, (index, leg_distance) in enumerate(ordered, start=1):
+            stop = stops[keys[index]]
+            stop["sequence"] = sequence
+            stop["leg_distance_km"] = round(leg_distance, 2)
+            result_stops.append(stop)
+
+        return {
+            "driver_id": driver_id,
+            "task_count": sum(len(stop["tasks"]) for stop in result_stops) + len(unlocated),
+            "stop_count": len(result_stops),
+            "total_distance_km": round(total_distance, 2),
+            "stops": result_stops,
+            "unlocated_tasks": unlocated
+        }
+
+    def _sequence(self, keys: tuple, points: List[tuple], start_lng: float | None,
+                  start_lat: float | None) -> tuple[List[tuple], float]:
+        """
+        计算站点顺序
+        :param keys: 站点的(城市, 区县)
+        :param points: 站点坐标
+        :param start_lng:
+        :param start_lat:
+        :return: ([(站点下标, 与上一站点/起点的距离), ...], 总距离)
+        """
+        if not keys:
+            return [], 0.0
+        dist = district_distance_matrix(keys, points)
+        if start_lng is None or start_lat is None:
+            route = sequence_stops(dist)
+            legs = [0.0] + dist[route[:-1], route[1:]].tolist()
+            return list(zip(route.tolist(), legs)), route_length(dist, route)
+
+        # 起点为司机当前位置：在缓存矩阵外加一行一列（下标0），固定从0出发
+        lng, lat = np.array(points, dtype=np.float64).T
+        start_row = haversine_matrix([start_lng], [start_lat], lng, lat)[0]
+        full = np.zeros((len(keys) + 1, len(keys) + 1))
+        full[1:, 1:] = dist
+        full[0, 1:] = full[1:, 0] = start_row
+        route = sequence_stops(full, start=0)
+        legs = full[route[:-1], route[1:]].tolist()
+        return list(zip((route[1:] - 1).tolist(), legs)), route_length(full, route)
+
+    @staticmethod
+    def _task_to_dict(task: dict) -> dict:
+        """
+        任务行转字典（路线中展示的字段）
+        :param task:
+        :return:
+        """
+        address = (f"{task['receiver_province'] or ''}{task['receiver_city'] or ''}"
+                   f"{task['receiver_district'] or ''}{task['receiver_address'] or ''}").strip()
+        return {
+            "task_id": task["task_id"],
+            "order_id": task["order_id"],
+            "order_no": task["order_no"],
+            "task_status": task["task_status"],
+            "receiver_name": task["receiver_name"],
+            "receiver_phone": task["receiver_phone"],
+            "receiver_address": address
+        }
+
+
+# 创建Service实例
+route_service = RouteService()
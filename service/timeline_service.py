@@ -0,0 +1,138 @@
+"""
+订单配送时间线与最新节点：
+1. 时间线：订单、配送任务、轨迹一次联表查询（不经过CoreOrder.delivery_task → track_records逐级懒加载），
+   后台尚未写入数据库的轨迹（最多TRACK_FLUSH_INTERVAL_SECONDS秒）不在时间线中
+2. 最新节点（跟踪页轮询）：订单状态和任务列表按订单缓存（order_task_cache），最新轨迹取轨迹写入器内存中的
+   最新轨迹表（短有效期）；内存中没有或已过期的任务按索引取最后一条轨迹，任何情况下都不扫描轨迹表
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from dao.order_dao import order_dao
+from service.track_service import track_ingestor
+from utils.cache_utils import order_task_cache
+
+
+def format_time(value: datetime | None) -> str | None:
+    """时间格式化（YYYY-MM-DD HH:MM:SS）"""
+    return value.isoformat(" ", "seconds") if value else None
+
+
+class TimelineService:
+    def get_order_timeline(self, order_id: int, current_user: dict) -> Dict | None:
+        """
+        查询订单配送时间线（权限规则同订单详情）
+        :param order_id:
+        :param current_user:
+        :return: {order_id, order_no, order_status, driver_id, update_time,
+                  tasks: [{task_id, ..., tracks: [{track_id, track_node, track_time, track_address}, ...]}]}
+        """
+        rows = order_dao.get_order_timeline(order_id)
+        if not rows or not self._can_view(rows[0], current_user):
+            return None
+
+        tasks: Dict[int, dict] = {}
+        for row in rows:
+            if row["task_id"] is None:
+                continue
+            task = tasks.get(row["task_id"])
+            if task is None:
+                task = tasks[row["task_id"]] = self._task_to_dict(row)
+                task["tracks"] = []
+            if row["track_id"] is not None:
+                task["tracks"].append({
+                    "track_id": row["track_id"],
+                    "track_node": row["track_node"],
+                    "track_time": format_time(row["track_time"]),
+                    "track_address": row["track_address"]
+                })
+        return {**self._order_to_dict(rows[0]), "tasks": list(tasks.values())}
+
+    def get_order_latest(self, order_id: int, current_user: dict) -> Dict | None:
+        """
+        查询订单最新状态和最新轨迹节点（供跟踪页轮询）
+        :param order_id:
+        :param current_user:
+        :return: {order_id, order_no, order_status, driver_id, update_time, task: 最近分配的任务 | None,
+                  latest_track: 所有任务中最新的轨迹 | None}
+        """
+        order = self._get_order_tasks(order_id)
+        if order is None or not self._can_view(order, current_user):
+            return None
+
+        tasks: List[dict] = order["tasks"]
+        latest = track_ingestor.get_latest([task["task_id"] for task in tasks]) if tasks else {}
+        track = max(latest.values(), key=lambda item: item["track_time"], default=None)
+        return {
+            "order_id": order["order_id"],
+            "order_no": order["order_no"],
+            "order_status": order["order_status"],
+            "driver_id": order["driver_id"],
+            "update_time": order["update_time"],
+            "task": tasks[-1] if tasks else None,
+            "latest_track": None if track is None else {
+                "task_id": track["task_id"],
+                "track_node": track["track_node"],
+                "track_time": format_time(track["track_time"]),
+                "track_address": track["track_address"]
+            }
+        }
+
+    def _get_order_tasks(self, order_id: int) -> Dict | None:
+        """
+        订单状态和任务列表（优先读缓存，未命中时一次联表查询订单和任务，不查轨迹表）
+        缓存的字典在多个请求间共享，调用方不能修改
+        :param order_id:
+        :return: {order_id, order_no, order_status, driver_id, create_user_id, update_time, tasks}，订单不存在时返回None
+        """
+        order = order_task_cache.get(order_id)
+        if order is not None:
+            return order
+        rows = order_dao.get_order_timeline(order_id, with_tracks=False)
+        if not rows:
+            return None
+        order = {**self._order_to_dict(rows[0]), "create_user_id": rows[0]["create_user_id"],
+                 "tasks": [self._task_to_dict(row) for row in rows if row["task_id"] is not None]}
+        order_task_cache.set(order_id, order)
+        return order
+
+    @staticmethod
+    def _can_view(order: dict, current_user: dict) -> bool:
+        """
+        查看权限：管理员不限，司机仅限分配给自己的订单，普通用户仅限自己创建的订单
+        :param order: 含driver_id、create_user_id
+        :param current_user:
+        :return:
+        """
+        if current_user["role"] == "admin":
+            return True
+        if current_user["role"] == "driver":
+            return order["driver_id"] == current_user["id"]
+        return order["create_user_id"] == current_user["id"]
+
+    @staticmethod
+    def _order_to_dict(row: dict) -> dict:
+        """时间线行中的订单字段"""
+        return {
+            "order_id": row["order_id"],
+            "order_no": row["order_no"],
+            "order_status": row["order_status"],
+            "driver_id": row["driver_id"],
+            "update_time": format_time(row["update_time"])
+        }
+
+    @staticmethod
+    def _task_to_dict(row: dict) -> dict:
+        """时间线行中的任务字段"""
+        return {
+            "task_id": row["task_id"],
+            "driver_id": row["task_driver_id"],
+            "task_status": row["task_status"],
+            "assign_time": format_time(row["assign_time"]),
+            "complete_time": format_time(row["complete_time"]),
+            "delivery_notes": row["delivery_notes"]
+        }
+
+
+# 创建Service实例
+timeline_service = TimelineService()
@@ -0,0 +1,560 @@
+"""
+配送轨迹写入：
+1. 接口收到一批轨迹点后先追加到本地spool文件并fsync，落盘后才返回成功（并发请求共享一次fsync：组提交）
+2. 轨迹点同时进入内存缓冲区，后台线程按"攒够TRACK_BATCH_SIZE条"或"距上次写入超过TRACK_FLUSH_INTERVAL_SECONDS秒"
+   多行INSERT到core_delivery_track；写入前切换到新的spool分段，分段中的轨迹全部写入数据库后删除该分段
+3. 启动时先把残留的spool分段（上次进程退出前未写入数据库的轨迹）写入数据库，
+   包括没有存活进程持有的其他worker目录（缩容后不再有进程抢占到该编号）：分段移入本进程目录后一起恢复
+4. 内存中保存每个任务的最新轨迹（有效期TRACK_LATEST_TTL_SECONDS秒），有效期内查询最新节点不查库；
+   过期后按索引重新读取数据库中的最新轨迹，与本进程尚未写入数据库的轨迹比较取较新的
+   （同一任务的轨迹可能由其他worker进程写入，最迟有效期+写入间隔后可见）
+spool按worker进程分目录（目录编号即订单号worker_id，进程存活期间持有目录下的锁文件独占），
+重启后由抢占到同一编号的进程恢复，或由任意一个启动的进程接管无人持有的目录；
+进程在"数据库已提交、分段未删除"之间崩溃时，恢复会重复写入该分段（至少一次）
+写入失败时只有连接类错误（数据库不可用）保留分段重试；数据错误（如任务已删除的外键冲突、超长字段）
+二分定位出无法写入的轨迹，追加到spool目录的死信文件后继续写入其余轨迹，避免一条坏数据阻塞后续所有轨迹
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List
+
+import orjson
+from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError, TimeoutError as PoolTimeoutError
+
+from config.settings import settings
+from dao.delivery_task_dao import delivery_task_dao
+from dao.track_dao import track_dao
+from utils.cache_utils import track_task_cache
+from utils.common_utils import logger
+from utils.event_hub import event_hub, order_topic, user_topic
+from utils.order_utils import order_no_generator, try_lock_file
+
+# 可以上报轨迹的任务状态
+OPEN_TASK_STATUSES = ("pending", "delivering")
+# spool分段文件名后缀
+SPOOL_SUFFIX = ".spool"
+# spool目录锁文件（进程存活期间持有）
+SPOOL_LOCK_NAME = ".lock"
+# spool子目录前缀（worker_{worker_id}）
+SPOOL_DIR_PREFIX = "worker_"
+# 死信文件名（无法写入数据库的轨迹，每行一条：{track, error}）
+DEAD_LETTER_NAME = "dead_letter.jsonl"
+
+
+class TrackBufferFullError(Exception):
+    """未写入数据库的轨迹点过多（数据库持续不可用）"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    是否为可重试的错误（数据库连接不可用、连接池超时），其他错误重试也不会成功
+    :param error:
+    :return:
+    """
+    if isinstance(error, (OperationalError, DisconnectionError, PoolTimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class TrackIngestor:
+    """
+    轨迹写入器：
+    1. append：追加spool并落盘 → 进入缓冲区 → 更新最新轨迹表，返回即表示轨迹不会丢失
+    2. 后台线程flush：切换spool分段，把旧分段的轨迹批量写入数据库，成功后删除旧分段；
+       连接类错误保留分段，下次按原顺序重试；数据错误把无法写入的轨迹移入死信文件后删除分段
+    3. 未写入数据库的轨迹点超过max_buffer时拒绝新的轨迹（TrackBufferFullError）
+    """
+
+    def __init__(self, spool_root: str, batch_size: int, flush_interval: float, max_buffer: int,
+                 latest_max_size: int, latest_ttl: float, fsync: bool):
+        self.spool_root = spool_root
+        self.spool_dir: str | None = None  # 当前进程的spool子目录（启动时确定）
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.latest_max_size = latest_max_size
+        self.latest_ttl = latest_ttl
+        self.fsync = fsync
+        # 锁顺序：_flush_lock → _sync_lock → _write_lock
+        self._write_lock = threading.Lock()  # 保护当前spool分段和缓冲区
+        self._sync_lock = threading.Lock()  # 同一时刻只有一个线程执行fsync，其他线程等待后复用其结果
+        self._flush_lock = threading.Lock()  # 保护待写入数据库的分段队列
+        self._latest_lock = threading.Lock()
+        self._spool_file = None
+        self._spool_path: str | None = None
+        self._dir_lock = None  # 当前spool子目录的锁文件
+        self._segment_no = 0
+        self._buffer: List[dict] = []
+        self._segments: deque = deque()  # (分段路径, 轨迹列表)：已切换、未写入数据库
+        self._appended = 0  # 已追加到spool的批次数
+        self._synced = 0  # 已落盘的批次数
+        self._pending = 0  # 已确认、未写入数据库的轨迹点数
+        self._latest: OrderedDict = OrderedDict()  # 任务ID -> (最新轨迹, 过期时间)（LRU）
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.accepted = 0  # 已确认的轨迹点数
+        self.written = 0  # 已写入数据库的轨迹点数
+        self.recovered = 0  # 启动时从spool恢复的轨迹点数
+        self.rejected = 0  # 缓冲区已满被拒绝的轨迹点数
+        self.fsyncs = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_letters = 0  # 写入死信文件的轨迹点数
+
+    # ===================== 启动/停止 =====================
+    def start(self) -> None:
+        """恢复残留的spool分段并启动后台写入线程（项目启动时调用）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.spool_dir = os.path.join(self.spool_root, f"{SPOOL_DIR_PREFIX}{order_no_generator.worker_id}")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._dir_lock = self._lock_spool_dir(self.spool_dir)
+        self._adopt_orphans()
+        self._recover()
+        self._open_segment()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="track-ingestor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        停止后台写入线程，写入缓冲区中剩余的轨迹（写入失败的轨迹保留在spool中，下次启动时恢复）
+        :param timeout: 最长等待秒数
+        :return:
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        self.flush()
+        with self._sync_lock, self._write_lock:
+            self._spool_file.close()
+            if not self._buffer:
+                os.remove(self._spool_path)
+            self._spool_file = None
+        self._dir_lock.close()
+        self._dir_lock = None
+
+    def _run(self) -> None:
+        """后台线程：缓冲区达到batch_size或超过flush_interval时写入数据库"""
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("轨迹写入线程异常：%s", e)
+
+    # ===================== 写入 =====================
+    def append(self, tracks: List[dict]) -> None:
+        """
+        追加一批轨迹（落盘后返回）
+        :param tracks: [{task_id, track_node, track_time, track_address, driver_id}, ...]
+        :return:
+        """
+        line = orjson.dumps(tracks) + b"\n"
+        with self._write_lock:
+            if self._spool_file is None:
+                raise RuntimeError("轨迹写入器未启动")
+            if self._pending + len(tracks) > self.max_buffer:
+                self.rejected += len(tracks)
+                raise TrackBufferFullError("轨迹写入繁忙，请稍后重试")
+            self._spool_file.write(line)
+            if not self.fsync:
+                self._spool_file.flush()  # 写入操作系统缓存：进程崩溃不丢
+            self._buffer.extend(tracks)
+            self._appended += 1
+            ticket = self._appended
+            self._pending += len(tracks)
+            self.accepted += len(tracks)
+            wakeup = len(self._buffer) >= self.batch_size
+        if self.fsync:
+            self._sync(ticket)
+        self._update_latest(tracks)
+        if wakeup:
+            self._wakeup.set()
+
+    def _sync(self, ticket: int) -> None:
+        """
+        保证第ticket批及之前追加的轨迹已落盘（组提交：一次fsync覆盖此前所有已追加的批次）
+        :param ticket:
+        :return:
+        """
+        with self._sync_lock:
+            if self._synced >= ticket:
+                return
+            with self._write_lock:
+                self._spool_file.flush()
+                target = self._appended
+                fd = self._spool_file.fileno()
+            # fsync期间不持有_write_lock，其他请求可以继续追加（下一次fsync一起落盘）
+            os.fsync(fd)
+            self.fsyncs += 1
+            self._synced = max(self._synced, target)
+
+    def flush(self) -> int:
+        """
+        把缓冲区切换为新分段，并按顺序写入所有待写入的分段
+        :return: 本次写入数据库的轨迹点数
+        """
+        with self._flush_lock:
+            self._rotate()
+            written = 0
+            while self._segments:
+                path, tracks = self._segments[0]
+                try:
+                    track_dao.batch_create_tracks(tracks)
+                    written += len(tracks)
+                    with self._write_lock:
+                        self._pending -= len(tracks)
+                except Exception as e:
+                    if is_transient_error(e):
+                        # 保留分段，下次按原顺序重试
+                        self.failed_flushes += 1
+                        logger.error("轨迹写入数据库失败（%s条，稍后重试）：%s", len(tracks), e)
+                        break
+                    logger.error("轨迹写入数据库失败（%s条），逐段定位无法写入的轨迹：%s", len(tracks), e)
+                    try:
+                        written += self._write_isolating()
+                    except Exception as e:
+                        self.failed_flushes += 1
+                        logger.error("轨迹写入数据库失败（剩余%s条，稍后重试）：%s", len(self._segments[0][1]), e)
+                        break
+                self._segments.popleft()
+                os.remove(path)
+            if written:
+                self.written += written
+                self.flushes += 1
+            return written
+
+    def _write_isolating(self) -> int:
+        """
+        二分写入队首分段的轨迹：写入失败的块拆成两半重试，单条仍失败（非连接类错误）时移入死信文件
+        中途出现连接类错误时向上抛出，队首分段替换为尚未处理的轨迹（已写入和已移入死信的不再重试）
+        :return: 写入数据库的轨迹点数
+        """
+        path, tracks = self._segments[0]
+        chunks = [tracks]
+        written = 0
+        try:
+            while chunks:
+                chunk = chunks[-1]
+                try:
+                    track_dao.batch_create_tracks(chunk)
+                    written += len(chunk)
+                except Exception as e:
+                    if is_transient_error(e):
+                        raise
+                    if len(chunk) > 1:
+                        middle = len(chunk) // 2
+                        chunks[-1:] = [chunk[middle:], chunk[:middle]]
+                        continue
+                    self._dead_letter(chunk[0], e)
+                chunks.pop()
+        except Exception:
+            self.written += written
+            raise
+        finally:
+            remaining = [track for chunk in reversed(chunks) for track in chunk]
+            self._segments[0] = (path, remaining)
+            with self._write_lock:
+                self._pending -= len(tracks) - len(remaining)
+        return written
+
+    def _dead_letter(self, track: dict, error: Exception) -> None:
+        """
+        无法写入数据库的轨迹追加到死信文件（落盘后才删除所在分段）
+        :param track:
+        :param error:
+        :return:
+        """
+        with open(os.path.join(self.spool_dir, DEAD_LETTER_NAME), "ab") as file:
+            file.write(orjson.dumps({"track": track, "error": str(error)}) + b"\n")
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        self.dead_letters += 1
+        logger.error("轨迹无法写入数据库，已移入死信文件（task_id=%s）：%s", track.get("task_id"), error)
+
+    def _rotate(self) -> None:
+        """缓冲区非空时关闭当前spool分段（落盘），缓冲区随分段进入待写入队列，打开新分段"""
+        with self._sync_lock, self._write_lock:
+            if not self._buffer or self._spool_file is None:
+                return
+            self._spool_file.flush()
+            if self.fsync:
+                os.fsync(self._spool_file.fileno())
+            self._spool_file.close()
+            self._synced = self._appended
+            self._segments.append((self._spool_path, self._buffer))
+            self._buffer = []
+            self._open_segment()
+
+    def _open_segment(self) -> None:
+        """打开下一个spool分段（编号递增，恢复时按编号顺序写入）"""
+        self._segment_no += 1
+        self._spool_path = os.path.join(self.spool_dir, f"{self._segment_no:012d}{SPOOL_SUFFIX}")
+        self._spool_file = open(self._spool_path, "ab")
+
+    @staticmethod
+    def _lock_spool_dir(spool_dir: str, timeout: float = 10.0):
+        """
+        锁定本进程的spool子目录（其他进程正在接管该目录时短暂等待）
+        :param spool_dir:
+        :param timeout: 最长等待秒数
+        :return: 锁文件（保持打开即持有锁）
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            lock_file = try_lock_file(os.path.join(spool_dir, SPOOL_LOCK_NAME))
+            if lock_file is not None:
+                return lock_file
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"轨迹spool目录{spool_dir}被其他进程占用")
+            time.sleep(0.1)
+
+    def _adopt_orphans(self) -> None:
+        """
+        接管没有存活进程持有的其他worker目录：按原顺序把残留分段重命名到本进程目录（编号接在本目录的分段之后），
+        由_recover统一恢复；重命名是原子操作，任何时刻一个分段只属于一个目录
+        """
+        next_no = max((int(name[:-len(SPOOL_SUFFIX)]) for name in os.listdir(self.spool_dir)
+                       if name.endswith(SPOOL_SUFFIX)), default=0)
+        for dir_name in sorted(os.listdir(self.spool_root)):
+            orphan_dir = os.path.join(self.spool_root, dir_name)
+            if (not dir_name.startswith(SPOOL_DIR_PREFIX) or orphan_dir == self.spool_dir
+                    or not os.path.isdir(orphan_dir)):
+                continue
+            lock_file = try_lock_file(os.path.join(orphan_dir, SPOOL_LOCK_NAME))
+            if lock_file is None:
+                continue  # 存活进程的目录
+            try:
+                names = sorted(name for name in os.listdir(orphan_dir) if name.endswith(SPOOL_SUFFIX))
+                for name in names:
+                    next_no += 1
+                    os.rename(os.path.join(orphan_dir, name),
+                              os.path.join(self.spool_dir, f"{next_no:012d}{SPOOL_SUFFIX}"))
+                if names:
+                    logger.info("接管轨迹spool目录%s（%s个分段）", orphan_dir, len(names))
+            finally:
+                lock_file.close()
+
+    def _recover(self) -> None:
+        """读取残留的spool分段，加入待写入队列并立即写入数据库"""
+        names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith(SPOOL_SUFFIX))
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            tracks = []
+            with open(path, "rb") as file:
+                for line in file:
+                    try:
+                        batch = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # 末尾不完整的一行：写入时进程崩溃，该批未落盘、未向客户端确认
+                        logger.warning("轨迹spool分段%s末尾有不完整的记录，已跳过", name)
+                        continue
+                    for track in batch:
+                        track["track_time"] = datetime.fromisoformat(track["track_time"])
+                    tracks.extend(batch)
+            self._segments.append((path, tracks))
+            self._pending += len(tracks)
+            self.recovered += len(tracks)
+            self._update_latest(tracks)
+            self._segment_no = max(self._segment_no, int(name[:-len(SPOOL_SUFFIX)]))
+        if names:
+            logger.info("从spool恢复轨迹%s条（%s个分段）", self.recovered, len(names))
+            self.flush()
+
+    # ===================== 最新轨迹 =====================
+    def _update_latest(self, tracks: List[dict]) -> None:
+        """
+        更新任务的最新轨迹（按track_time取较新的，时间相同时取后到的），并重新计算有效期
+        :param tracks:
+        :return:
+        """
+        expires_at = time.monotonic() + self.latest_ttl
+        with self._latest_lock:
+            for track in tracks:
+                current = self._latest.get(track["task_id"])
+                if current is not None and current[0]["track_time"] > track["track_time"]:
+                    track = current[0]
+                self._latest[track["task_id"]] = (track, expires_at)
+                self._latest.move_to_end(track["task_id"])
+            while len(self._latest) > self.latest_max_size:
+                self._latest.popitem(last=False)
+
+    def get_latest(self, task_ids: List[int]) -> Dict[int, dict]:
+        """
+        查询任务的最新轨迹（内存中没有或已过期的任务查询数据库，与内存中的轨迹比较后放入内存）
+        :param task_ids:
+        :return: {任务ID: {task_id, track_node, track_time, track_address, driver_id}}（没有轨迹的任务不返回）
+        """
+        result, missing = {}, []
+        now = time.monotonic()
+        with self._latest_lock:
+            for task_id in task_ids:
+                current = self._latest.get(task_id)
+                if current is None or current[1] <= now:
+                    missing.append(task_id)
+                else:
+                    result[task_id] = current[0]
+        if missing:
+            self._update_latest(list(track_dao.get_latest_tracks(missing).values()))
+            with self._latest_lock:
+                for task_id in missing:
+                    # 合并结果：数据库中的最新轨迹与本进程尚未写入数据库的轨迹取较新的
+                    current = self._latest.get(task_id)
+                    if current is not None:
+                        result[task_id] = current[0]
+        return result
+
+    def stats(self) -> dict:
+        """写入器统计（供管理接口查看）"""
+        with self._write_lock:
+            return {
+                "spool_dir": self.spool_dir,
+                "buffer_size": len(self._buffer),
+                "pending": self._pending,
+                "pending_segments": len(self._segments),
+                "accepted": self.accepted,
+                "written": self.written,
+                "recovered": self.recovered,
+                "rejected": self.rejected,
+                "fsyncs": self.fsyncs,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "dead_letters": self.dead_letters,
+                "latest_size": len(self._latest)
+            }
+
+
+class TrackService:
+    def ingest_tracks(self, current_user: dict, points: List[dict]) -> Dict | None:
+        """
+        上报轨迹（司机只能上报自己未完成任务的轨迹，管理员不限司机）
+        :param current_user:
+        :param points: [{task_id, track_node, track_time, track_address}, ...]
+        :return: {accepted, rejected: [{task_id, reason}]}
+        """
+        if current_user["role"] not in ("driver", "admin"):
+            return None
+
+        owners = self._get_task_owners(list({point["task_id"] for point in points}))
+        now = datetime.now().replace(microsecond=0)
+        tracks, rejected = [], {}
+        for point in points:
+            task_id = point["task_id"]
+            owner = owners.get(task_id)
+            if owner is None:
+                rejected[task_id] = "任务不存在"
+            elif owner[1] not in OPEN_TASK_STATUSES:
+                rejected[task_id] = "任务已结束"
+            elif current_user["role"] == "driver" and owner[0] != current_user["id"]:
+                rejected[task_id] = "无权限上报该任务的轨迹"
+            else:
+                track_time = point.get("track_time")
+                if track_time:
+                    # 转换为服务器本地时间（不带时区的时间视为本地时间），与DATETIME列精度一致（秒）
+                    track_time = track_time.astimezone().replace(microsecond=0, tzinfo=None)
+                tracks.append({
+                    "task_id": task_id,
+                    "track_node": point["track_node"],
+                    "track_time": track_time or now,
+                    "track_address": point.get("track_address"),
+                    "driver_id": owner[0]
+                })
+        if tracks:
+            track_ingestor.append(tracks)
+            self._publish_tracks(tracks, owners)
+        return {
+            "accepted": len(tracks),
+            "rejected": [{"task_id": task_id, "reason": reason} for task_id, reason in rejected.items()]
+        }
+
+    def get_latest_tracks(self, current_user: dict, task_ids: List[int]) -> List[dict] | None:
+        """
+        查询任务的最新轨迹节点（司机只能查询自己的任务，管理员不限）
+        :param current_user:
+        :param task_ids:
+        :return:
+        """
+        if current_user["role"] not in ("driver", "admin"):
+            return None
+        if current_user["role"] == "driver":
+            owners = self._get_task_owners(task_ids)
+            task_ids = [task_id for task_id in task_ids if owners.get(task_id, (None,))[0] == current_user["id"]]
+        latest = track_ingestor.get_latest(task_ids)
+        return [self._track_to_dict(latest[task_id]) for task_id in task_ids if task_id in latest]
+
+    def _publish_tracks(self, tracks: List[dict], owners: Dict[int, tuple]) -> None:
+        """
+        推送每个任务本批最新的轨迹节点（订阅了订单、司机、订单创建人的连接）
+        :param tracks: 已落盘的轨迹
+        :param owners: {任务ID: (司机ID, 任务状态, 订单ID, 订单创建人ID)}
+        :return:
+        """
+        if not event_hub.has_subscribers():
+            return
+        latest: Dict[int, dict] = {}
+        for track in tracks:
+            current = latest.get(track["task_id"])
+            if current is None or track["track_time"] >= current["track_time"]:
+                latest[track["task_id"]] = track
+        events = []
+        for task_id, track in latest.items():
+            driver_id, _, order_id, create_user_id = owners[task_id]
+            topics = [order_topic(order_id)]
+            topics.extend(user_topic(user_id) for user_id in {driver_id, create_user_id} if user_id)
+            events.append((topics, "track", {"order_id": order_id, **self._track_to_dict(track)}))
+        event_hub.publish_many(events)
+
+    def _get_task_owners(self, task_ids: List[int]) -> Dict[int, tuple]:
+        """
+        批量查询任务的(司机ID, 任务状态, 订单ID, 订单创建人ID)（优先读缓存，未命中的一次查询）
+        :param task_ids:
+        :return:
+        """
+        owners, missing = {}, []
+        for task_id in task_ids:
+            owner = track_task_cache.get(task_id)
+            if owner is None:
+                missing.append(task_id)
+            else:
+                owners[task_id] = owner
+        if missing:
+            for task_id, owner in delivery_task_dao.get_task_owners(missing).items():
+                track_task_cache.set(task_id, owner)
+                owners[task_id] = owner
+        return owners
+
+    @staticmethod
+    def _track_to_dict(track: dict) -> dict:
+        """最新轨迹转字典（时间格式化）"""
+        return {
+            "task_id": track["task_id"],
+            "track_node": track["track_node"],
+            "track_time": track["track_time"].isoformat(" ", "seconds") if track["track_time"] else None,
+            "track_address": track["track_address"],
+            "driver_id": track["driver_id"]
+        }
+
+
+# 全局轨迹写入器
+track_ingestor = TrackIngestor(
+    spool_root=settings.TRACK_SPOOL_DIR,
+    batch_size=settings.TRACK_BATCH_SIZE,
+    flush_interval=settings.TRACK_FLUSH_INTERVAL_SECONDS,
+    max_buffer=settings.TRACK_BUFFER_MAX_POINTS,
+    latest_max_size=settings.TRACK_LATEST_MAX_SIZE,
+    latest_ttl=settings.TRACK_LATEST_TTL_SECONDS,
+    fsync=settings.TRACK_SPOOL_FSYNC
+)
+
+# 创建Service实例
+track_service = TrackService()
@@ -1,34 +1,37 @@
+from starlette.concurrency import run_in_threadpool
+
 from dao.user_dao import user_dao
 from models.schema.user_schema import UserCreateRequest, UserUpdateRequest, PasswordResetRequest
 from utils.jwt_utils import create_access_token
-from utils.password_utils import verify_password
+from utils.password_utils import hash_password_async, verify_password_async
 
 
 class UserService:
-    def register(self, user_request: UserCreateRequest) -> dict:
+    async def register(self, user_request: UserCreateRequest) -> dict:
         """
-        用户注册
+        用户注册（密码在独立进程池中加密，数据库操作在线程池中执行）
         :param user_request:
         :return:
         """
         # 转换为字典（过滤Pydantic额外字段）
         user_data = user_request.dict()
-        user = user_dao.create_user(user_data)
+        user_data["password"] = await hash_password_async(user_data["password"])
+        user = await run_in_threadpool(user_dao.create_user, user_data)
         return user
 
-    def login(self, username: str, password: str) -> tuple[str, dict] | None:
+    async def login(self, username: str, password: str) -> tuple[str, dict] | None:
         """
         用户登录：验证成功返回令牌和用户信息
         :param username:
         :param password:
         :return:
         """
-        user = user_dao.get_user_by_username(username)
-        user_password = user.pop("password")
+        user = await run_in_threadpool(user_dao.get_user_by_username, username)
         if not user:
             return None
-        # 验证密码
-        if not verify_password(password, user_password):
+        user_password = user.pop("password")
+        # 验证密码（在独立进程池中执行）
+        if not await verify_password_async(password, user_password):
             return None
 
         # 生成JWT令牌
@@ -54,7 +57,7 @@ class UserService:
         user = user_dao.update_user_info(user_id, update_data)
         return user
 
-    def reset_password(self, user_id: int, reset_request: PasswordResetRequest) -> bool:
+    async def reset_password(self, user_id: int, reset_request: PasswordResetRequest) -> bool:
         """
         重置密码
         :param user_id:
@@ -62,10 +65,11 @@ class UserService:
         :return:
         """
         # 先验证原密码
-        user = user_dao.get_user_by_id(user_id)
-        if not user or not verify_password(reset_request.old_password, user["password"]):
+        user = await run_in_threadpool(user_dao.get_user_by_id, user_id)
+        if not user or not await verify_password_async(reset_request.old_password, user["password"]):
             return False
-        return user_dao.reset_password(user_id, reset_request.new_password)
+        hashed_password = await hash_password_async(reset_request.new_password)
+        return await run_in_threadpool(user_dao.reset_password, user_id, hashed_password)
 
 
 user_service = UserService()
@@ -0,0 +1,190 @@
+"""
+仓库定位器：内存中按省/市/区索引全部仓库及剩余容量（capacity_limit - current_stock），
+创建订单时按发件地址O(1)匹配仓库，不查询仓库表
+剩余容量以数据库为准（库存变化由入库/出库等流程写入current_stock，定位器只读不预占）
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Hashable
+
+from config.settings import settings
+from dao.warehouse_dao import warehouse_dao
+from utils.common_utils import logger
+
+# 增量刷新的回看窗口（秒）：事务提交晚于update_time的仓库修改也能被下一次刷新读到（重复读取是幂等的）
+REFRESH_OVERLAP_SECONDS = 5
+
+
+class _WarehouseEntry:
+    """定位器中的单个仓库"""
+    __slots__ = ("id", "keys", "remaining")
+
+    def __init__(self, warehouse_id: int, keys: tuple, remaining: int):
+        self.id = warehouse_id
+        self.keys = keys  # 所属的索引键（区/市/省/全局）
+        self.remaining = remaining  # 剩余容量
+
+
+class WarehouseLocator:
+    """
+    仓库定位器：
+    1. 索引键为(省, 市, 区) / (省, 市) / (省,) / ()，每个键预先算好剩余容量最大的未满仓库
+    2. locate按 同区 → 同市 → 同省 → 全局 依次取预计算结果，每级一次字典查找；
+       该级最佳仓库的剩余容量不足本单货物件数时（该级所有仓库都不足）继续匹配下一级
+    3. 后台线程按update_time增量刷新（仓库新增/修改/删除、库存变化都会更新update_time），
+       只重算发生变化的仓库所在的索引键
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._entries: dict[int, _WarehouseEntry] = {}
+        self._members: dict[Hashable, set[int]] = {}  # 索引键 -> 仓库ID集合
+        self._best: dict[Hashable, int] = {}  # 索引键 -> 剩余容量最大的未满仓库ID
+        self._lock = threading.Lock()  # 保护索引修改（读取不加锁：单次字典查找是原子的）
+        self._refresh_lock = threading.Lock()
+        self._watermark: datetime | None = None  # 已读取到的最大update_time
+        self._loaded = False
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.refresh_count = 0
+        self.last_refresh_time: datetime | None = None
+
+    def locate(self, province: str | None, city: str | None, district: str | None, quantity: int = 1) -> int | None:
+        """
+        为发件地址匹配仓库（同区 → 同市 → 同省 → 全局剩余容量最大、且不少于quantity的仓库）
+        :param province:
+        :param city:
+        :param district:
+        :param quantity: 货物件数
+        :return: 仓库ID（没有剩余容量足够的仓库时返回None）
+        """
+        if not self._loaded:
+            self.refresh()
+        for key in _location_keys(province, city, district):
+            warehouse_id = self._best.get(key)
+            entry = self._entries.get(warehouse_id) if warehouse_id is not None else None
+            if entry is not None and entry.remaining >= quantity:
+                return warehouse_id
+        return None
+
+    def refresh(self) -> int:
+        """
+        增量刷新：读取上次刷新以来有变化的仓库（首次为全量）
+        :return: 本次读取的仓库数
+        """
+        with self._refresh_lock:
+            since = None if self._watermark is None else self._watermark - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+            rows = warehouse_dao.list_changed_warehouses(since)
+            with self._lock:
+                dirty_keys = set()
+                for row in rows:
+                    dirty_keys.update(self._apply(row))
+                for key in dirty_keys:
+                    self._recompute(key)
+            update_times = [row["update_time"] for row in rows if row["update_time"] is not None]
+            if self._watermark is not None:
+                update_times.append(self._watermark)
+            if update_times:
+                self._watermark = max(update_times)
+            self._loaded = True
+            self.refresh_count += 1
+            self.last_refresh_time = datetime.now()
+            return len(rows)
+
+    def _apply(self, row: dict) -> set:
+        """
+        应用一个仓库的最新数据（已删除的仓库从索引中移除）
+        :param row:
+        :return: 受影响的索引键
+        """
+        dirty_keys = set()
+        old = self._entries.pop(row["id"], None)
+        if old is not None:
+            for key in old.keys:
+                self._members[key].discard(old.id)
+            dirty_keys.update(old.keys)
+        if row["is_delete"]:
+            return dirty_keys
+
+        keys = tuple(_location_keys(row["province"], row["city"], row["district"]))
+        entry = _WarehouseEntry(row["id"], keys, (row["capacity_limit"] or 0) - (row["current_stock"] or 0))
+        self._entries[entry.id] = entry
+        for key in keys:
+            self._members.setdefault(key, set()).add(entry.id)
+        dirty_keys.update(keys)
+        return dirty_keys
+
+    def _recompute(self, key: Hashable) -> None:
+        """
+        重算一个索引键的最佳仓库（剩余容量最大，相同时取ID小的）
+        :param key:
+        :return:
+        """
+        best_id, best_remaining = None, 0
+        for warehouse_id in self._members.get(key, ()):
+            remaining = self._entries[warehouse_id].remaining
+            if remaining > best_remaining or (remaining == best_remaining > 0 and warehouse_id < best_id):
+                best_id, best_remaining = warehouse_id, remaining
+        if best_id is None:
+            self._best.pop(key, None)
+        else:
+            self._best[key] = best_id
+
+    def start(self) -> None:
+        """全量加载并启动后台增量刷新线程（项目启动时调用）"""
+        self.refresh()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="warehouse-locator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台刷新线程（项目关闭时调用）"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        """后台线程：定时增量刷新"""
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("仓库定位器刷新失败：%s", e)
+
+    def stats(self) -> dict:
+        """定位器统计（供管理接口查看）"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "warehouse_count": len(entries),
+            "full_count": sum(1 for entry in entries if entry.remaining <= 0),
+            "refresh_count": self.refresh_count,
+            "last_refresh_time": self.last_refresh_time.strftime("%Y-%m-%d %H:%M:%S") if self.last_refresh_time else None,
+            "watermark": self._watermark.strftime("%Y-%m-%d %H:%M:%S") if self._watermark else None
+        }
+
+
+def _location_keys(province: str | None, city: str | None, district: str | None) -> list[tuple]:
+    """
+    地址对应的索引键（从精确到宽泛，缺失的层级跳过）
+    :param province:
+    :param city:
+    :param district:
+    :return: 如[("广东省", "深圳市", "南山区"), ("广东省", "深圳市"), ("广东省",), ()]
+    """
+    keys = []
+    if province:
+        if city:
+            if district:
+                keys.append((province, city, district))
+            keys.append((province, city))
+        keys.append((province,))
+    keys.append(())
+    return keys
+
+
+# 全局仓库定位器
+warehouse_locator = WarehouseLocator(refresh_interval=settings.WAREHOUSE_REFRESH_SECONDS)
@@ -0,0 +1,59 @@
+"""
+数据库指标采集开销基准：同一个SQLite内存库分别在未挂载/挂载指标事件时执行相同的SQL，对比单条SQL耗时
+用法：
+python test/bench_db_metrics.py --count 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from utils.db_metrics import DBMetrics  # noqa: E402
+from utils.metrics_utils import Histogram  # noqa: E402
+from utils.request_context import RequestContext, set_request_context, reset_request_context  # noqa: E402
+
+
+def run_statements(engine, count: int) -> float:
+    """执行count条SELECT，返回单条平均耗时（微秒）"""
+    statement = text("SELECT 1")
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for _ in range(count):
+            conn.execute(statement).scalar()
+        return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50000)
+    args = parser.parse_args()
+
+    histogram = Histogram()
+    start = time.perf_counter()
+    for index in range(args.count):
+        histogram.observe(index * 1e-6)
+    print(f"Histogram.observe：{(time.perf_counter() - start) / args.count * 1e6:.2f} 微秒/次")
+
+    plain_engine = create_engine("sqlite://")
+    plain = run_statements(plain_engine, args.count)
+
+    metrics = DBMetrics()
+    instrumented_engine = create_engine("sqlite://")
+    metrics.instrument_engine(instrumented_engine, "bench")
+    token = set_request_context(RequestContext())
+    try:
+        instrumented = run_statements(instrumented_engine, args.count)
+    finally:
+        reset_request_context(token)
+
+    print(f"未挂载指标：{plain:.2f} 微秒/条")
+    print(f"挂载指标：  {instrumented:.2f} 微秒/条（额外开销 {instrumented - plain:.2f} 微秒/条）")
+    print(f"SELECT耗时分布（秒）：{metrics.statement_latency['SELECT'].snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+配送时间线/最新节点基准：对同一订单重复查询，对比耗时和每次执行的SQL条数
+1. ORM懒加载：CoreOrder → delivery_task → track_records（逐级懒加载，内存中按轨迹时间排序）
+2. 一次联表查询（OrderDAO.get_order_timeline，走idx_task_order_time、idx_track_task_time）
+3. 最新节点（TimelineService.get_order_latest）：冷（清空订单任务缓存和内存最新轨迹）/ 热（跟踪页轮询）
+连接.env中的MYSQL_URL，--order-id需为已有配送任务和轨迹的订单
+用法：
+python test/bench_delivery_timeline.py --order-id 1 --rounds 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_utils import summarize  # noqa: E402
+from config.database import db_session, import_models  # noqa: E402
+from dao.order_dao import order_dao  # noqa: E402
+from models.db_model.core_order import CoreOrder  # noqa: E402
+from service.timeline_service import timeline_service  # noqa: E402
+from service.track_service import track_ingestor  # noqa: E402
+from utils.cache_utils import order_task_cache  # noqa: E402
+from utils.sql_tracker import track_sql  # noqa: E402
+
+# 以管理员身份查询（不受订单归属限制）
+ADMIN_USER = {"id": 0, "role": "admin", "username": "bench"}
+
+
+def load_lazy(order_id: int) -> int:
+    """ORM懒加载写法：返回轨迹条数"""
+    with db_session(read_only=True) as db:
+        order = db.get(CoreOrder, order_id)
+        task = order.delivery_task if order else None
+        tracks = sorted(task.track_records, key=lambda track: (track.track_time, track.id)) if task else []
+        return len(tracks)
+
+
+def load_joined(order_id: int) -> int:
+    """一次联表查询：返回轨迹条数"""
+    return sum(row["track_id"] is not None for row in order_dao.get_order_timeline(order_id))
+
+
+def load_latest_cold(order_id: int) -> int:
+    """最新节点（缓存和内存最新轨迹均未命中）"""
+    order_task_cache.clear()
+    track_ingestor._latest.clear()
+    return int(timeline_service.get_order_latest(order_id, ADMIN_USER)["latest_track"] is not None)
+
+
+def load_latest_hot(order_id: int) -> int:
+    """最新节点（跟踪页轮询：缓存命中）"""
+    return int(timeline_service.get_order_latest(order_id, ADMIN_USER)["latest_track"] is not None)
+
+
+def run(name: str, loader, order_id: int, rounds: int) -> None:
+    """
+    重复执行rounds次，输出延迟分布、每次的SQL条数
+    :param name:
+    :param loader:
+    :param order_id:
+    :param rounds:
+    :return:
+    """
+    loader(order_id)  # 预热（连接池、缓存）
+    latencies = []
+    with track_sql(strict=False) as scope:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = loader(order_id)
+            latencies.append(time.perf_counter() - start)
+    summarize(name, latencies)
+    print(f"  结果 {result}，每次SQL {scope.statement_count / rounds:.2f}条")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="配送时间线/最新节点基准")
+    parser.add_argument("--order-id", type=int, required=True, help="已有配送任务和轨迹的订单ID")
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+    import_models()
+
+    run("ORM懒加载", load_lazy, args.order_id, args.rounds)
+    run("一次联表查询", load_joined, args.order_id, args.rounds)
+    run("最新节点（冷）", load_latest_cold, args.order_id, args.rounds)
+    run("最新节点（热）", load_latest_hot, args.order_id, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+日志管道基准：对比模拟请求（少量计算 + 一条INFO日志）在不同日志配置下的延迟
+1. 关闭日志（级别WARNING，INFO被过滤）
+2. 同步写入（原配置：FileHandler + StreamHandler，在请求线程中直接写磁盘）
+3. 队列写入（当前配置：NonBlockingQueueHandler入队，后台线程写JSON行 + 按大小轮转）
+另外对比日志级别关闭时f-string与%s延迟格式化的开销
+--http模式：对已启动的服务压测订单详情接口（分别以LOG_LEVEL=INFO/WARNING启动服务各跑一次对比）
+用法：
+python test/bench_logging.py --requests 20000 --threads 8
+python test/bench_logging.py --http --order-id 1 --requests 2000 --username admin --password 123456
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueListener, RotatingFileHandler
+import queue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_utils import http_request, login, summarize  # noqa: E402
+from utils.common_utils import JsonFormatter, NonBlockingQueueHandler, TEXT_LOG_FORMAT  # noqa: E402
+
+
+def build_logger(mode: str, log_dir: str) -> tuple[logging.Logger, QueueListener | None]:
+    """
+    构造独立的日志器（不影响项目的根日志器）
+    :param mode: off/sync/queue
+    :param log_dir:
+    :return: (日志器, 后台线程)
+    """
+    bench_logger = logging.getLogger(f"bench_logging.{mode}")
+    bench_logger.propagate = False
+    bench_logger.handlers.clear()
+    bench_logger.setLevel(logging.WARNING if mode == "off" else logging.INFO)
+    # 控制台输出重定向到文件，避免终端渲染速度影响结果
+    console = logging.StreamHandler(open(os.path.join(log_dir, f"{mode}.console.log"), "w", encoding="utf-8"))
+    console.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+
+    if mode == "queue":
+        file_handler = RotatingFileHandler(os.path.join(log_dir, "queue.log"), maxBytes=50 * 1024 * 1024,
+                                           backupCount=3, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        bench_logger.addHandler(NonBlockingQueueHandler(log_queue))
+        listener = QueueListener(log_queue, file_handler, console)
+        listener.start()
+        return bench_logger, listener
+
+    file_handler = logging.FileHandler(os.path.join(log_dir, f"{mode}.log"), encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+    bench_logger.addHandler(file_handler)
+    bench_logger.addHandler(console)
+    return bench_logger, None
+
+
+def fake_request(bench_logger: logging.Logger, index: int) -> float:
+    """模拟一次请求：组装订单字典 + 记录一条INFO日志，返回耗时（秒）"""
+    start = time.perf_counter()
+    order = {"order_no": f"{10 ** 16 + index}", "order_status": "pending", "create_user_id": index % 100}
+    bench_logger.info("订单创建成功：%s（创建人：%s）", order["order_no"], order["create_user_id"])
+    return time.perf_counter() - start
+
+
+def bench_in_process(requests: int, threads: int) -> None:
+    """进程内对比三种日志配置"""
+    with tempfile.TemporaryDirectory(prefix="wuliu_log_bench_") as log_dir:
+        for mode in ("off", "sync", "queue"):
+            bench_logger, listener = build_logger(mode, log_dir)
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                latencies = list(executor.map(lambda i: fake_request(bench_logger, i), range(requests)))
+            if listener is not None:
+                flush_start = time.perf_counter()
+                listener.stop()
+                print(f"（队列模式后台写完剩余日志耗时 {(time.perf_counter() - flush_start) * 1000:.1f}ms）")
+            for handler in bench_logger.handlers:
+                handler.close()
+            summarize(f"日志模式={mode:<5}", latencies)
+
+    disabled = logging.getLogger("bench_logging.disabled")
+    disabled.setLevel(logging.WARNING)
+    payload = {"order_no": "13052871690338304", "items": list(range(20))}
+    for name, func in (("f-string", lambda: disabled.info(f"订单：{payload}")),
+                       ("%s延迟格式化", lambda: disabled.info("订单：%s", payload))):
+        start = time.perf_counter()
+        for _ in range(requests):
+            func()
+        print(f"级别关闭时 {name}：{(time.perf_counter() - start) / requests * 1e6:.2f} 微秒/次")
+
+
+def bench_http(order_id: int, requests: int, threads: int, username: str, password: str) -> None:
+    """对已启动的服务压测（服务端日志级别由启动时的LOG_LEVEL决定）"""
+    token = login(username, password)
+    path = f"/api/v1/order/detail/{order_id}"
+    lock = threading.Lock()
+    latencies = []
+
+    def worker(_):
+        code, _, cost = http_request("GET", path, token=token)
+        if code == 200:
+            with lock:
+                latencies.append(cost)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(requests)))
+    summarize(f"GET {path}", latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日志管道基准")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--http", action="store_true", help="压测已启动的服务")
+    parser.add_argument("--order-id", type=int, default=1)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="123456")
+    args = parser.parse_args()
+
+    if args.http:
+        bench_http(args.order_id, args.requests, args.threads, args.username, args.password)
+    else:
+        bench_in_process(args.requests, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+压测：登录洪峰期间订单查询接口的延迟
+步骤：
+1. 无登录压力时，持续请求 /api/v1/order/query，记录基线延迟
+2. 启动大量并发登录请求（bcrypt计算），同时继续请求订单查询，对比延迟
+用法：
+python test/bench_login_flood.py --username admin --password 123456 --flood 50 --duration 10
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from bench_utils import http_request, login, summarize
+
+
+def query_loop(token: str, stop: threading.Event, latencies: list) -> None:
+    """循环请求订单查询接口"""
+    while not stop.is_set():
+        code, _, elapsed = http_request("GET", "/api/v1/order/query?page=1&page_size=10", token=token)
+        if code == 200:
+            latencies.append(elapsed)
+
+
+def login_loop(username: str, password: str, stop: threading.Event, codes: Counter) -> None:
+    """循环请求登录接口（制造bcrypt计算压力）"""
+    while not stop.is_set():
+        code, _, _ = http_request("POST", "/api/v1/user/login", body={"username": username, "password": password})
+        codes[code] += 1
+
+
+def run_phase(token: str, args, with_flood: bool) -> tuple[list, Counter]:
+    """执行一个压测阶段"""
+    stop = threading.Event()
+    latencies, codes = [], Counter()
+    threads = [threading.Thread(target=query_loop, args=(token, stop, latencies)) for _ in range(args.query_workers)]
+    if with_flood:
+        threads += [threading.Thread(target=login_loop, args=(args.username, args.password, stop, codes))
+                    for _ in range(args.flood)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录洪峰下的订单查询延迟压测")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--flood", type=int, default=50, help="并发登录线程数")
+    parser.add_argument("--query-workers", type=int, default=4, help="并发订单查询线程数")
+    parser.add_argument("--duration", type=float, default=10, help="每个阶段的持续秒数")
+    args = parser.parse_args()
+
+    token = login(args.username, args.password)
+
+    latencies, _ = run_phase(token, args, with_flood=False)
+    summarize("订单查询（无登录压力）", latencies)
+
+    latencies, codes = run_phase(token, args, with_flood=True)
+    summarize(f"订单查询（{args.flood}并发登录）", latencies)
+    print(f"登录请求结果分布：{dict(codes)}（503表示被准入控制拒绝）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+压测：逐条调用创建订单接口 vs 批量创建订单接口的吞吐对比
+用法：
+python test/bench_order_batch_create.py --username admin --password 123456 --count 2000 --concurrency 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import http_request, login
+
+
+def sample_order(i: int) -> dict:
+    """构造测试订单"""
+    return {
+        "sender_name": f"发件人{i}", "sender_phone": "13800138000",
+        "sender_province": "上海市", "sender_city": "上海市", "sender_district": "浦东新区",
+        "sender_address": f"张江路{i}号",
+        "receiver_name": f"收件人{i}", "receiver_phone": "13900139000",
+        "receiver_province": "北京市", "receiver_city": "北京市", "receiver_district": "朝阳区",
+        "receiver_address": f"建国路{i}号",
+        "goods_type": "普通", "goods_quantity": 1
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单条/批量创建订单吞吐对比")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--count", type=int, default=2000, help="每种方式创建的订单数")
+    parser.add_argument("--concurrency", type=int, default=8, help="逐条创建时的并发数")
+    args = parser.parse_args()
+
+    token = login(args.username, args.password)
+    orders = [sample_order(i) for i in range(args.count)]
+
+    # 逐条创建
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        codes = list(executor.map(lambda o: http_request("POST", "/api/v1/order/create", token, o)[0], orders))
+    single_cost = time.perf_counter() - start
+    single_ok = codes.count(200)
+    print(f"逐条创建（并发{args.concurrency}）：成功{single_ok}/{args.count} "
+          f"耗时{single_cost:.2f}s 吞吐={single_ok / single_cost:.1f} 单/秒")
+
+    # 批量创建
+    start = time.perf_counter()
+    code, _, _ = http_request("POST", "/api/v1/order/batch-create", token, {"items": orders}, timeout=300)
+    batch_cost = time.perf_counter() - start
+    print(f"批量创建：状态码{code} 耗时{batch_cost:.2f}s 吞吐={args.count / batch_cost:.1f} 单/秒")
+    if code == 200 and single_ok:
+        print(f"提升倍数：{(args.count / batch_cost) / (single_ok / single_cost):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
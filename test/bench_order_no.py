@@ -0,0 +1,80 @@
+"""
+订单号生成器：吞吐基准 + 多进程唯一性校验
+1. 单进程逐个生成/批量生成的吞吐（个/秒）
+2. 启动多个进程（模拟多个uvicorn worker）同时生成，校验全部订单号唯一且为17位数字
+用法：
+python test/bench_order_no.py --count 2000000 --processes 8 --per-process 500000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.order_utils import order_no_generator, generate_order_no, generate_order_nos  # noqa: E402
+
+
+def bench(count: int) -> None:
+    """单进程吞吐"""
+    start = time.perf_counter()
+    for _ in range(count):
+        order_no_generator.next_id()
+    print(f"逐个生成ID：{count / (time.perf_counter() - start):,.0f} 个/秒")
+
+    start = time.perf_counter()
+    order_no_generator.next_ids(count)
+    print(f"批量生成ID：{count / (time.perf_counter() - start):,.0f} 个/秒")
+
+    start = time.perf_counter()
+    for _ in range(count):
+        generate_order_no()
+    print(f"逐个生成订单号：{count / (time.perf_counter() - start):,.0f} 个/秒")
+
+    start = time.perf_counter()
+    generate_order_nos(count)
+    print(f"批量生成订单号：{count / (time.perf_counter() - start):,.0f} 个/秒")
+
+
+def worker(count: int, start_event, queue) -> None:
+    """子进程：等待统一开始信号后生成订单号"""
+    start_event.wait()
+    order_nos = [generate_order_no() for _ in range(count)]
+    queue.put((order_no_generator.worker_id, order_nos))
+
+
+def check_multiprocess(processes: int, per_process: int) -> bool:
+    """多进程唯一性校验"""
+    ctx = multiprocessing.get_context("spawn")
+    start_event, queue = ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(per_process, start_event, queue)) for _ in range(processes)]
+    for proc in procs:
+        proc.start()
+    start_event.set()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    worker_ids = [worker_id for worker_id, _ in results]
+    all_order_nos = [order_no for _, order_nos in results for order_no in order_nos]
+    unique = len(set(all_order_nos)) == len(all_order_nos)
+    well_formed = all(len(order_no) == 17 and order_no.isdigit() for order_no in all_order_nos)
+    print(f"{processes}个进程共生成{len(all_order_nos)}个订单号，worker_id={sorted(worker_ids)}")
+    print(f"唯一性：{'通过' if unique else '失败'}，17位数字格式：{'通过' if well_formed else '失败'}")
+    return unique and well_formed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单号生成器基准与唯一性校验")
+    parser.add_argument("--count", type=int, default=2000000)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--per-process", type=int, default=500000)
+    args = parser.parse_args()
+
+    bench(args.count)
+    sys.exit(0 if check_multiprocess(args.processes, args.per_process) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+压测：页码分页与游标分页在第1页/第10000页的查询耗时对比
+直接调用OrderDAO（连接.env中的MYSQL_URL），不经过HTTP
+用法：
+python test/bench_order_pagination.py --seed 200000        # 先灌入20万条测试订单
+python test/bench_order_pagination.py --page 10000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from config.database import db_session  # noqa: E402
+from dao.order_dao import order_dao  # noqa: E402
+from models.db_model.core_order import CoreOrder  # noqa: E402
+from utils.order_utils import encode_order_cursor  # noqa: E402
+
+
+def seed_orders(count: int, batch: int = 5000) -> None:
+    """批量插入测试订单"""
+    prefix = f"BENCH{int(time.time())}"
+    for start in range(0, count, batch):
+        rows = [{
+            "order_no": f"{prefix}{i:010d}",
+            "sender_name": "压测发件人", "receiver_name": "压测收件人",
+            "sender_province": "上海市", "sender_city": "上海市", "sender_district": "浦东新区",
+            "receiver_province": "北京市", "receiver_city": "北京市", "receiver_district": "朝阳区",
+            "goods_quantity": 1, "order_status": "pending", "is_delete": 0
+        } for i in range(start, min(start + batch, count))]
+        with db_session() as db:
+            db.execute(insert(CoreOrder), rows)
+    print(f"已插入{count}条测试订单")
+
+
+def cursor_for_page(page: int, page_size: int) -> str | None:
+    """计算第page页对应的游标（即第page-1页最后一条记录的位置，不计入耗时）"""
+    if page <= 1:
+        return None
+    with db_session() as db:
+        row = db.execute(
+            select(CoreOrder.create_time, CoreOrder.id)
+            .where(CoreOrder.is_delete == 0)
+            .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc())
+            .offset((page - 1) * page_size - 1).limit(1)
+        ).first()
+    if not row:
+        raise SystemExit(f"数据量不足{page}页，请先使用--seed灌入数据")
+    return encode_order_cursor(row.create_time, row.id)
+
+
+def timed(params: dict, repeat: int) -> float:
+    """重复执行查询，返回耗时中位数（毫秒）"""
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        order_dao.query_orders(dict(params))
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页码分页/游标分页耗时对比")
+    parser.add_argument("--seed", type=int, default=0, help="先插入指定数量的测试订单")
+    parser.add_argument("--page", type=int, default=10000, help="深翻页的页码")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_orders(args.seed)
+
+    for page in (1, args.page):
+        base = {"page_size": args.page_size}
+        cursor = cursor_for_page(page, args.page_size)
+        cases = {
+            "页码分页 + exact总数": {**base, "page": page, "total_mode": "exact"},
+            "页码分页 + 不统计总数": {**base, "page": page, "total_mode": "none"},
+            "游标分页 + exact总数": {**base, "pagination_mode": "cursor", "cursor": cursor, "total_mode": "exact"},
+            "游标分页 + 不统计总数": {**base, "pagination_mode": "cursor", "cursor": cursor, "total_mode": "none"},
+        }
+        for name, params in cases.items():
+            print(f"第{page}页 {name}: {timed(params, args.repeat):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
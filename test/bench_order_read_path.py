@@ -0,0 +1,62 @@
+"""
+微基准：订单列表读路径对比（每页10000行）
+- ORM路径：select(CoreOrder) 构造ORM对象 + _order_to_dict
+- 列投影路径：select(ORDER_READ_COLUMNS) 行元组 + _row_to_dict（当前query_orders使用的路径）
+直接连接.env中的MYSQL_URL，数据不足时先用 bench_order_pagination.py --seed 灌数据
+用法：
+python test/bench_order_read_path.py --rows 10000 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+
+from config.database import db_session  # noqa: E402
+from dao.order_dao import order_dao, ORDER_READ_COLUMNS  # noqa: E402
+from models.db_model.core_order import CoreOrder  # noqa: E402
+
+
+def orm_path(rows: int) -> int:
+    """原ORM读路径"""
+    with db_session() as db:
+        orders = db.execute(
+            select(CoreOrder).where(CoreOrder.is_delete == 0)
+            .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc()).limit(rows)
+        ).scalars().all()
+        return len([order_dao._order_to_dict(order) for order in orders])
+
+
+def projected_path(rows: int) -> int:
+    """列投影读路径"""
+    with db_session() as db:
+        result = db.execute(
+            select(*ORDER_READ_COLUMNS).where(CoreOrder.is_delete == 0)
+            .order_by(CoreOrder.create_time.desc(), CoreOrder.id.desc()).limit(rows)
+        ).all()
+        return len([order_dao._row_to_dict(row) for row in result])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单读路径微基准")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, func in (("ORM路径", orm_path), ("列投影路径", projected_path)):
+        func(args.rows)  # 预热（建立连接、编译语句）
+        costs, count = [], 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = func(args.rows)
+            costs.append(time.perf_counter() - start)
+        median = statistics.median(costs)
+        print(f"{name}: 每次{count}行 耗时中位数={median * 1000:.2f}ms 吞吐={count / median:,.0f} 行/秒")
+
+
+if __name__ == "__main__":
+    main()
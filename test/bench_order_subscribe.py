@@ -0,0 +1,163 @@
+"""
+订单推送压测：单个worker保持大量空闲SSE连接，观察
+1. 建立连接的耗时、服务端内存（指定--server-pid时读取/proc）
+2. 空闲连接存在时普通接口（订单分页查询）的延迟
+3. 一次订单状态变更推送到全部连接的延迟（所有连接以同一普通用户身份订阅，新建一个订单后由管理员取消）
+压测对象为已启动的服务（python main.py，单worker），服务端和压测端都需要调大文件描述符上限（ulimit -n）
+用法：
+python test/bench_order_subscribe.py --username user1 --password 123456 --admin-username admin --admin-password 123456 \
+    --connections 10000 --idle 10 --server-pid 12345
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+from urllib.parse import urlsplit
+
+from bench_utils import BASE_URL, http_request, login, summarize
+
+# 压测订单（由--username创建，推送后被取消）
+BENCH_ORDER = {
+    "sender_name": "压测发件人", "sender_phone": "13800000000", "sender_province": "上海市", "sender_city": "上海市",
+    "sender_district": "浦东新区", "sender_address": "压测路1号",
+    "receiver_name": "压测收件人", "receiver_phone": "13900000000", "receiver_province": "上海市",
+    "receiver_city": "上海市", "receiver_district": "徐汇区", "receiver_address": "压测路2号",
+    "goods_type": "文件", "goods_quantity": 1
+}
+
+
+def server_rss_mb(pid: int | None) -> str:
+    """读取服务进程的常驻内存（Linux）"""
+    if pid is None:
+        return "未知（未指定--server-pid）"
+    with open(f"/proc/{pid}/status", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return f"{int(line.split()[1]) / 1024:.1f}MB"
+    return "未知"
+
+
+class Subscriber:
+    """一个SSE连接（asyncio原始socket，记录收到状态变更事件的时间）"""
+
+    def __init__(self):
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.received_at: float | None = None
+        self.received = asyncio.Event()
+
+    async def connect(self, host: str, port: int, token: str) -> None:
+        """建立连接并读取响应头"""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write((f"GET /api/v1/order/subscribe HTTP/1.1\r\nHost: {host}\r\n"
+                           f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n").encode())
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if b" 200 " not in status_line:
+            raise RuntimeError(f"订阅失败：{status_line.decode(errors='ignore').strip()}")
+        while (await self.reader.readline()) not in (b"\r\n", b""):
+            pass
+
+    async def listen(self) -> None:
+        """读取事件，收到第一个order_status事件时记录时间"""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            if b"event: order_status" in line and self.received_at is None:
+                self.received_at = time.perf_counter()
+                self.received.set()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def open_subscribers(count: int, token: str, concurrency: int) -> list:
+    """并发建立count个连接（限制同时握手的连接数，避免超出服务端listen队列）"""
+    url = urlsplit(BASE_URL)
+    semaphore = asyncio.Semaphore(concurrency)
+    subscribers = [Subscriber() for _ in range(count)]
+
+    async def connect(subscriber):
+        async with semaphore:
+            await subscriber.connect(url.hostname, url.port or 80, token)
+
+    await asyncio.gather(*(connect(subscriber) for subscriber in subscribers))
+    return subscribers
+
+
+async def main_async(args) -> None:
+    token = login(args.username, args.password)
+    admin_token = login(args.admin_username, args.admin_password)
+    code, content, _ = http_request("POST", "/api/v1/order/create", token=token, body=BENCH_ORDER)
+    if code != 200:
+        raise RuntimeError(f"创建压测订单失败（{code}）：{content.decode('utf-8', 'ignore')}")
+    order_id = json.loads(content)["id"]
+
+    print(f"服务端内存（连接前）：{server_rss_mb(args.server_pid)}")
+    start = time.perf_counter()
+    subscribers = await open_subscribers(args.connections, token, args.concurrency)
+    print(f"建立{len(subscribers)}个SSE连接，耗时 {time.perf_counter() - start:.2f}s")
+    listeners = [asyncio.create_task(subscriber.listen()) for subscriber in subscribers]
+    _, content, _ = await asyncio.to_thread(http_request, "GET", "/api/v1/admin/event-hub-stats", admin_token)
+    print(f"事件中心：{content.decode('utf-8', 'ignore')}")
+    print(f"服务端内存（连接后）：{server_rss_mb(args.server_pid)}")
+
+    # 空闲连接存在时的普通接口延迟
+    latencies = []
+    deadline = time.perf_counter() + args.idle
+    while time.perf_counter() < deadline:
+        code, _, elapsed = await asyncio.to_thread(http_request, "GET", "/api/v1/order/query?page=1&page_size=10",
+                                                   token)
+        if code == 200:
+            latencies.append(elapsed)
+    summarize(f"空闲连接{len(subscribers)}个时订单分页查询", latencies)
+
+    # 一次状态变更推送到全部连接
+    start = time.perf_counter()
+    code, content, _ = await asyncio.to_thread(http_request, "PUT", f"/api/v1/order/status/{order_id}",
+                                               admin_token, {"order_status": "cancelled"})
+    if code != 200:
+        raise RuntimeError(f"修改订单状态失败（{code}）：{content.decode('utf-8', 'ignore')}")
+    try:
+        await asyncio.wait_for(asyncio.gather(*(subscriber.received.wait() for subscriber in subscribers)),
+                               timeout=args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    fanout = [subscriber.received_at - start for subscriber in subscribers if subscriber.received_at is not None]
+    print(f"状态变更推送：{len(fanout)}/{len(subscribers)}个连接收到")
+    summarize("推送延迟（从发起修改请求开始）", fanout)
+    _, content, _ = await asyncio.to_thread(http_request, "GET", "/api/v1/admin/event-hub-stats", admin_token)
+    print(f"事件中心：{content.decode('utf-8', 'ignore')}")
+
+    for subscriber in subscribers:
+        subscriber.close()
+    for listener in listeners:
+        listener.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单推送压测")
+    parser.add_argument("--username", required=True, help="普通用户（订阅者）")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--admin-username", required=True, help="管理员（修改订单状态）")
+    parser.add_argument("--admin-password", required=True)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=200, help="同时握手的连接数")
+    parser.add_argument("--idle", type=float, default=10, help="空闲阶段秒数")
+    parser.add_argument("--timeout", type=float, default=30, help="等待推送到达的最长秒数")
+    parser.add_argument("--server-pid", type=int, default=None, help="服务进程PID（读取内存占用）")
+    args = parser.parse_args()
+
+    # 压测端每个连接占用一个文件描述符
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < args.connections + 100 <= hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (args.connections + 100, hard))
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
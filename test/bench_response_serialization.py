@@ -0,0 +1,95 @@
+"""
+基准：response_model校验序列化 vs 快速响应（orjson直接编码）的单请求CPU耗时
+进程内直接调用ASGI应用（不经过网络），对比订单详情（1行）和订单列表（100行）两种响应
+用法：
+python test/bench_response_serialization.py --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+
+from models.schema.order_schema import OrderDetailResponse, OrderListResponse  # noqa: E402
+
+
+def sample_order(i: int) -> dict:
+    """构造与_row_to_dict输出一致的订单字典"""
+    return {
+        "id": i, "order_no": f"{10 ** 16 + i}",
+        "sender_name": "张三", "sender_phone": "13800138000", "sender_address": "上海市上海市浦东新区张江路1号",
+        "receiver_name": "李四", "receiver_phone": "13900139000", "receiver_address": "北京市北京市朝阳区建国路1号",
+        "goods_type": "普通", "goods_quantity": 1,
+        "order_status": "pending", "driver_id": None, "warehouse_id": 1, "create_user_id": 1,
+        "create_time": "2026-01-01 10:00:00", "update_time": "2026-01-01 10:00:00"
+    }
+
+
+DETAIL = sample_order(1)
+LIST = {"total": 1000, "page": 1, "page_size": 100, "data": [sample_order(i) for i in range(100)], "next_cursor": None}
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+@app.get("/validated/detail", response_model=OrderDetailResponse)
+def validated_detail():
+    return DETAIL
+
+
+@app.get("/validated/list", response_model=OrderListResponse)
+def validated_list():
+    return LIST
+
+
+@app.get("/fast/detail", response_model=OrderDetailResponse)
+def fast_detail():
+    return ORJSONResponse(DETAIL)
+
+
+@app.get("/fast/list", response_model=OrderListResponse)
+def fast_list():
+    return ORJSONResponse(LIST)
+
+
+async def call(path: str) -> None:
+    """直接调用ASGI应用"""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+             "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def bench(path: str, requests: int) -> float:
+    """返回单请求平均CPU耗时（微秒）"""
+    for _ in range(50):
+        await call(path)  # 预热
+    start = time.process_time()
+    for _ in range(requests):
+        await call(path)
+    return (time.process_time() - start) / requests * 1e6
+
+
+async def main(requests: int):
+    for kind in ("detail", "list"):
+        validated = await bench(f"/validated/{kind}", requests)
+        fast = await bench(f"/fast/{kind}", requests)
+        print(f"{kind}: response_model={validated:.1f}us 快速响应={fast:.1f}us 节省={(1 - fast / validated) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="响应序列化CPU耗时对比")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,75 @@
+"""
+配送路线排序基准：随机生成200个站点（默认在上海市范围内），对比路线长度和计算耗时（不连接数据库）
+1. 分配顺序（不排序）
+2. 最近邻
+3. 最近邻 + 2-opt（route_service.sequence_stops）
+另外对比距离矩阵实时计算与缓存命中（district_distance_matrix）的耗时
+用法：
+python test/bench_route.py --stops 200 --trials 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.route_service import (  # noqa: E402
+    district_distance_matrix, nearest_neighbor_route, route_length, sequence_stops
+)
+from utils.cache_utils import route_matrix_cache  # noqa: E402
+from utils.region_utils import haversine_matrix  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="配送路线排序基准")
+    parser.add_argument("--stops", type=int, default=200)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--lng", type=float, nargs=2, default=(121.10, 121.80), help="经度范围")
+    parser.add_argument("--lat", type=float, nargs=2, default=(30.90, 31.45), help="纬度范围")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lengths = {"分配顺序": [], "最近邻": [], "最近邻+2-opt": []}
+    costs = {"最近邻": [], "最近邻+2-opt": []}
+    matrix_costs, cached_costs = [], []
+    for trial in range(args.trials):
+        lng = rng.uniform(*args.lng, args.stops)
+        lat = rng.uniform(*args.lat, args.stops)
+        keys = tuple(("上海", f"站点{trial}-{i}") for i in range(args.stops))
+        points = list(zip(lng.tolist(), lat.tolist()))
+
+        start = time.perf_counter()
+        dist = haversine_matrix(lng, lat, lng, lat)
+        matrix_costs.append(time.perf_counter() - start)
+        district_distance_matrix(keys, points)
+        start = time.perf_counter()
+        district_distance_matrix(keys, points)
+        cached_costs.append(time.perf_counter() - start)
+
+        lengths["分配顺序"].append(route_length(dist, np.arange(args.stops)))
+        start_index = int(dist.sum(axis=1).argmax())
+        start = time.perf_counter()
+        route = nearest_neighbor_route(dist, start_index)
+        costs["最近邻"].append(time.perf_counter() - start)
+        lengths["最近邻"].append(route_length(dist, route))
+        start = time.perf_counter()
+        route = sequence_stops(dist)
+        costs["最近邻+2-opt"].append(time.perf_counter() - start)
+        lengths["最近邻+2-opt"].append(route_length(dist, route))
+        assert sorted(route.tolist()) == list(range(args.stops))
+
+    print(f"{args.stops}个站点，{args.trials}次随机实例（中位数）")
+    for name, values in lengths.items():
+        cost = f"，计算 {statistics.median(costs[name]) * 1000:.1f}ms" if name in costs else ""
+        print(f"{name:<12}：路线长度 {statistics.median(values):.1f}km{cost}")
+    print(f"距离矩阵：实时计算 {statistics.median(matrix_costs) * 1000:.2f}ms，"
+          f"缓存命中 {statistics.median(cached_costs) * 1e6:.1f}微秒（{route_matrix_cache.stats()}）")
+
+
+if __name__ == "__main__":
+    main()
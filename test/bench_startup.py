@@ -0,0 +1,71 @@
+"""
+启动耗时基准：在子进程中分别以DB_FAST_START=False（每次create_all逐表检查）和True（只查一行版本）启动，
+统计导入main模块耗时、lifespan启动阶段（init_db + 连接池预热）耗时，以及第一个查询的耗时
+连接.env中的MYSQL_URL，首次运行会先完成一次建表并写入表结构版本
+用法：
+python test/bench_startup.py --repeat 5 --prewarm 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行：导入main -> 执行lifespan启动阶段 -> 执行一次查询，输出各阶段耗时（JSON）
+CHILD_SCRIPT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+import_cost = time.perf_counter() - start
+
+async def run():
+    context = main.lifespan(main.app)
+    start = time.perf_counter()
+    await context.__aenter__()
+    startup_cost = time.perf_counter() - start
+
+    from sqlalchemy import text
+    from config.database import engine
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1")).scalar()
+    first_query_cost = time.perf_counter() - start
+
+    await context.__aexit__(None, None, None)
+    return startup_cost, first_query_cost
+
+startup_cost, first_query_cost = asyncio.run(run())
+sys.stdout.write("@@" + json.dumps({"import": import_cost, "startup": startup_cost,
+                                    "first_query": first_query_cost}) + "\\n")
+"""
+
+
+def run_once(fast_start: bool, prewarm: int) -> dict:
+    """启动一个子进程，返回各阶段耗时（秒）"""
+    env = dict(os.environ, DB_FAST_START=str(fast_start), DB_POOL_PREWARM=str(prewarm))
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith("@@"))
+    return json.loads(line[2:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, default=5, help="快速启动模式下的预热连接数")
+    args = parser.parse_args()
+
+    run_once(False, 0)  # 保证表结构和版本行已存在
+    for name, fast_start, prewarm in (("原启动（create_all，不预热）", False, 0),
+                                      (f"快速启动（版本检查，预热{args.prewarm}个连接）", True, args.prewarm)):
+        results = [run_once(fast_start, prewarm) for _ in range(args.repeat)]
+        print(f"{name}：导入 {statistics.median(r['import'] for r in results) * 1000:.0f}ms，"
+              f"启动阶段 {statistics.median(r['startup'] for r in results) * 1000:.0f}ms，"
+              f"首个查询 {statistics.median(r['first_query'] for r in results) * 1000:.1f}ms（{args.repeat}次中位数）")
+
+
+if __name__ == "__main__":
+    main()
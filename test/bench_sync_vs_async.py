@@ -0,0 +1,49 @@
+"""
+压测：同步接口与异步接口的吞吐/延迟对比
+对同一个接口分别请求同步版（/api/v1/...）和异步版（/api/v1/async/...），并发数相同
+用法：
+python test/bench_sync_vs_async.py --username admin --password 123456 --concurrency 64 --requests 2000
+python test/bench_sync_vs_async.py ... --path "/order/detail/1"
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import http_request, login, summarize
+
+
+def run(path: str, token: str, concurrency: int, total: int) -> None:
+    """并发请求指定接口并打印统计"""
+    latencies, errors = [], 0
+
+    def call(_):
+        return http_request("GET", path, token=token)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for code, _, elapsed in executor.map(call, range(total)):
+            if code == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+    duration = time.perf_counter() - start
+    summarize(f"{path}（并发{concurrency}）", latencies)
+    print(f"  吞吐={total / duration:.1f} req/s 失败={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步/异步接口压测对比")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/order/query?page=1&page_size=10", help="接口路径（不含/api/v1前缀）")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    token = login(args.username, args.password)
+    run(f"/api/v1{args.path}", token, args.concurrency, args.requests)
+    run(f"/api/v1/async{args.path}", token, args.concurrency, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+轨迹写入基准：多线程模拟司机端批量上报（每次请求--batch个轨迹点），对比三种写入方式的吞吐和请求延迟
+1. 逐条INSERT：每个轨迹点一个事务
+2. 每次请求一条多行INSERT（同步写库）
+3. TrackIngestor：追加spool并fsync（组提交）后返回，后台线程批量写库（统计包含最后一次写库的耗时）
+连接.env中的MYSQL_URL，轨迹写入--task-id指定的已有配送任务（基准结束后不清理写入的轨迹）
+用法：
+python test/bench_track_ingest.py --task-id 1 --requests 2000 --batch 20 --threads 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_utils import summarize  # noqa: E402
+from dao.track_dao import track_dao  # noqa: E402
+from service.track_service import TrackIngestor  # noqa: E402
+
+
+def make_batch(task_id: int, size: int, index: int) -> list:
+    """生成一次上报的轨迹点"""
+    now = datetime.now().replace(microsecond=0)
+    return [{"task_id": task_id, "track_node": f"基准轨迹{index}-{i}", "track_time": now,
+             "track_address": "上海市浦东新区", "driver_id": None} for i in range(size)]
+
+
+def run(name: str, handler, task_id: int, requests: int, batch: int, threads: int, finish=None) -> None:
+    """
+    并发执行requests次上报，输出请求延迟和吞吐
+    :param name:
+    :param handler: 处理一次上报的函数
+    :param finish: 全部请求结束后执行的收尾函数（计入总耗时）
+    :return:
+    """
+    def one(index):
+        points = make_batch(task_id, batch, index)
+        start = time.perf_counter()
+        handler(points)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(one, range(requests)))
+    if finish is not None:
+        finish()
+    elapsed = time.perf_counter() - start
+    summarize(name, latencies)
+    print(f"  {requests * batch}个轨迹点，总耗时 {elapsed:.2f}s，吞吐 {requests * batch / elapsed:.0f}点/秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="轨迹写入基准")
+    parser.add_argument("--task-id", type=int, required=True, help="已存在的配送任务ID")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=20, help="每次请求的轨迹点数")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--single-requests", type=int, default=200, help="逐条INSERT的请求数（较慢，单独指定）")
+    parser.add_argument("--no-fsync", action="store_true", help="TrackIngestor不fsync（只写入操作系统缓存）")
+    args = parser.parse_args()
+
+    def insert_each(points):
+        for point in points:
+            track_dao.batch_create_tracks([point])
+
+    run("逐条INSERT", insert_each, args.task_id, args.single_requests, args.batch, args.threads)
+    run("每次请求一条多行INSERT", track_dao.batch_create_tracks, args.task_id, args.requests, args.batch, args.threads)
+
+    with tempfile.TemporaryDirectory(prefix="wuliu_track_spool_") as spool_dir:
+        ingestor = TrackIngestor(spool_root=spool_dir, batch_size=2000, flush_interval=1.0,
+                                 max_buffer=10 ** 7, latest_max_size=100000, fsync=not args.no_fsync)
+        ingestor.start()
+        run(f"TrackIngestor（spool{'' if args.no_fsync else ' + fsync组提交'}）", ingestor.append,
+            args.task_id, args.requests, args.batch, args.threads, finish=ingestor.stop)
+        stats = ingestor.stats()
+        print(f"  fsync {stats['fsyncs']}次（{args.requests}次请求），批量写库 {stats['flushes']}次，"
+              f"写入 {stats['written']}条")
+
+
+if __name__ == "__main__":
+    main()
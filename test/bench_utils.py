@@ -0,0 +1,68 @@
+"""
+压测脚本公共工具：HTTP请求、登录取令牌、延迟统计
+压测对象为已启动的服务（python main.py），地址通过环境变量BENCH_BASE_URL指定
+"""
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://127.0.0.1:8000")
+
+
+def http_request(method: str, path: str, token: str | None = None, body=None,
+                 timeout: float = 30) -> tuple[int, bytes, float]:
+    """
+    发送HTTP请求
+    :param method:
+    :param path:
+    :param token: JWT令牌（为空则不带Authorization头）
+    :param body: 请求体（自动序列化为JSON）
+    :param timeout:
+    :return: (状态码, 响应体, 耗时秒)
+    """
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(BASE_URL + path, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            content = resp.read()
+            code = resp.status
+    except urllib.error.HTTPError as e:
+        content = e.read()
+        code = e.code
+    return code, content, time.perf_counter() - start
+
+
+def login(username: str, password: str) -> str:
+    """登录并返回令牌"""
+    code, content, _ = http_request("POST", "/api/v1/user/login", body={"username": username, "password": password})
+    if code != 200:
+        raise RuntimeError(f"登录失败（{code}）：{content.decode('utf-8', 'ignore')}")
+    return json.loads(content)["access_token"]
+
+
+def percentile(values: list, p: float) -> float:
+    """计算百分位数（p取0~100）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name: str, latencies: list) -> None:
+    """打印延迟统计（毫秒）"""
+    if not latencies:
+        print(f"{name}: 无数据")
+        return
+    print(f"{name}: 次数={len(latencies)} "
+          f"平均={sum(latencies) / len(latencies) * 1000:.2f}ms "
+          f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.2f}ms "
+          f"最大={max(latencies) * 1000:.2f}ms")
@@ -0,0 +1,74 @@
+"""
+N+1检测演示：在SQLite内存库上模拟"先查订单列表，再循环逐个查询配送任务"的N+1写法
+1. 普通模式：超过阈值时记录WARNING日志
+2. 严格模式（track_sql(strict=True)）：超过阈值时抛出NPlusOneError
+3. 改为一次IN查询后不再告警
+用法：
+python test/demo_n_plus_one.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, create_engine, text  # noqa: E402
+
+from utils.sql_tracker import sql_tracker, track_sql, NPlusOneError  # noqa: E402
+
+ORDER_COUNT = 20
+
+
+def prepare_engine():
+    """建表并插入订单/配送任务"""
+    engine = create_engine("sqlite://")
+    sql_tracker.instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE core_order (id INTEGER PRIMARY KEY, order_no VARCHAR(32))"))
+        conn.execute(text("CREATE TABLE core_delivery_task (id INTEGER PRIMARY KEY, order_id INTEGER)"))
+        for order_id in range(1, ORDER_COUNT + 1):
+            conn.execute(text("INSERT INTO core_order (id, order_no) VALUES (:id, :no)"),
+                         {"id": order_id, "no": f"NO{order_id}"})
+            conn.execute(text("INSERT INTO core_delivery_task (order_id) VALUES (:order_id)"), {"order_id": order_id})
+    return engine
+
+
+def load_tasks_one_by_one(engine) -> int:
+    """N+1写法：每个订单单独查询一次配送任务"""
+    with engine.connect() as conn:
+        order_ids = conn.execute(text("SELECT id FROM core_order")).scalars().all()
+        return sum(len(conn.execute(text("SELECT id FROM core_delivery_task WHERE order_id = :order_id"),
+                                    {"order_id": order_id}).all())
+                   for order_id in order_ids)
+
+
+def load_tasks_in_batch(engine) -> int:
+    """改进写法：一次IN查询取回全部配送任务"""
+    statement = text("SELECT id FROM core_delivery_task WHERE order_id IN :order_ids") \
+        .bindparams(bindparam("order_ids", expanding=True))
+    with engine.connect() as conn:
+        order_ids = conn.execute(text("SELECT id FROM core_order")).scalars().all()
+        return len(conn.execute(statement, {"order_ids": order_ids}).all())
+
+
+def main():
+    engine = prepare_engine()
+
+    with track_sql(strict=False, threshold=5) as scope:
+        load_tasks_one_by_one(engine)
+    print(f"1. 普通模式：执行{scope.statement_count}条SQL，告警语句：{list(scope.repeated.values())}次")
+
+    try:
+        with track_sql(strict=True, threshold=5):
+            load_tasks_one_by_one(engine)
+    except NPlusOneError as e:
+        print(f"2. 严格模式：抛出NPlusOneError：{e}")
+
+    with track_sql(strict=True, threshold=5) as scope:
+        load_tasks_in_batch(engine)
+    print(f"3. 批量查询：执行{scope.statement_count}条SQL，无告警")
+
+    print(f"统计：{sql_tracker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+读写分离路由演示：用两个本地SQLite文件分别充当主库和从库，打印每次查询的路由结果
+主库和从库中同一个用户的real_name不同（"主库"/"从库"），通过查询结果即可看出命中了哪个库
+用法：
+python test/demo_replica_routing.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+# 必须在导入项目模块之前设置数据源（settings在导入时读取环境变量）
+_tmp_dir = tempfile.mkdtemp(prefix="wuliu_replica_demo_")
+os.environ["MYSQL_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'primary.db')}"
+os.environ["MYSQL_REPLICA_URLS"] = f"sqlite:///{os.path.join(_tmp_dir, 'replica.db')}"
+os.environ["READ_YOUR_WRITES_SECONDS"] = "1"
+os.environ["DEBUG"] = "False"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from config.database import engine, import_models, replica_engines, routing_stats, _recent_writers  # noqa: E402
+from dao.user_dao import user_dao  # noqa: E402
+from utils.request_context import RequestContext, set_request_context, reset_request_context  # noqa: E402
+
+
+def prepare_database(target_engine, real_name: str) -> None:
+    """建表并插入同一个用户（real_name区分主从库）"""
+    with target_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE core_user (id INTEGER PRIMARY KEY, username VARCHAR(50), password VARCHAR(100), "
+            "role VARCHAR(20), phone VARCHAR(20), real_name VARCHAR(50), create_time DATETIME, "
+            "update_time DATETIME, is_delete INTEGER DEFAULT 0)"
+        ))
+        conn.execute(text(
+            "INSERT INTO core_user (id, username, password, role, real_name, is_delete) "
+            "VALUES (1, 'demo', 'x', 'customer', :real_name, 0)"
+        ), {"real_name": real_name})
+
+
+def read_as(user_id: int | None, label: str, last_write: float | None = None) -> None:
+    """以指定用户身份（可携带客户端的最近写入时间）读取用户1，打印命中的库"""
+    context = RequestContext(user_id=user_id)
+    context.last_write = last_write
+    token = set_request_context(context)
+    try:
+        user = user_dao.get_user_by_id(1)
+    finally:
+        reset_request_context(token)
+    print(f"{label:<36} -> real_name={user['real_name']}")
+
+
+def main():
+    import_models()
+    prepare_database(engine, "主库")
+    prepare_database(replica_engines[0], "从库")
+
+    read_as(None, "1. 未登录请求读取")
+    read_as(1, "2. 用户1读取（未写入过）")
+
+    context = RequestContext(user_id=1)
+    token = set_request_context(context)
+    try:
+        user_dao.update_user_info(1, {"real_name": "主库（已修改）"})
+    finally:
+        reset_request_context(token)
+    print(f"3. 用户1修改了real_name（写主库，响应下发最近写入时间{context.last_write:.3f}）")
+
+    read_as(1, "4. 用户1立即读取（读己之写窗口内）")
+    read_as(2, "5. 用户2读取（未写入过）")
+    # 模拟请求落到另一个worker进程：进程内的最近写入用户为空，只能依靠客户端携带的最近写入时间
+    _recent_writers.clear()
+    read_as(1, "6. 其他进程：用户1未携带写入时间读取")
+    read_as(1, "7. 其他进程：用户1携带写入时间读取", context.last_write)
+    time.sleep(1.2)
+    read_as(1, "8. 用户1在窗口过后携带写入时间读取", context.last_write)
+
+    print(f"路由统计：{routing_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+索引校验工具：对OrderDAO发出的每一种查询形态执行EXPLAIN，出现core_order全表扫描（type=ALL）时返回非0退出码
+原理：监听引擎的before_cursor_execute事件，按角色 × 筛选条件 × 分页方式调用OrderDAO，收集实际执行的SQL
+注意：数据量很小时MySQL优化器可能主动选择全表扫描，请在有代表性数据量的库上执行
+用法：
+python test/explain_order_queries.py                   # 校验
+python test/explain_order_queries.py --create-missing  # 先创建模型中声明但库中缺失的索引
+"""
+import argparse
+import itertools
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, inspect  # noqa: E402
+
+from config.database import engine  # noqa: E402
+from dao.order_dao import order_dao  # noqa: E402
+from models.db_model.core_order import CoreOrder  # noqa: E402
+from service.order_service import order_service  # noqa: E402
+from utils.order_utils import encode_order_cursor  # noqa: E402
+
+# 参与校验的用户角色
+ROLES = [
+    {"id": 1, "role": "admin", "username": "explain"},
+    {"id": 1, "role": "driver", "username": "explain"},
+    {"id": 1, "role": "customer", "username": "explain"},
+]
+# 可选筛选条件
+FILTERS = {"order_status": "pending", "warehouse_id": 1, "driver_id": 1, "order_no": "0"}
+
+
+def create_missing_indexes() -> None:
+    """创建模型中声明、但数据库中不存在的索引（create_all不会给已存在的表补索引）"""
+    existing = {index["name"] for index in inspect(engine).get_indexes(CoreOrder.__tablename__)}
+    for index in CoreOrder.__table__.indexes:
+        if index.name not in existing:
+            index.create(bind=engine)
+            print(f"已创建索引：{index.name}")
+
+
+def collect_statements() -> dict:
+    """调用OrderDAO的各种查询形态，收集实际执行的SELECT语句"""
+    statements = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and CoreOrder.__tablename__ in statement:
+            statements.setdefault(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        cursor = encode_order_cursor(datetime.now(), 2 ** 62)
+        order_dao.get_order_by_id(1)
+        for user in ROLES:
+            for size in range(len(FILTERS) + 1):
+                for keys in itertools.combinations(FILTERS, size):
+                    base = {key: FILTERS[key] for key in keys}
+                    for pagination in ({"page": 2}, {"pagination_mode": "cursor", "cursor": cursor}):
+                        params = order_service._apply_permission_filter(
+                            {**base, **pagination, "page_size": 10, "total_mode": "exact"}, user)
+                        order_dao.query_orders(params)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def explain(statements: dict) -> int:
+    """逐条执行EXPLAIN，返回全表扫描的语句数"""
+    failures = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements.items():
+            rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+            full_scans = [row for row in rows if row["table"] == CoreOrder.__tablename__ and row["type"] == "ALL"]
+            keys = ", ".join(str(row["key"]) for row in rows)
+            flag = "全表扫描" if full_scans else "OK"
+            print(f"[{flag}] key={keys}\n    {' '.join(statement.split())}")
+            failures += bool(full_scans)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OrderDAO查询索引校验")
+    parser.add_argument("--create-missing", action="store_true", help="先创建缺失的索引")
+    args = parser.parse_args()
+
+    if args.create_missing:
+        create_missing_indexes()
+
+    statements = collect_statements()
+    failures = explain(statements)
+    print(f"共{len(statements)}种查询形态，全表扫描{failures}种")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
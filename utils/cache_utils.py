@@ -0,0 +1,115 @@
+"""缓存工具类：进程内有界TTL缓存（LRU淘汰 + 过期时间 + 命中统计）"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from config.settings import settings
+
+# 缓存未命中的哨兵对象（区分"缓存了None"和"没有缓存"）
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    线程安全的有界TTL缓存：
+    1. 超过max_size时按LRU淘汰最久未访问的条目
+    2. 每个条目可单独指定过期时间（不超过默认ttl）
+    3. 记录命中/未命中/淘汰次数，便于观察缓存效果
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (过期时间戳, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存（过期条目视为未命中并删除）
+        :param key:
+        :param default:
+        :return:
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expire_at, value = item
+            if expire_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        写入缓存
+        :param key:
+        :param value:
+        :param ttl: 本条目的过期秒数（为空或超过默认值时使用默认ttl）
+        :return:
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        expire_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expire_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """删除单个条目（数据变更时主动失效）"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """命中统计（供管理接口查看）"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# ===================== 认证相关缓存实例 =====================
+# 已验证的JWT载荷缓存：token -> payload
+token_cache = TTLCache("auth_token", settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+# 用户状态缓存：user_id -> 是否有效（存在且未删除）
+user_status_cache = TTLCache("auth_user_status", settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+# ===================== 订单相关缓存实例 =====================
+# 订单查询总条数缓存：筛选条件 -> total（total_mode=cached时使用）
+order_count_cache = TTLCache("order_count", settings.ORDER_COUNT_CACHE_MAX_SIZE, settings.ORDER_COUNT_CACHE_TTL_SECONDS)
+
+# ===================== 配送相关缓存实例 =====================
+# 配送路线站点距离矩阵缓存：区县集合 -> 距离矩阵（区县坐标为静态数据，只受容量淘汰）
+route_matrix_cache = TTLCache("route_matrix", settings.ROUTE_MATRIX_CACHE_MAX_SIZE,
+                              settings.ROUTE_MATRIX_CACHE_TTL_SECONDS)
+# 轨迹上报的任务归属缓存：任务ID -> (司机ID, 任务状态, 订单ID, 订单创建人ID)
+track_task_cache = TTLCache("track_task", settings.TRACK_TASK_CACHE_MAX_SIZE, settings.TRACK_TASK_CACHE_TTL_SECONDS)
+# 订单最新节点查询：订单ID -> 订单状态和配送任务列表（订单状态修改/派单时主动失效）
+order_task_cache = TTLCache("order_task", settings.ORDER_TASK_CACHE_MAX_SIZE, settings.ORDER_TASK_CACHE_TTL_SECONDS)
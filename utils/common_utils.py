@@ -1,20 +1,206 @@
 """通用工具类：日志、时间、数据校验等"""
+import atexit
+import copy
 import logging
 import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
 from config.settings import settings
+from utils.request_context import get_request_context
+
+# 控制台日志格式（文件日志为JSON行，见JsonFormatter）
+TEXT_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON行日志格式：每条日志一行JSON（time/level/logger/message/route/user_id/exception）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route is not None:
+            entry["route"] = route
+            entry["user_id"] = getattr(record, "user_id", None)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class RequestLogFilter(logging.Filter):
+    """
+    请求日志过滤器（在调用日志的线程中执行，可以读取当前请求上下文）：
+    1. 为日志附加当前请求的route/user_id
+    2. 按路由采样INFO及以下级别的日志（WARNING及以上全部保留），降低高频接口的日志量
+    """
+
+    def __init__(self, sampling_rules: dict[str, float]):
+        super().__init__()
+        # 路径前缀 -> 保留比例，前缀长的优先匹配
+        self.sampling_rules = sorted(sampling_rules.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = get_request_context()
+        if context is None:
+            return True
+        record.route = context.route
+        record.user_id = context.user_id
+        if record.levelno >= logging.WARNING or not self.sampling_rules or not context.route:
+            return True
+        path = context.route.split(" ", 1)[-1]
+        for prefix, rate in self.sampling_rules:
+            if path.startswith(prefix):
+                return random.random() < rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    队列日志处理器：调用线程只负责拼接消息并入队，磁盘/控制台写入由后台QueueListener线程完成
+    与标准QueueHandler的区别：
+    1. 入队前不按默认格式格式化整条日志，只渲染消息和异常堆栈，保留原始字段供JSON格式使用
+    2. 队列有界（LOG_QUEUE_MAX_SIZE），写入跟不上时丢弃WARNING以下的新日志并计数，不阻塞调用线程、不无限占用内存；
+       WARNING及以上不丢弃：最多等待LOG_QUEUE_BLOCK_SECONDS秒，仍然入队失败时在调用线程直接写stderr
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0  # 队列满被丢弃的日志条数
+        self.spilled = 0  # 队列满直接写stderr的日志条数（WARNING及以上）
+        self._stats_lock = threading.Lock()
+        self._spill_formatter = logging.Formatter(TEXT_LOG_FORMAT)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno < logging.WARNING:
+                self.queue.put_nowait(record)
+            else:
+                self.queue.put(record, timeout=settings.LOG_QUEUE_BLOCK_SECONDS)
+            return
+        except queue.Full:
+            pass
+        if record.levelno < logging.WARNING:
+            with self._stats_lock:
+                self.dropped += 1
+            return
+        with self._stats_lock:
+            self.spilled += 1
+        try:
+            sys.stderr.write(self._spill_formatter.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # 异常对象不跨线程传递（可能引用请求中的大对象），先渲染为文本
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class DrainingQueueListener(QueueListener):
+    """后台日志写入线程：停止标记阻塞入队（有界队列已满时等待写入线程腾出空间，不丢失停止标记）"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def parse_sampling_rules(rules: str) -> dict[str, float]:
+    """
+    解析日志采样规则
+    :param rules: 形如"/api/v1/order/query=0.1,/api/v1/order/detail=0.2"
+    :return: 路径前缀 -> 保留比例
+    """
+    result = {}
+    for rule in rules.split(","):
+        if "=" not in rule:
+            continue
+        prefix, rate = rule.split("=", 1)
+        result[prefix.strip()] = min(max(float(rate), 0.0), 1.0)
+    return result
+
+
+def setup_logging() -> tuple[DrainingQueueListener, NonBlockingQueueHandler]:
+    """
+    配置日志：根日志器只挂一个队列处理器，后台线程写入
+    1. 文件日志：JSON行格式，按大小轮转（LOG_MAX_BYTES/LOG_BACKUP_COUNT）
+    2. 控制台日志：文本格式
+    :return: (后台写入线程, 队列处理器)（项目关闭时调用stop_logging刷新剩余日志）
+    """
+    # 创建日志目录
+    os.makedirs(os.path.dirname(settings.LOG_FILE_PATH) or ".", exist_ok=True)
+
+    file_handler = RotatingFileHandler(settings.LOG_FILE_PATH, maxBytes=settings.LOG_MAX_BYTES,
+                                       backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestLogFilter(parse_sampling_rules(settings.LOG_SAMPLING_RULES)))
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, settings.LOG_LEVEL))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    listener = DrainingQueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    return listener, queue_handler
+
+
+_log_listener, _queue_handler = setup_logging()
+
+
+def stop_logging() -> None:
+    """
+    停止后台日志线程（写完队列中剩余的日志，项目关闭时调用；可重复调用）
+    之后的日志不再入队：根日志器改为直接挂文件/控制台处理器，在调用线程中同步写入
+    """
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    for handler in _log_listener.handlers:
+        root.addHandler(handler)
+    _log_listener = None
+    if _queue_handler.dropped:
+        logger.warning("日志队列已满，共丢弃%s条日志", _queue_handler.dropped)
+
+
+def logging_stats() -> dict:
+    """日志队列统计（供管理接口查看）"""
+    return {
+        "queue_size": _queue_handler.queue.qsize(),
+        "queue_max_size": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+        "spilled": _queue_handler.spilled,
+        "running": _log_listener is not None
+    }
 
-# 创建日志目录
-os.makedirs(os.path.dirname(settings.LOG_FILE_PATH), exist_ok=True)
 
-# 配置日志
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(settings.LOG_FILE_PATH, encoding="utf-8"),  # 文件日志
-        logging.StreamHandler()  # 控制台日志
-    ]
-)
+# 进程退出时兜底刷新（脚本场景不经过lifespan）
+atexit.register(stop_logging)
 
 # 创建日志实例
-logger = logging.getLogger("智慧物流管理系统")
\ No newline at end of file
+logger = logging.getLogger("智慧物流管理系统")
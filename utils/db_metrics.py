@@ -0,0 +1,165 @@
+"""
+数据库指标采集：基于SQLAlchemy连接池事件和游标事件（游标事件与sql_tracker共用，见utils.sql_events），统计
+1. 连接池：获取连接耗时（含排队等待）、当前借出连接数、溢出连接数、获取超时次数
+2. SQL：按语句类型（SELECT/INSERT/UPDATE/DELETE）的执行耗时分布
+3. 请求：每个请求执行的SQL条数、SQL总耗时（通过请求上下文累计）
+每条SQL只增加两次perf_counter + 一次直方图计数，可在生产环境常开
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from utils.metrics_utils import Histogram, LATENCY_BUCKETS, COUNT_BUCKETS
+from utils.request_context import RequestContext
+from utils.sql_events import add_statement_observer
+
+# 统计的SQL语句类型（其余归为OTHER）
+STATEMENT_KINDS = ("SELECT", "INSERT", "UPDATE", "DELETE", "OTHER")
+
+
+class PoolMetrics:
+    """单个连接池的指标"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = Histogram(LATENCY_BUCKETS)  # 获取连接耗时（秒）
+        self.checkout_timeouts = 0  # 等待超过pool_timeout的次数
+        self.max_checked_out = 0  # 借出连接数峰值
+        self.pool = None  # 当前连接池（dispose后会重建）
+
+    def stats(self) -> dict:
+        """连接池统计（实时状态 + 累计指标）"""
+        pool = self.pool
+        result = {
+            "name": self.name,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "checkout_timeouts": self.checkout_timeouts,
+            "max_checked_out": self.max_checked_out
+        }
+        if isinstance(pool, QueuePool):
+            result.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),  # 未用满pool_size时overflow为负数
+                "max_overflow": pool._max_overflow
+            })
+        return result
+
+
+class _CheckoutTimingMixin:
+    """记录获取连接耗时的连接池（_do_get包含排队等待和新建连接的时间）"""
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.checkout_wait.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # dispose时连接池会重建，指标对象随之迁移
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """带耗时统计的同步连接池"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """带耗时统计的异步连接池"""
+
+
+class DBMetrics:
+    """数据库指标汇总（全局单例db_metrics）"""
+
+    def __init__(self):
+        self.pools: dict[str, PoolMetrics] = {}
+        self.statement_latency = {kind: Histogram(LATENCY_BUCKETS) for kind in STATEMENT_KINDS}
+        self.statements_per_request = Histogram(COUNT_BUCKETS)
+        self.db_time_per_request = Histogram(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def instrument_engine(self, engine: Engine, name: str) -> None:
+        """
+        为引擎注册连接池事件和游标事件
+        :param engine: 同步引擎（异步引擎传入async_engine.sync_engine）
+        :param name: 连接池名称（primary/replica_0/async_primary等）
+        :return:
+        """
+        metrics = PoolMetrics(name)
+        metrics.pool = engine.pool
+        if isinstance(engine.pool, _CheckoutTimingMixin):
+            engine.pool.metrics = metrics
+        with self._lock:
+            self.pools[name] = metrics
+
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            pool = metrics.pool
+            if isinstance(pool, QueuePool):
+                checked_out = pool.checkedout()
+                if checked_out > metrics.max_checked_out:
+                    metrics.max_checked_out = checked_out
+
+        add_statement_observer(engine, self._observe_statement)
+
+    def _observe_statement(self, statement, parameters, elapsed: float, request_context: RequestContext | None):
+        """SQL执行完成：记录耗时，并累计到当前请求"""
+        kind = statement.lstrip()[:6].upper()
+        self.statement_latency.get(kind, self.statement_latency["OTHER"]).observe(elapsed)
+        if request_context is not None:
+            request_context.statement_count += 1
+            request_context.db_time += elapsed
+
+    def record_request(self, context: RequestContext) -> None:
+        """
+        请求结束时记录本次请求的SQL条数和SQL总耗时
+        :param context:
+        :return:
+        """
+        self.statements_per_request.observe(context.statement_count)
+        self.db_time_per_request.observe(context.db_time)
+
+    def stats(self) -> dict:
+        """全部数据库指标（供管理接口查看）"""
+        with self._lock:
+            pools = list(self.pools.values())
+        return {
+            "pools": [pool.stats() for pool in pools],
+            "statement_latency_seconds": {kind: histogram.snapshot()
+                                          for kind, histogram in self.statement_latency.items()},
+            "statements_per_request": self.statements_per_request.snapshot(),
+            "db_time_per_request_seconds": self.db_time_per_request.snapshot()
+        }
+
+    def reset(self) -> None:
+        """清空累计指标（连接池实时状态不受影响）"""
+        with self._lock:
+            pools = list(self.pools.values())
+        for pool in pools:
+            pool.checkout_wait.reset()
+            pool.checkout_timeouts = 0
+            pool.max_checked_out = 0
+        for histogram in self.statement_latency.values():
+            histogram.reset()
+        self.statements_per_request.reset()
+        self.db_time_per_request.reset()
+
+
+# 全局数据库指标
+db_metrics = DBMetrics()
@@ -0,0 +1,255 @@
+"""
+进程内事件中心（订单状态/配送轨迹推送）：
+1. 订阅者按主题订阅（order:{订单ID} / user:{用户ID}），每个订阅者一个有界队列，队列满时丢弃最旧的事件：
+   慢订阅者只会丢失自己的旧事件，不会阻塞发布方，也不会无限占用内存
+2. 发布方可以在任意线程调用publish_many：事件在发布线程编码一次（所有订阅者共享同一份字节），
+   一批事件通过一次loop.call_soon_threadsafe交给事件循环投递；没有订阅者的主题在发布线程直接跳过
+3. 数据库写操作通过publish_on_commit登记事件，会话提交后才发布，回滚则丢弃
+只在当前worker进程内投递：多worker部署时订阅者只能收到连接所在进程内发生的变更
+"""
+import asyncio
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from utils.common_utils import logger
+
+# 会话info中登记待发布事件的键
+PENDING_EVENTS_KEY = "pending_events"
+# SSE心跳（注释行，客户端忽略；用于保持代理连接并尽早发现断开的连接）
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+class EventHubFullError(Exception):
+    """当前进程的订阅者数量已达上限"""
+
+
+class EventHubClosedError(Exception):
+    """事件中心未启动或服务正在关闭"""
+
+
+def order_topic(order_id: int) -> str:
+    """订单主题"""
+    return f"order:{order_id}"
+
+
+def user_topic(user_id: int) -> str:
+    """用户主题（用户创建的订单 / 司机被分配的订单）"""
+    return f"user:{user_id}"
+
+
+def encode_event(event_type: str, data: dict) -> bytes:
+    """
+    编码为SSE事件帧
+    :param event_type: 事件类型（如order_status、track）
+    :param data:
+    :return: b"event: ...\\ndata: {...}\\n\\n"
+    """
+    return b"event: " + event_type.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """单个订阅者（只在事件循环线程中访问）"""
+    __slots__ = ("topics", "closed", "dropped", "_events", "_ready")
+
+    def __init__(self, topics: Tuple[str, ...], queue_size: int):
+        self.topics = topics
+        self.closed = False
+        self.dropped = 0  # 队列满时被丢弃的事件数
+        self._events: deque = deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+
+    def put(self, frame: bytes) -> bool:
+        """
+        放入事件（队列满时deque自动丢弃最旧的事件）
+        :param frame:
+        :return: 是否丢弃了旧事件
+        """
+        dropped = len(self._events) == self._events.maxlen
+        if dropped:
+            self.dropped += 1
+        self._events.append(frame)
+        self._ready.set()
+        return dropped
+
+    async def get(self, timeout: float) -> bytes | None:
+        """
+        取下一个事件
+        :param timeout: 最长等待秒数
+        :return: 事件帧，超时或已关闭时返回None
+        """
+        if not self._events and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._events.popleft() if self._events else None
+
+    def close(self) -> None:
+        """关闭订阅（唤醒等待中的get）"""
+        self.closed = True
+        self._ready.set()
+
+
+class EventHub:
+    """
+    事件中心：
+    1. subscribe/unsubscribe/stop只能在事件循环线程中调用（SSE接口为async def）
+    2. publish_many可以在任意线程调用
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._topics: Dict[str, set] = {}  # 主题 -> 订阅者集合
+        self._subscriptions: set = set()
+        self.published = 0  # 有订阅者的事件数
+        self.delivered = 0  # 投递次数（一个事件投递给n个订阅者计n次）
+        self.dropped = 0  # 因订阅者队列满被丢弃的事件数
+        self.rejected = 0  # 超过订阅者上限被拒绝的订阅数
+
+    # ===================== 启动/停止 =====================
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """绑定事件循环（项目启动时在lifespan中调用）"""
+        self._loop = loop
+
+    def stop(self) -> None:
+        """
+        关闭所有订阅（推送连接随之结束），之后的事件不再投递、不再接受新订阅
+        需在服务器等待进行中的连接结束之前调用（收到退出信号时），否则推送连接会拖住关闭直到超时
+        """
+        self._loop = None
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        self._subscriptions.clear()
+        self._topics.clear()
+
+    # ===================== 订阅 =====================
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """
+        订阅主题
+        :param topics:
+        :return:
+        """
+        if self._loop is None:
+            raise EventHubClosedError("推送服务未启动或正在关闭，请稍后重连")
+        if len(self._subscriptions) >= self.max_subscribers:
+            self.rejected += 1
+            raise EventHubFullError("推送连接数已达上限，请稍后重试")
+        subscription = Subscription(tuple(dict.fromkeys(topics)), self.queue_size)
+        self._subscriptions.add(subscription)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        取消订阅（连接断开时调用，可重复调用）
+        :param subscription:
+        :return:
+        """
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def has_subscribers(self) -> bool:
+        """当前进程是否有订阅者（没有时发布方可以跳过组装事件的查询）"""
+        return bool(self._topics)
+
+    # ===================== 发布 =====================
+    def publish_many(self, events: List[tuple]) -> None:
+        """
+        发布一批事件（任意线程，不等待投递）
+        :param events: [(主题列表, 事件类型, 数据), ...]
+        :return:
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        batch = []
+        for topics, event_type, data in events:
+            # 只读查询字典（不加锁）：与订阅同时发生的事件可能投递也可能不投递
+            topics = [topic for topic in topics if topic in self._topics]
+            if topics:
+                batch.append((topics, encode_event(event_type, data)))
+        if not batch:
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, batch)
+        except RuntimeError:
+            # 事件循环已关闭（服务关闭过程中）
+            pass
+
+    def _deliver(self, batch: List[tuple]) -> None:
+        """在事件循环线程中投递（同一事件对同一订阅者只投递一次）"""
+        for topics, frame in batch:
+            if len(topics) == 1:
+                subscribers = self._topics.get(topics[0], ())
+            else:
+                subscribers = set().union(*(self._topics.get(topic, ()) for topic in topics))
+            if not subscribers:
+                continue
+            self.published += 1
+            for subscription in subscribers:
+                if subscription.put(frame):
+                    self.dropped += 1
+            self.delivered += len(subscribers)
+
+    def stats(self) -> dict:
+        """事件中心统计（供管理接口查看）"""
+        return {
+            "subscribers": len(self._subscriptions),
+            "topics": len(self._topics),
+            "max_subscribers": self.max_subscribers,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "rejected": self.rejected
+        }
+
+
+def publish_on_commit(session, topics: List[str], event_type: str, data: dict) -> None:
+    """
+    登记事件，会话提交后发布（回滚则丢弃）
+    :param session: 同步会话或异步会话
+    :param topics:
+    :param event_type:
+    :param data:
+    :return:
+    """
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault(PENDING_EVENTS_KEY, []).append((topics, event_type, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    """会话提交后发布登记的事件"""
+    events = session.info.pop(PENDING_EVENTS_KEY, None)
+    if events:
+        try:
+            event_hub.publish_many(events)
+        except Exception as e:
+            logger.error("发布事件失败：%s", e)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    """会话回滚后丢弃登记的事件"""
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+# 全局事件中心
+event_hub = EventHub(settings.EVENT_HUB_QUEUE_SIZE, settings.EVENT_HUB_MAX_SUBSCRIBERS)
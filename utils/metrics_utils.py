@@ -0,0 +1,125 @@
+"""指标工具类：固定分桶直方图（记录耗时/数量分布，计算平均值与近似分位数）"""
+import threading
+from bisect import bisect_left
+from typing import Sequence
+
+# 耗时分桶（秒）：0.5ms ~ 10s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 数量分桶（如每个请求执行的SQL条数）
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    线程安全的固定分桶直方图：
+    1. observe只做一次二分查找 + 加锁计数，开销为微秒级，可在生产环境常开
+    2. 分位数按桶上界估算（精度取决于分桶粒度）
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # 最后一个桶为+Inf
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        记录一个观测值
+        :param value:
+        :return:
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """
+        估算分位数（返回所在桶的上界，不超过最大观测值）
+        :param q: 0~1之间，如0.99
+        :return:
+        """
+        with self._lock:
+            counts, total, max_value = list(self._counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self.buckets[index], max_value) if index < len(self.buckets) else max_value
+        return max_value
+
+    def cumulative_buckets(self) -> list[tuple[float, int]]:
+        """
+        累计分桶计数（Prometheus格式：每个桶包含小于等于上界的全部观测值，最后一个为+Inf）
+        :return: [(上界, 累计数), ...]
+        """
+        with self._lock:
+            counts = list(self._counts)
+        result, cumulative = [], 0
+        for upper, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            result.append((upper, cumulative))
+        return result
+
+    def snapshot(self) -> dict:
+        """统计快照（供管理接口查看）"""
+        with self._lock:
+            total, value_sum, max_value = self.count, self.sum, self.max
+        return {
+            "count": total,
+            "avg": round(value_sum / total, 6) if total else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(max_value, 6)
+        }
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+
+def format_labels(labels: dict) -> str:
+    """
+    生成Prometheus标签字符串（值中的反斜杠/双引号/换行需转义）
+    :param labels:
+    :return: 形如{method="GET",route="/api/v1/order/query"}
+    """
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_histogram(name: str, labels: dict, histogram: Histogram) -> list[str]:
+    """
+    将直方图渲染为Prometheus文本格式的样本行（_bucket/_sum/_count）
+    :param name: 指标名
+    :param labels: 标签
+    :param histogram:
+    :return:
+    """
+    lines = []
+    buckets = histogram.cumulative_buckets()
+    for upper, cumulative in buckets:
+        le = "+Inf" if upper == float("inf") else repr(float(upper))
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+    # _count取+Inf桶的累计数，保证与分桶一致（读取期间可能有新的观测值）
+    lines.append(f"{name}_count{format_labels(labels)} {buckets[-1][1]}")
+    return lines
@@ -1,17 +1,190 @@
+import base64
+import os
+import tempfile
+import threading
 import time
-import random
+from datetime import datetime
+
+from config.settings import settings
+
+# ===================== 订单号生成（Snowflake风格） =====================
+# 位分配：41位毫秒时间戳（自定义纪元起，约69年） + 5位worker_id（32个进程） + 10位序列号（每毫秒1024个）
+# 共56位，加上ORDER_NO_BASE后固定为17位纯数字，与原"13位时间戳+4位随机数"格式长度一致
+ORDER_NO_EPOCH_MS = 1704067200000  # 2024-01-01 00:00:00 UTC
+ORDER_NO_BASE = 10 ** 16
+WORKER_ID_BITS = 5
+SEQUENCE_BITS = 10
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def try_lock_file(path: str):
+    """
+    非阻塞地对文件加排他锁（进程退出或文件关闭时锁自动释放）
+    :param path: 锁文件路径（不存在时创建）
+    :return: 加锁成功时返回打开的文件（调用方保持打开即持有锁），已被其他进程锁定时返回None
+    """
+    lock_file = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class OrderNoGenerator:
+    """
+    订单号生成器（时间戳 + worker_id + 毫秒内序列号，保证唯一）：
+    1. worker_id：优先使用ORDER_NO_WORKER_ID配置；未配置时在[ORDER_NO_WORKER_ID_START, ORDER_NO_WORKER_ID_END]
+       范围内通过文件锁抢占一个空闲编号，同一台机器上的多个uvicorn worker进程互不重复
+       （多台机器部署时给每台机器配置不相交的编号范围）
+    2. 同一毫秒内序列号递增；序列号用尽或时钟回拨时借用下一毫秒，不阻塞等待
+    3. fork出的子进程首次调用时重新抢占worker_id
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._worker_id = None
+        self._lock_file = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self) -> int:
+        """当前进程的worker_id"""
+        with self._lock:
+            self._ensure_worker()
+            return self._worker_id
+
+    def next_id(self) -> int:
+        """
+        生成下一个ID（56位整数）
+        :return:
+        """
+        with self._lock:
+            self._ensure_worker()
+            now = time.time_ns() // 1_000_000
+            if now <= self._last_ms:
+                # 同一毫秒（或时钟回拨）：序列号递增，用尽后借用下一毫秒
+                self._sequence = (self._sequence + 1) & SEQUENCE_MASK
+                now = self._last_ms + (self._sequence == 0)
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return ((now - ORDER_NO_EPOCH_MS) << (WORKER_ID_BITS + SEQUENCE_BITS)) \
+                | (self._worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_ids(self, count: int) -> list[int]:
+        """
+        批量生成ID（一次加锁生成count个，批量创建订单时使用）
+        :param count:
+        :return:
+        """
+        ids = []
+        with self._lock:
+            self._ensure_worker()
+            worker_part = self._worker_id << SEQUENCE_BITS
+            last_ms, sequence = self._last_ms, self._sequence
+            for _ in range(count):
+                now = time.time_ns() // 1_000_000
+                if now <= last_ms:
+                    # 同一毫秒（或时钟回拨）：序列号递增，用尽后借用下一毫秒
+                    sequence = (sequence + 1) & SEQUENCE_MASK
+                    if sequence == 0:
+                        last_ms += 1
+                else:
+                    last_ms, sequence = now, 0
+                ids.append(((last_ms - ORDER_NO_EPOCH_MS) << (WORKER_ID_BITS + SEQUENCE_BITS))
+                           | worker_part | sequence)
+            self._last_ms, self._sequence = last_ms, sequence
+        return ids
+
+    def _ensure_worker(self) -> None:
+        """首次调用或fork后分配worker_id"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        if self._lock_file is not None:
+            # fork继承的文件句柄属于父进程的worker_id，关闭后重新抢占
+            self._lock_file.close()
+            self._lock_file = None
+        if settings.ORDER_NO_WORKER_ID is not None:
+            self._worker_id = int(settings.ORDER_NO_WORKER_ID) & MAX_WORKER_ID
+        else:
+            self._worker_id = self._acquire_worker_id()
+        self._pid = pid
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _acquire_worker_id(self) -> int:
+        """通过文件锁抢占一个空闲的worker_id（进程退出时锁自动释放）"""
+        lock_dir = settings.ORDER_NO_LOCK_DIR or os.path.join(tempfile.gettempdir(), "wuliu_order_no")
+        os.makedirs(lock_dir, exist_ok=True)
+        start = settings.ORDER_NO_WORKER_ID_START
+        end = min(settings.ORDER_NO_WORKER_ID_END, MAX_WORKER_ID)
+        for worker_id in range(start, end + 1):
+            lock_file = try_lock_file(os.path.join(lock_dir, f"worker_{worker_id}.lock"))
+            if lock_file is None:
+                continue
+            self._lock_file = lock_file  # 保持打开，进程存活期间一直持有锁
+            return worker_id
+        raise RuntimeError(f"订单号worker_id已用尽（范围{start}~{end}），请调大ORDER_NO_WORKER_ID_END")
+
+
+# 全局订单号生成器
+order_no_generator = OrderNoGenerator()
 
 
 def generate_order_no() -> str:
     """
-    生成唯一订单号：13位时间戳 + 4位随机数
-    示例：1736985600123 + 8888 = 17369856001238888
+    生成唯一订单号：17位纯数字（ORDER_NO_BASE + Snowflake风格ID）
+    示例：13052871690338304
+    :return:
+    """
+    return str(ORDER_NO_BASE + order_no_generator.next_id())
+
+
+def generate_order_nos(count: int) -> list[str]:
+    """
+    批量生成唯一订单号（格式同generate_order_no）
+    :param count:
+    :return:
+    """
+    return [str(ORDER_NO_BASE + order_id) for order_id in order_no_generator.next_ids(count)]
+
+
+def encode_order_cursor(create_time: datetime, order_id: int) -> str:
+    """
+    生成订单分页游标（不透明字符串，对应排序键(create_time, id)）
+    :param create_time:
+    :param order_id:
     :return:
     """
-    # 获取当前时间戳
-    timestamp = str(int(time.time() * 1000))
-    # 生成随机数
-    random_num = str(random.randint(1000, 9999))
-    # 组装订单编号
-    order_number = timestamp + random_num
-    return order_number
+    raw = f"{create_time.strftime('%Y-%m-%d %H:%M:%S')}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_order_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    解析订单分页游标（格式错误时抛出ValueError）
+    :param cursor:
+    :return: (create_time, order_id)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        create_time, order_id = raw.split("|")
+        return datetime.strptime(create_time, "%Y-%m-%d %H:%M:%S"), int(order_id)
+    except Exception:
+        raise ValueError("分页游标无效")
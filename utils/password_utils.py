@@ -1,5 +1,12 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
+from config.settings import settings
+
 # 密码加密上下文（使用bcrypt算法）
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -15,4 +22,101 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     密码验证函数
     """
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPoolBusyError(Exception):
+    """密码计算池排队已满（登录/注册请求过多）"""
+
+
+class PasswordHasherPool:
+    """
+    bcrypt计算进程池（带准入控制）：
+    1. bcrypt是CPU密集型操作，放到独立进程池中执行，不占用接口线程池/事件循环
+    2. 进程数固定（max_workers），同时在途的请求数不超过max_pending
+    3. 超出max_pending的请求直接失败（PasswordPoolBusyError），避免登录洪峰拖垮其他接口
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """懒加载进程池（使用spawn方式启动，避免fork继承事件循环/数据库连接）"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _submit(self, func, *args):
+        """
+        提交任务到进程池（超出排队上限时快速失败）
+        :param func:
+        :param args:
+        :return:
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusyError("当前登录请求过多，请稍后重试")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+            self.completed += 1
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """异步密码加密"""
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """异步密码验证"""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """关闭进程池（项目关闭时调用）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """进程池运行统计"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
+
+
+# 全局密码计算池实例
+password_pool = PasswordHasherPool(settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_POOL_MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    异步密码加密函数（在独立进程池中执行）
+    """
+    return await password_pool.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    异步密码验证函数（在独立进程池中执行）
+    """
+    return await password_pool.verify(plain_password, hashed_password)
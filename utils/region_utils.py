@@ -0,0 +1,113 @@
+"""地区工具类：地名标准化、区县中心点坐标表、球面距离计算"""
+import csv
+import threading
+
+import numpy as np
+
+from config.settings import settings
+
+# 地名后缀：匹配前去掉，使"上海市/浦东新区"与"上海-浦东"一致
+REGION_SUFFIXES = ("特别行政区", "自治州", "新区", "地区", "省", "市", "区", "县")
+# 直辖市地址中的"市"级占位名称（实际城市取省级名称）
+CITY_PLACEHOLDERS = {"市辖区", "县"}
+# 地球平均半径（千米）
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize_region(name: str | None) -> str | None:
+    """
+    地名标准化（去掉行政区划后缀，去掉后不足两个字的保留原名，如"和县"）
+    :param name:
+    :return: 如"浦东新区" -> "浦东"，"上海市" -> "上海"
+    """
+    if not name or not name.strip():
+        return None
+    name = name.strip()
+    for suffix in REGION_SUFFIXES:
+        if name.endswith(suffix) and len(name) - len(suffix) >= 2:
+            return name[:-len(suffix)]
+    return name
+
+
+def normalize_city(province: str | None, city: str | None) -> str | None:
+    """
+    标准化城市名（直辖市的市级名称为空或为占位名称时，用省级名称代替）
+    :param province:
+    :param city:
+    :return: 如("上海市", "市辖区") -> "上海"
+    """
+    if not city or city.strip() in CITY_PLACEHOLDERS:
+        return normalize_region(province)
+    return normalize_region(city)
+
+
+def haversine_matrix(lng_a: np.ndarray, lat_a: np.ndarray, lng_b: np.ndarray, lat_b: np.ndarray) -> np.ndarray:
+    """
+    两组坐标之间的球面距离矩阵
+    :param lng_a: 经度（度），长度m
+    :param lat_a: 纬度（度），长度m
+    :param lng_b: 经度（度），长度n
+    :param lat_b: 纬度（度），长度n
+    :return: m × n 距离矩阵（千米）
+    """
+    lng_a, lat_a, lng_b, lat_b = (np.radians(np.asarray(value, dtype=np.float64))
+                                  for value in (lng_a, lat_a, lng_b, lat_b))
+    half_dlat = (lat_b[None, :] - lat_a[:, None]) / 2
+    half_dlng = (lng_b[None, :] - lng_a[:, None]) / 2
+    h = np.sin(half_dlat) ** 2 + np.cos(lat_a)[:, None] * np.cos(lat_b)[None, :] * np.sin(half_dlng) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+class DistrictCentroids:
+    """
+    区县中心点坐标表（本地CSV：province,city,district,lng,lat，首次使用时加载）
+    按(城市, 区县)查找，区县不在表中时退化为该城市所有区县的平均坐标
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._districts: dict[tuple, tuple[float, float]] = {}
+        self._cities: dict[str, tuple[float, float]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """加载坐标表（只加载一次）"""
+        with self._lock:
+            if self._loaded:
+                return
+            city_points: dict[str, list] = {}
+            with open(self.path, encoding="utf-8-sig", newline="") as file:
+                for row in csv.DictReader(file):
+                    city = normalize_city(row["province"], row["city"])
+                    point = (float(row["lng"]), float(row["lat"]))
+                    self._districts[(city, normalize_region(row["district"]))] = point
+                    city_points.setdefault(city, []).append(point)
+            self._cities = {city: tuple(np.mean(points, axis=0).tolist()) for city, points in city_points.items()}
+            self._loaded = True
+
+    def lookup(self, province: str | None, city: str | None, district: str | None) -> tuple[float, float] | None:
+        """
+        查询地址所在区县的中心点
+        :param province:
+        :param city:
+        :param district:
+        :return: (经度, 纬度)，城市也不在表中时返回None
+        """
+        if not self._loaded:
+            self._load()
+        city = normalize_city(province, city)
+        point = self._districts.get((city, normalize_region(district)))
+        if point is None:
+            point = self._cities.get(city)
+        return point
+
+    def stats(self) -> dict:
+        """坐标表统计"""
+        if not self._loaded:
+            self._load()
+        return {"path": self.path, "district_count": len(self._districts), "city_count": len(self._cities)}
+
+
+# 全局区县中心点坐标表
+district_centroids = DistrictCentroids(settings.DISTRICT_CENTROIDS_PATH)
@@ -0,0 +1,51 @@
+"""请求上下文：通过ContextVar在中间件、接口线程池、DAO之间传递当前请求的信息"""
+import time
+from contextvars import ContextVar, Token
+
+# 客户端携带的最近写主库时间（Unix时间戳，秒）：写请求的响应通过Cookie/响应头下发，
+# 后续请求无论落到哪个worker进程都能判断读己之写窗口（见config.database.RoutingSession）
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+class RequestContext:
+    """当前请求的上下文信息"""
+    __slots__ = ("user_id", "route", "statement_count", "db_time", "sql_scope", "last_write")
+
+    def __init__(self, user_id: int | None = None, route: str | None = None):
+        self.user_id = user_id  # 当前登录用户ID（未登录为空）
+        self.route = route  # 请求方法 + 路径（日志中定位请求）
+        self.statement_count = 0  # 本次请求执行的SQL条数
+        self.db_time = 0.0  # 本次请求的SQL执行总耗时（秒）
+        self.sql_scope = None  # 本次请求的SQL语句形状统计（N+1检测，见utils.sql_tracker）
+        self.last_write: float | None = None  # 最近写主库的时间（客户端携带或本次请求写入）
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> RequestContext | None:
+    """获取当前请求上下文（非请求场景返回None）"""
+    return _request_context.get()
+
+
+def set_request_context(context: RequestContext) -> Token:
+    """设置当前请求上下文，返回用于恢复的token"""
+    return _request_context.set(context)
+
+
+def reset_request_context(token: Token) -> None:
+    """恢复请求上下文"""
+    _request_context.reset(token)
+
+
+def parse_last_write(value: str | None) -> float | None:
+    """
+    解析客户端携带的最近写入时间（格式错误时忽略，晚于当前时间的按当前时间处理）
+    :param value: Cookie或请求头的值
+    :return:
+    """
+    try:
+        return min(float(value), time.time()) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,21 @@
+"""响应工具：可信字典的快速响应通道"""
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+
+from config.settings import settings
+
+
+def fast_response(content: Any, status_code: int = 200) -> Any:
+    """
+    快速响应（FAST_RESPONSE_ENABLED开启时生效）：
+    接口直接返回Response对象时，FastAPI不再按response_model校验/序列化，由orjson直接编码字典
+    response_model仍保留在路由上，OpenAPI文档不受影响
+    注意：只能用于DAO/Service层已按响应模型组装好的可信字典（字段、类型与响应模型完全一致）
+    :param content:
+    :param status_code:
+    :return:
+    """
+    if settings.FAST_RESPONSE_ENABLED:
+        return ORJSONResponse(content, status_code=status_code)
+    return content
@@ -0,0 +1,50 @@
+"""
+SQL执行事件：每个引擎只注册一对游标事件（before_cursor_execute / after_cursor_execute），
+每条SQL只计时一次、只读取一次请求上下文，再分发给该引擎的所有观察者
+（db_metrics：耗时分布和每请求统计；sql_tracker：慢查询和N+1检测）
+"""
+import time
+import weakref
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.request_context import get_request_context
+
+# 引擎 -> 观察者列表（引擎被回收时自动移除）
+_observers: "weakref.WeakKeyDictionary[Engine, List[Callable]]" = weakref.WeakKeyDictionary()
+
+
+def add_statement_observer(engine: Engine, observer: Callable) -> None:
+    """
+    为引擎添加SQL执行观察者（首次添加时注册游标事件，同一观察者重复添加只生效一次）
+    :param engine: 同步引擎（异步引擎传入async_engine.sync_engine）
+    :param observer: observer(statement, parameters, elapsed, request_context)，elapsed为秒，
+                     request_context为当前请求上下文（不在请求中时为None）
+    :return:
+    """
+    observers = _observers.get(engine)
+    if observers is None:
+        observers = _observers[engine] = []
+
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            """SQL执行完成：计算耗时并通知所有观察者"""
+            start = getattr(context, "_statement_start", None)
+            if start is None:
+                return
+            elapsed = time.perf_counter() - start
+            request_context = get_request_context()
+            for notify in observers:
+                notify(statement, parameters, elapsed, request_context)
+
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if observer not in observers:
+        observers.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """SQL执行前：记录开始时间（挂在本次执行上下文上）"""
+    if context is not None:
+        context._statement_start = time.perf_counter()
@@ -0,0 +1,165 @@
+"""
+SQL跟踪器：基于SQLAlchemy游标事件（与db_metrics共用，见utils.sql_events），按请求跟踪执行的SQL
+1. 慢查询日志：超过SLOW_QUERY_MS的SQL连同参数、所属请求一起记录WARNING日志
+2. N+1检测：同一请求中同一查询语句形状（参数化后的SQL文本）执行超过N_PLUS_ONE_THRESHOLD次时告警
+   （典型场景：循环中访问CoreOrder.delivery_task / CoreUser.delivery_tasks等懒加载关系）；
+   只统计查询语句，分块执行的批量INSERT/UPDATE/DELETE不计入
+3. 严格模式：检测到N+1时直接抛出NPlusOneError（用于测试，见track_sql）
+"""
+import contextlib
+import threading
+from collections import deque
+from typing import Generator
+
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+from utils.common_utils import logger
+from utils.request_context import RequestContext, get_request_context, set_request_context, reset_request_context
+from utils.sql_events import add_statement_observer
+
+# 日志中参数的最大长度（批量INSERT的参数可能很长）
+MAX_PARAMS_LOG_LENGTH = 1000
+# 日志中需要脱敏的参数名关键字
+SENSITIVE_PARAM_KEYWORDS = ("password", "token")
+# 参与N+1检测的语句前缀（查询语句）
+QUERY_PREFIXES = ("SELECT", "WITH")
+
+
+class NPlusOneError(RuntimeError):
+    """严格模式下检测到N+1查询"""
+
+
+class SQLScope:
+    """一个跟踪范围（一次请求或一个track_sql块）内的SQL统计"""
+    __slots__ = ("shapes", "flagged", "statement_count", "strict", "threshold")
+
+    def __init__(self, strict: bool = False, threshold: int | None = None):
+        self.shapes: dict[str, int] = {}  # 查询语句形状 -> 执行次数
+        self.flagged: set[str] = set()  # 已告警的语句形状（同一形状每个请求只告警一次）
+        self.statement_count = 0
+        self.strict = strict
+        self.threshold = threshold if threshold is not None else settings.N_PLUS_ONE_THRESHOLD
+
+    @property
+    def repeated(self) -> dict[str, int]:
+        """超过阈值的语句形状及其执行次数"""
+        return {shape: self.shapes[shape] for shape in self.flagged}
+
+
+class SQLTracker:
+    """SQL跟踪器（全局单例sql_tracker）"""
+
+    def __init__(self):
+        self.slow_queries = 0  # 慢查询累计次数
+        self.n_plus_one_requests = 0  # 出现N+1的请求累计次数
+        self.recent_n_plus_one = deque(maxlen=20)  # 最近的N+1告警（route/语句/次数）
+        self._lock = threading.Lock()
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """
+        为引擎注册游标事件（与db_metrics共用同一对事件）
+        :param engine: 同步引擎（异步引擎传入async_engine.sync_engine）
+        :return:
+        """
+        add_statement_observer(engine, self._observe_statement)
+
+    def _observe_statement(self, statement, parameters, elapsed: float, request_context: RequestContext | None):
+        """SQL执行完成：慢查询判断 + 按请求累计语句形状"""
+        elapsed_ms = elapsed * 1000
+        route = request_context.route if request_context is not None else None
+
+        if elapsed_ms >= settings.SLOW_QUERY_MS:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning("慢查询 %.1fms route=%s sql=%s params=%s",
+                           elapsed_ms, route, " ".join(statement.split()), _format_params(parameters))
+
+        if request_context is None:
+            return
+        scope = request_context.sql_scope
+        if scope is None:
+            scope = request_context.sql_scope = SQLScope(strict=settings.SQL_TRACKER_STRICT)
+        scope.statement_count += 1
+        if not statement.lstrip()[:6].upper().startswith(QUERY_PREFIXES):
+            return
+        count = scope.shapes.get(statement, 0) + 1
+        scope.shapes[statement] = count
+        if count > scope.threshold and statement not in scope.flagged:
+            self._report_n_plus_one(scope, route, statement, count)
+
+    def _report_n_plus_one(self, scope: SQLScope, route: str | None, statement: str, count: int) -> None:
+        """
+        记录N+1告警（严格模式下抛出异常）
+        :param scope:
+        :param route:
+        :param statement:
+        :param count:
+        :return:
+        """
+        if not scope.flagged:
+            with self._lock:
+                self.n_plus_one_requests += 1
+        scope.flagged.add(statement)
+        shape = " ".join(statement.split())
+        with self._lock:
+            self.recent_n_plus_one.append({"route": route, "statement": shape, "count": count})
+        message = f"疑似N+1查询：同一语句在一个请求中执行超过{scope.threshold}次 route={route} sql={shape}"
+        if scope.strict:
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+    def stats(self) -> dict:
+        """统计信息（供管理接口查看）"""
+        with self._lock:
+            return {
+                "slow_query_ms": settings.SLOW_QUERY_MS,
+                "n_plus_one_threshold": settings.N_PLUS_ONE_THRESHOLD,
+                "slow_queries": self.slow_queries,
+                "n_plus_one_requests": self.n_plus_one_requests,
+                "recent_n_plus_one": list(self.recent_n_plus_one)
+            }
+
+
+def _format_params(parameters) -> str:
+    """
+    格式化SQL参数用于日志（敏感字段脱敏，超长截断）
+    :param parameters:
+    :return:
+    """
+    if isinstance(parameters, dict):
+        parameters = {key: "******" if any(word in str(key).lower() for word in SENSITIVE_PARAM_KEYWORDS) else value
+                      for key, value in parameters.items()}
+    text = repr(parameters)
+    if len(text) > MAX_PARAMS_LOG_LENGTH:
+        text = text[:MAX_PARAMS_LOG_LENGTH] + f"...（共{len(text)}字符）"
+    return text
+
+
+@contextlib.contextmanager
+def track_sql(strict: bool = True, threshold: int | None = None) -> Generator[SQLScope, None, None]:
+    """
+    在独立的跟踪范围内执行代码（用于测试：严格模式下出现N+1直接抛出NPlusOneError）
+    用法：
+    with track_sql(strict=True, threshold=3) as scope:
+        order_service.query_orders(current_user, query_request)
+    assert scope.statement_count <= 2
+    :param strict: 出现N+1时是否抛出异常
+    :param threshold: 同一语句形状允许的最大执行次数（为空时使用N_PLUS_ONE_THRESHOLD）
+    :return: 本范围的SQL统计
+    """
+    current = get_request_context()
+    if current is not None:
+        context = RequestContext(user_id=current.user_id, route=current.route)
+    else:
+        context = RequestContext(route="track_sql")
+    context.sql_scope = SQLScope(strict=strict, threshold=threshold)
+    token = set_request_context(context)
+    try:
+        yield context.sql_scope
+    finally:
+        reset_request_context(token)
+
+
+# 全局SQL跟踪器
+sql_tracker = SQLTracker()